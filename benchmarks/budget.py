@@ -0,0 +1,167 @@
+import json
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from platform import python_version
+from typing import Any, Dict, List, Optional
+
+from run_benchmarks import (
+    BENCHMARKS_PATH,
+    ScenarioResult,
+    add_arguments,
+    print_results,
+    run_benchmarks,
+)
+
+HISTORY_SCHEMA_VERSION = 1
+DEFAULT_HISTORY_PATH = BENCHMARKS_PATH.joinpath("history.json")
+
+
+def get_git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCHMARKS_PATH,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_history(history_path: Path) -> Dict[str, Any]:
+    if not history_path.exists():
+        return {"schema_version": HISTORY_SCHEMA_VERSION, "baseline": None, "runs": []}
+    history = json.loads(history_path.read_text("utf-8"))
+    if history.get("schema_version") != HISTORY_SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported history schema version {history.get('schema_version')}"
+        )
+    return history
+
+
+def save_history(history_path: Path, history: Dict[str, Any]) -> None:
+    history_path.write_text(json.dumps(history, indent=2) + "\n", "utf-8")
+
+
+def get_baseline_results(
+    history: Dict[str, Any],
+) -> Optional[Dict[str, ScenarioResult]]:
+    for run in history["runs"]:
+        if run["id"] == history["baseline"]:
+            results = [ScenarioResult(**r) for r in run["results"]]
+            return {r.key: r for r in results}
+    return None
+
+
+def compare_results(
+    results: List[ScenarioResult],
+    baseline_results: Dict[str, ScenarioResult],
+    args: Namespace,
+) -> List[str]:
+    regressions: List[str] = []
+    for result in results:
+        baseline = baseline_results.get(result.key)
+        if baseline is None:
+            print(f"{result.key}: no baseline")
+            continue
+        # Times and allocations depend on the machine the baseline ran on
+        if not args.counts_only:
+            for metric in ["median", "p95"]:
+                current_value = getattr(result, metric)
+                baseline_value = getattr(baseline, metric)
+                # Sub-millisecond noise is not worth failing a run over
+                if (
+                    current_value > baseline_value * (1 + args.time_tolerance)
+                    and current_value - baseline_value > args.time_floor
+                ):
+                    regressions.append(
+                        f"{result.key}: {metric} {baseline_value:.4f}s -> "
+                        f"{current_value:.4f}s"
+                    )
+            if result.allocated_kb > baseline.allocated_kb * (
+                1 + args.allocation_tolerance
+            ):
+                regressions.append(
+                    f"{result.key}: allocations {baseline.allocated_kb:.0f}KB -> "
+                    f"{result.allocated_kb:.0f}KB"
+                )
+        # Counts are deterministic, so any growth means extra rescans or RPC chatter
+        for metric in ["parse_count", "rpc_count"]:
+            current_value = getattr(result, metric)
+            baseline_value = getattr(baseline, metric)
+            if current_value > baseline_value + args.count_tolerance:
+                regressions.append(
+                    f"{result.key}: {metric} {baseline_value} -> {current_value}"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        description="Run benchmarks and compare them against the stored baseline"
+    )
+    add_arguments(parser)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY_PATH)
+    parser.add_argument("--save", action="store_true", help="Append run to history")
+    parser.add_argument(
+        "--set-baseline", action="store_true", help="Use this run as the baseline"
+    )
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--time-floor", type=float, default=0.005)
+    parser.add_argument("--allocation-tolerance", type=float, default=0.2)
+    parser.add_argument("--count-tolerance", type=int, default=0)
+    parser.add_argument(
+        "--counts-only",
+        action="store_true",
+        help="Only compare parse and RPC counts, e.g. on another machine",
+    )
+    args = parser.parse_args()
+    history = load_history(args.history)
+    results = run_benchmarks(
+        args.sizes, args.build_tools, args.scenarios, args.projects_path, args.repeat
+    )
+    print_results(results)
+    regressions: List[str] = []
+    baseline_results = get_baseline_results(history)
+    if baseline_results is None:
+        print("\nNo baseline stored, nothing to compare against")
+    else:
+        print(f"\nComparing against baseline {history['baseline']}")
+        regressions = compare_results(results, baseline_results, args)
+    if args.save or args.set_baseline:
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        commit = get_git_commit()
+        run_id = f"{timestamp}-{commit}"
+        history["runs"].append(
+            {
+                "id": run_id,
+                "commit": commit,
+                "timestamp": timestamp,
+                "python": python_version(),
+                "results": [asdict(r) for r in results],
+            }
+        )
+        if args.set_baseline or history["baseline"] is None:
+            history["baseline"] = run_id
+        save_history(args.history, history)
+        print(f"Saved run {run_id} to {args.history}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
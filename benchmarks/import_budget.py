@@ -0,0 +1,72 @@
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List
+
+RPLUGIN_PATH = Path(__file__).resolve().parent.parent.joinpath("rplugin", "python3")
+COMMAND_MODULES = [
+    "entity_creation_commands",
+    "entity_field_commands",
+    "entity_rel_commands",
+    "file_creation_commands",
+    "jpa_repo_commands",
+    "project_runner_commands",
+    "diagnostics_commands",
+    "buffer_events",
+]
+# Nothing below should be imported just because the host loaded the plugin
+DEFERRED_MODULES = ["tree_sitter", "tree_sitter_java", "utils"]
+# The only exceptions, needed while the command classes are defined
+EAGER_MODULES = [
+    # Namespace package, imported on the way to utils.instrumentation
+    "utils",
+    # Holds the decorator every handler is wrapped with, imports nothing else
+    "utils.instrumentation",
+]
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure_import_times() -> Dict[str, int]:
+    # pynvim is imported first so its cost is not charged to the plugin modules
+    code = "import pynvim\n" + "\n".join(f"import {m}" for m in COMMAND_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=RPLUGIN_PATH,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Unable to import command modules:\n{result.stderr}")
+    cumulative_times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            cumulative_times[match.group(4)] = int(match.group(2))
+    return cumulative_times
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Check the remote plugin host import time")
+    parser.add_argument("--budget-ms", type=float, default=60.0)
+    args = parser.parse_args()
+    cumulative_times = measure_import_times()
+    # base is nested under whichever command module imports it first
+    total_us = sum(cumulative_times.get(m, 0) for m in COMMAND_MODULES)
+    errors: List[str] = []
+    for module in ["base"] + COMMAND_MODULES:
+        print(f"{module:<28} {cumulative_times.get(module, 0) / 1000:8.2f} ms")
+    print(f"{'total':<28} {total_us / 1000:8.2f} ms (budget {args.budget_ms} ms)")
+    if total_us / 1000 > args.budget_ms:
+        errors.append(f"Import time {total_us / 1000:.2f} ms exceeds the budget")
+    for module in cumulative_times:
+        if module.split(".")[0] in DEFERRED_MODULES and module not in EAGER_MODULES:
+            errors.append(f"'{module}' is imported eagerly")
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
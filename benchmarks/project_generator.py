@@ -0,0 +1,331 @@
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+from typing import List, Literal, Optional
+
+BuildTool = Literal["maven", "gradle"]
+
+ROOT_PACKAGE = "com.example.bench"
+ENTITIES_PER_MODULE = 100
+ENTITIES_PER_ENUM = 10
+LARGE_ENTITY_LINES = 10_000
+
+POM_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <modelVersion>4.0.0</modelVersion>
+    <parent>
+        <groupId>org.springframework.boot</groupId>
+        <artifactId>spring-boot-starter-parent</artifactId>
+        <version>3.3.4</version>
+    </parent>
+    <groupId>com.example</groupId>
+    <artifactId>bench</artifactId>
+    <version>0.0.1-SNAPSHOT</version>
+    <name>bench</name>
+    <dependencies>
+        <dependency>
+            <groupId>org.springframework.boot</groupId>
+            <artifactId>spring-boot-starter-data-jpa</artifactId>
+        </dependency>
+    </dependencies>
+</project>
+"""
+
+GRADLE_TEMPLATE = """plugins {
+    id 'java'
+    id 'org.springframework.boot' version '3.3.4'
+    id 'io.spring.dependency-management' version '1.1.6'
+}
+
+group = 'com.example'
+version = '0.0.1-SNAPSHOT'
+
+dependencies {
+    implementation 'org.springframework.boot:spring-boot-starter-data-jpa'
+}
+"""
+
+
+def get_package_path(module_index: int) -> str:
+    return f"{ROOT_PACKAGE}.module{module_index}"
+
+
+def get_entity_name(entity_index: int) -> str:
+    return f"Entity{entity_index}"
+
+
+def get_enum_name(enum_index: int) -> str:
+    return f"Status{enum_index}"
+
+
+def get_entity_superclass(entity_index: int) -> Optional[str]:
+    return [None, "BaseEntity", "AuditedEntity"][entity_index % 3]
+
+
+def write_java_file(source_root: Path, package_path: str, name: str, body: str):
+    file_path = source_root.joinpath(*package_path.split("."), f"{name}.java")
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(body, "utf-8")
+
+
+def generate_main_class() -> str:
+    return (
+        f"package {ROOT_PACKAGE};\n\n"
+        "import org.springframework.boot.SpringApplication;\n"
+        "import org.springframework.boot.autoconfigure.SpringBootApplication;\n\n"
+        "@SpringBootApplication\n"
+        "public class BenchApplication {\n\n"
+        "    public static void main(String[] args) {\n"
+        "        SpringApplication.run(BenchApplication.class, args);\n"
+        "    }\n"
+        "}\n"
+    )
+
+
+def generate_mapped_superclasses() -> List[tuple]:
+    base_entity = (
+        f"package {ROOT_PACKAGE}.common;\n\n"
+        "import jakarta.persistence.Column;\n"
+        "import jakarta.persistence.GeneratedValue;\n"
+        "import jakarta.persistence.GenerationType;\n"
+        "import jakarta.persistence.Id;\n"
+        "import jakarta.persistence.MappedSuperclass;\n\n"
+        "@MappedSuperclass\n"
+        "public class BaseEntity {\n\n"
+        "    @Id\n"
+        "    @GeneratedValue(strategy = GenerationType.IDENTITY)\n"
+        '    @Column(name = "id", nullable = false)\n'
+        "    private Long id;\n\n"
+        "    public Long getId() {\n"
+        "        return id;\n"
+        "    }\n"
+        "}\n"
+    )
+    audited_entity = (
+        f"package {ROOT_PACKAGE}.common;\n\n"
+        "import java.time.Instant;\n\n"
+        "import jakarta.persistence.Column;\n"
+        "import jakarta.persistence.MappedSuperclass;\n\n"
+        "@MappedSuperclass\n"
+        "public class AuditedEntity extends BaseEntity {\n\n"
+        '    @Column(name = "created_at")\n'
+        "    private Instant createdAt;\n\n"
+        '    @Column(name = "updated_at")\n'
+        "    private Instant updatedAt;\n"
+        "}\n"
+    )
+    return [("BaseEntity", base_entity), ("AuditedEntity", audited_entity)]
+
+
+def generate_enum(enum_index: int) -> str:
+    package_path = get_package_path(
+        enum_index * ENTITIES_PER_ENUM // ENTITIES_PER_MODULE
+    )
+    return (
+        f"package {package_path};\n\n"
+        f"public enum {get_enum_name(enum_index)} {{\n"
+        "    ACTIVE,\n"
+        "    INACTIVE,\n"
+        "    ARCHIVED\n"
+        "}\n"
+    )
+
+
+def generate_entity(entity_index: int, random: Random) -> str:
+    module_index = entity_index // ENTITIES_PER_MODULE
+    package_path = get_package_path(module_index)
+    name = get_entity_name(entity_index)
+    enum_index = entity_index // ENTITIES_PER_ENUM
+    enum_package = get_package_path(
+        enum_index * ENTITIES_PER_ENUM // ENTITIES_PER_MODULE
+    )
+    imports = {
+        "jakarta.persistence.Column",
+        "jakarta.persistence.Entity",
+        "jakarta.persistence.EnumType",
+        "jakarta.persistence.Enumerated",
+        "jakarta.persistence.Table",
+        "java.math.BigDecimal",
+    }
+    fields: List[str] = []
+    superclass = get_entity_superclass(entity_index)
+    if superclass:
+        imports.add(f"{ROOT_PACKAGE}.common.{superclass}")
+    else:
+        imports.update(
+            [
+                "jakarta.persistence.GeneratedValue",
+                "jakarta.persistence.GenerationType",
+                "jakarta.persistence.Id",
+                "java.util.UUID",
+            ]
+        )
+        fields.append(
+            "    @Id\n"
+            "    @GeneratedValue(strategy = GenerationType.UUID)\n"
+            '    @Column(name = "id", nullable = false)\n'
+            "    private UUID id;\n"
+        )
+    fields.append(
+        '    @Column(name = "name", length = 120, nullable = false)\n'
+        "    private String name;\n"
+    )
+    fields.append(
+        '    @Column(name = "amount", precision = 19, scale = 2)\n'
+        "    private BigDecimal amount;\n"
+    )
+    fields.append(
+        "    @Enumerated(EnumType.STRING)\n"
+        '    @Column(name = "status")\n'
+        f"    private {get_enum_name(enum_index)} status;\n"
+    )
+    if enum_package != package_path:
+        imports.add(f"{enum_package}.{get_enum_name(enum_index)}")
+    # Each entity points to up to two earlier entities, and some own a collection
+    for target_index in random.sample(range(entity_index), min(entity_index, 2)):
+        target_name = get_entity_name(target_index)
+        target_package = get_package_path(target_index // ENTITIES_PER_MODULE)
+        if target_package != package_path:
+            imports.add(f"{target_package}.{target_name}")
+        imports.update(
+            [
+                "jakarta.persistence.FetchType",
+                "jakarta.persistence.JoinColumn",
+                "jakarta.persistence.ManyToOne",
+            ]
+        )
+        field_name = target_name[0].lower() + target_name[1:]
+        fields.append(
+            "    @ManyToOne(fetch = FetchType.LAZY, optional = true)\n"
+            f'    @JoinColumn(name = "{field_name}_id", nullable = true)\n'
+            f"    private {target_name} {field_name};\n"
+        )
+    if entity_index > 0 and random.random() < 0.3:
+        target_index = random.randrange(entity_index)
+        target_name = get_entity_name(target_index)
+        target_package = get_package_path(target_index // ENTITIES_PER_MODULE)
+        if target_package != package_path:
+            imports.add(f"{target_package}.{target_name}")
+        imports.update(
+            [
+                "jakarta.persistence.JoinColumn",
+                "jakarta.persistence.OneToMany",
+                "java.util.LinkedHashSet",
+                "java.util.Set",
+            ]
+        )
+        target_field_name = target_name[0].lower() + target_name[1:]
+        # Unidirectional, the earlier entity has no field pointing back to this one
+        fields.append(
+            "    @OneToMany\n"
+            f'    @JoinColumn(name = "{name[0].lower() + name[1:]}_id")\n'
+            f"    private Set<{target_name}> {target_field_name}s"
+            " = new LinkedHashSet<>();\n"
+        )
+    snaked_name = f"entity_{entity_index}"
+    extends = f" extends {superclass}" if superclass else ""
+    return (
+        f"package {package_path};\n\n"
+        + "".join(f"import {i};\n" for i in sorted(imports))
+        + "\n@Entity\n"
+        + f'@Table(name = "{snaked_name}")\n'
+        + f"public class {name}{extends} {{\n\n"
+        + "\n".join(fields)
+        + "}\n"
+    )
+
+
+def generate_large_entity(line_count: int = LARGE_ENTITY_LINES) -> str:
+    # A single entity of about line_count lines, with public nested classes and
+    # the id field last, so lookups that stop early have something to skip
+    members: List[str] = []
+    lines = 0
+    index = 0
+    while lines < line_count:
+        if index % 50 == 49:
+            members.append(
+                f"    public static class Nested{index} {{\n"
+                f"        private String value{index};\n"
+                "    }\n"
+            )
+            lines += 4
+        else:
+            members.append(
+                f'    @Column(name = "column_{index}", length = 120)\n'
+                f"    private String column{index};\n"
+            )
+            lines += 3
+        index += 1
+    members.append(
+        "    @Id\n"
+        "    @GeneratedValue(strategy = GenerationType.UUID)\n"
+        "    private UUID id;\n"
+    )
+    imports = [
+        "jakarta.persistence.Column",
+        "jakarta.persistence.Entity",
+        "jakarta.persistence.GeneratedValue",
+        "jakarta.persistence.GenerationType",
+        "jakarta.persistence.Id",
+        "java.util.UUID",
+    ]
+    return (
+        f"package {ROOT_PACKAGE}.large;\n\n"
+        + "".join(f"import {i};\n" for i in imports)
+        + "\n@Entity\n"
+        + "public class LargeEntity {\n\n"
+        + "\n".join(members)
+        + "}\n"
+    )
+
+
+def generate_project(
+    root_path: Path, entity_count: int, build_tool: BuildTool = "maven", seed: int = 0
+) -> Path:
+    random = Random(seed)
+    root_path.mkdir(parents=True, exist_ok=True)
+    if build_tool == "maven":
+        root_path.joinpath("pom.xml").write_text(POM_TEMPLATE, "utf-8")
+    else:
+        root_path.joinpath("build.gradle").write_text(GRADLE_TEMPLATE, "utf-8")
+        root_path.joinpath("settings.gradle").write_text(
+            "rootProject.name = 'bench'\n", "utf-8"
+        )
+    source_root = root_path.joinpath("src", "main", "java")
+    write_java_file(
+        source_root, ROOT_PACKAGE, "BenchApplication", generate_main_class()
+    )
+    for name, body in generate_mapped_superclasses():
+        write_java_file(source_root, f"{ROOT_PACKAGE}.common", name, body)
+    for enum_index in range(
+        (entity_count + ENTITIES_PER_ENUM - 1) // ENTITIES_PER_ENUM
+    ):
+        write_java_file(
+            source_root,
+            get_package_path(enum_index * ENTITIES_PER_ENUM // ENTITIES_PER_MODULE),
+            get_enum_name(enum_index),
+            generate_enum(enum_index),
+        )
+    for entity_index in range(entity_count):
+        write_java_file(
+            source_root,
+            get_package_path(entity_index // ENTITIES_PER_MODULE),
+            get_entity_name(entity_index),
+            generate_entity(entity_index, random),
+        )
+    root_path.joinpath(".generated").write_text(f"{entity_count}:{build_tool}:{seed}")
+    return root_path
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Generate a synthetic Spring JPA project")
+    parser.add_argument("root_path", type=Path)
+    parser.add_argument("--entities", type=int, default=10)
+    parser.add_argument("--build-tool", choices=["maven", "gradle"], default="maven")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_project(args.root_path, args.entities, args.build_tool, args.seed)
+
+
+if __name__ == "__main__":
+    main()
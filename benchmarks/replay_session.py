@@ -0,0 +1,72 @@
+import sys
+from argparse import ArgumentParser
+from importlib import import_module
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Dict, List
+
+BENCHMARKS_PATH = Path(__file__).resolve().parent
+RPLUGIN_PATH = BENCHMARKS_PATH.parent.joinpath("rplugin", "python3")
+sys.path.insert(0, str(RPLUGIN_PATH))
+
+from utils.rpc_utils import RpcUtils  # noqa: E402
+from utils.tracing_utils import TracingUtils  # noqa: E402
+
+
+def replay_invocation(
+    recording: Dict[str, Any], invocation: Dict[str, Any]
+) -> Dict[str, Any]:
+    plugin_class = getattr(import_module(invocation["module"]), invocation["plugin"])
+    plugin = plugin_class(RpcUtils.create_replay_nvim(recording, invocation))
+    handler = getattr(plugin, invocation["handler"])
+    error = None
+    start = perf_counter()
+    try:
+        handler(*invocation["args"])
+    except Exception as e:
+        error = str(e)
+    wall_time = perf_counter() - start
+    trace = TracingUtils.invocations[-1]
+    return {
+        "wall_time": wall_time,
+        "rpc_count": trace.rpc_requests + trace.rpc_notifications,
+        "rpc_bytes": trace.rpc_bytes,
+        "error": error,
+    }
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        description="Replays a :JavaGenieRecord recording against the plugin, "
+        "answering every RPC from the recording. The recorded project must still "
+        "exist at the same path."
+    )
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    recording = RpcUtils.load_recording(args.recording)
+    # Warnings would send RPCs that were never recorded
+    RpcUtils.budget = sys.maxsize
+    failed = False
+    print(f"Recorded in {recording['cwd']}")
+    print(f"{'#':>3} {'handler':<44} {'median (s)':>11} {'rpc':>6} {'KB':>8}")
+    for index, invocation in enumerate(recording["invocations"]):
+        runs: List[Dict[str, Any]] = [
+            replay_invocation(recording, invocation) for _ in range(args.repeat)
+        ]
+        name = f"{invocation['plugin']}.{invocation['handler']}"
+        print(
+            f"{index:>3} {name:<44} "
+            f"{median(run['wall_time'] for run in runs):>11.4f} "
+            f"{runs[-1]['rpc_count']:>6} {runs[-1]['rpc_bytes'] / 1024:>8.1f}"
+        )
+        if runs[-1]["error"] is not None:
+            failed = True
+            print(f"    error: {runs[-1]['error']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+import json
+import subprocess
+import sys
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from platform import system
+from resource import RUSAGE_SELF, getrusage
+from tempfile import gettempdir
+from statistics import median, quantiles
+from time import perf_counter
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+BENCHMARKS_PATH = Path(__file__).resolve().parent
+RPLUGIN_PATH = BENCHMARKS_PATH.parent.joinpath("rplugin", "python3")
+sys.path.insert(0, str(RPLUGIN_PATH))
+sys.path.insert(0, str(BENCHMARKS_PATH))
+
+from project_generator import (  # noqa: E402
+    ENTITIES_PER_MODULE,
+    generate_large_entity,
+    generate_project,
+    get_entity_name,
+    get_entity_superclass,
+    get_package_path,
+)
+from stub_nvim import StubNvim  # noqa: E402
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_PROJECTS_PATH = Path(gettempdir()).joinpath("nvim-javagenie-benchmarks")
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    entities: int
+    build_tool: str
+    median: float
+    p95: float
+    peak_rss_kb: int
+    allocated_kb: float
+    parse_count: int
+    rpc_count: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.build_tool}-{self.entities}:{self.scenario}"
+
+
+class CountingParser:
+    def __init__(self, parser) -> None:
+        self.parser = parser
+        self.parse_count = 0
+
+    def parse(self, *args, **kwargs):
+        self.parse_count += 1
+        return self.parser.parse(*args, **kwargs)
+
+
+class BenchmarkContext:
+    def __init__(self, project_path: Path, entities: int) -> None:
+        from base import Base
+
+        self.project_path = project_path
+        self.entities = entities
+        self.nvim = StubNvim(project_path)
+        self.base = Base(self.nvim)
+        treesitter_utils = self.base.treesitter_utils
+        self.parser = CountingParser(treesitter_utils.parser)
+        treesitter_utils.parser = self.parser
+
+    def get_entity_path(self, entity_index: int) -> Path:
+        package_path = get_package_path(entity_index // ENTITIES_PER_MODULE)
+        return self.project_path.joinpath(
+            "src",
+            "main",
+            "java",
+            *package_path.split("."),
+            f"{get_entity_name(entity_index)}.java",
+        )
+
+    def get_entity_file_data(self, entity_index: int):
+        file_data = self.base.common_utils.get_java_file_data(
+            self.get_entity_path(entity_index)
+        )
+        if file_data is None:
+            raise ValueError(f"Unable to get file data for entity {entity_index}")
+        # Summaries may come from the cache, parse outside the timed operation
+        file_data.tree
+        return file_data
+
+    def clear_file_summaries(self) -> None:
+        file_summary_utils = self.base.file_summary_utils
+        file_summary_utils.get_summaries_path().unlink(missing_ok=True)
+        file_summary_utils.summaries = None
+        self.base.project_index_utils.reset_index()
+
+
+def setup_get_all_java_files_data(context: BenchmarkContext) -> Callable[[], Any]:
+    def get_all_java_files_data() -> None:
+        context.clear_file_summaries()
+        context.base.common_utils.get_all_java_files_data()
+
+    return get_all_java_files_data
+
+
+def setup_get_all_java_files_data_cached(
+    context: BenchmarkContext,
+) -> Callable[[], Any]:
+    # Every summary is on disk, as after switching to a branch seen before
+    context.clear_file_summaries()
+    context.base.common_utils.get_all_java_files_data()
+
+    def get_all_java_files_data_cached() -> None:
+        context.base.file_summary_utils.summaries = None
+        context.base.project_index_utils.reset_index()
+        context.base.common_utils.get_all_java_files_data()
+
+    return get_all_java_files_data_cached
+
+
+def setup_get_all_java_files_data_unchanged(
+    context: BenchmarkContext,
+) -> Callable[[], Any]:
+    # The project was indexed by this instance already and no file changed
+    context.clear_file_summaries()
+    context.base.common_utils.get_all_java_files_data()
+    return lambda: context.base.common_utils.get_all_java_files_data()
+
+
+def setup_create_jpa_repository(context: BenchmarkContext) -> Callable[[], Any]:
+    # Pick the last entity whose id is inherited, so the superclass lookup runs
+    entity_index = max(
+        i for i in range(context.entities) if get_entity_superclass(i) == "BaseEntity"
+    )
+    buffer_path = context.get_entity_path(entity_index)
+    repository_path = buffer_path.with_name(f"{buffer_path.stem}Repository.java")
+
+    def create_jpa_repository() -> None:
+        context.base.jpa_repo_utils.create_jpa_repository(buffer_path)
+        # The repository is written to disk, keep the project unchanged for later runs
+        repository_path.unlink()
+
+    return create_jpa_repository
+
+
+def setup_create_basic_entity_field(context: BenchmarkContext) -> Callable[[], Any]:
+    from custom_types.create_basic_field_args import CreateBasicEntityFieldArgs
+
+    file_data = context.get_entity_file_data(context.entities - 1)
+    args = CreateBasicEntityFieldArgs(
+        field_package_path="java.time",
+        field_type="LocalDate",
+        field_name="benchmarkDate",
+        other=["mandatory"],
+    )
+    return lambda: context.base.entity_field_utils.create_basic_entity_field(
+        buffer_file_data=file_data, args=args
+    )
+
+
+def setup_create_many_to_one_relationship_field(
+    context: BenchmarkContext,
+) -> Callable[[], Any]:
+    from custom_types.create_many_to_one_args import CreateManyToOneRelArgs
+
+    owning_side_file_data = context.get_entity_file_data(context.entities - 1)
+    inverse_side_file_data = context.get_entity_file_data(0)
+    args = CreateManyToOneRelArgs(
+        inverse_field_type=inverse_side_file_data.file_name,
+        fetch_type="lazy",
+        collection_type="set",
+        mapping_type="bidirectional_join_column",
+        owning_side_other=["mandatory"],
+    )
+    return lambda: context.base.entity_relationship_utils.create_many_to_one_relationship_field(
+        owning_side_file_data=owning_side_file_data,
+        inverse_side_file_data=inverse_side_file_data,
+        args=args,
+    )
+
+
+def setup_create_one_to_one_relationship_field(
+    context: BenchmarkContext,
+) -> Callable[[], Any]:
+    from custom_types.create_one_to_one_args import CreateOneToOneRelArgs
+
+    owning_side_file_data = context.get_entity_file_data(context.entities - 1)
+    inverse_side_file_data = context.get_entity_file_data(0)
+    args = CreateOneToOneRelArgs(
+        inverse_field_type=inverse_side_file_data.file_name,
+        mapping_type="bidirectional_join_column",
+    )
+    return lambda: context.base.entity_relationship_utils.create_one_to_one_relationship_field(
+        owning_side_file_data=owning_side_file_data,
+        inverse_side_file_data=inverse_side_file_data,
+        args=args,
+    )
+
+
+def setup_create_many_to_many_relationship_field(
+    context: BenchmarkContext,
+) -> Callable[[], Any]:
+    from custom_types.create_many_to_many_args import CreateManyToManyRelArgs
+
+    owning_side_file_data = context.get_entity_file_data(context.entities - 1)
+    inverse_side_file_data = context.get_entity_file_data(0)
+    args = CreateManyToManyRelArgs(
+        inverse_field_type=inverse_side_file_data.file_name,
+        mapping_type="bidirectional_join_column",
+        inverse_side_other=["equals_hashcode"],
+    )
+    return lambda: context.base.entity_relationship_utils.create_many_to_many_relationship_field(
+        owning_side_file_data=owning_side_file_data,
+        inverse_side_file_data=inverse_side_file_data,
+        args=args,
+    )
+
+
+def setup_query_large_entity(context: BenchmarkContext) -> Callable[[], Any]:
+    treesitter_utils = context.base.treesitter_utils
+    jpa_repo_utils = context.base.jpa_repo_utils
+    file_tree = treesitter_utils.convert_bytes_to_tree(generate_large_entity().encode())
+
+    def query_large_entity() -> None:
+        treesitter_utils.get_buffer_public_class_name(file_tree)
+        treesitter_utils.buffer_public_class_has_annotation(file_tree, "Entity")
+        treesitter_utils.get_buffer_public_class_body(file_tree)
+        jpa_repo_utils.get_superclass_name(file_tree)
+        jpa_repo_utils.find_id_field_type(file_tree)
+        treesitter_utils.add_imports_to_file_tree(file_tree, ["java.time.LocalDate"])
+
+    return query_large_entity
+
+
+def setup_get_buffer_tree_large_entity(context: BenchmarkContext) -> Callable[[], Any]:
+    buffer_utils = context.base.buffer_utils
+    buffer = context.nvim.open_buffer(None)
+    buffer.lines = generate_large_entity().split("\n")
+    buffer_utils.get_buffer_tree(buffer)
+    # A line typed into the class body between two commands
+    body_line = next(i for i, v in enumerate(buffer.lines) if v.endswith("{")) + 1
+
+    def get_buffer_tree_large_entity() -> None:
+        buffer.lines.insert(body_line, "    private int benchmarkCount;")
+        buffer.changedtick += 1
+        buffer_utils.apply_lines_event(
+            buffer.number,
+            buffer.changedtick,
+            body_line,
+            body_line,
+            ["    private int benchmarkCount;"],
+        )
+        buffer_utils.get_buffer_tree(buffer)
+
+    return get_buffer_tree_large_entity
+
+
+SCENARIOS: Dict[str, Callable[[BenchmarkContext], Callable[[], Any]]] = {
+    "get_all_java_files_data": setup_get_all_java_files_data,
+    "get_all_java_files_data_cached": setup_get_all_java_files_data_cached,
+    "get_all_java_files_data_unchanged": setup_get_all_java_files_data_unchanged,
+    "create_jpa_repository": setup_create_jpa_repository,
+    "create_basic_entity_field": setup_create_basic_entity_field,
+    "create_many_to_one_relationship_field": setup_create_many_to_one_relationship_field,
+    "create_one_to_one_relationship_field": setup_create_one_to_one_relationship_field,
+    "create_many_to_many_relationship_field": setup_create_many_to_many_relationship_field,
+    "query_large_entity": setup_query_large_entity,
+    "get_buffer_tree_large_entity": setup_get_buffer_tree_large_entity,
+}
+
+
+def get_peak_rss_kb() -> int:
+    peak_rss = getrusage(RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak_rss // 1024 if system() == "Darwin" else peak_rss
+
+
+def get_project_path(projects_path: Path, entities: int, build_tool: str) -> Path:
+    project_path = projects_path.joinpath(f"{build_tool}-{entities}")
+    marker = project_path.joinpath(".generated")
+    if not marker.exists() or marker.read_text() != f"{entities}:{build_tool}:0":
+        generate_project(project_path, entities, build_tool)  # type: ignore
+    return project_path
+
+
+def get_p95(wall_times: List[float]) -> float:
+    if len(wall_times) < 2:
+        return wall_times[0]
+    return quantiles(wall_times, n=20, method="inclusive")[18]
+
+
+def run_scenario(
+    scenario: str, project_path: Path, entities: int, build_tool: str, repeat: int = 1
+) -> ScenarioResult:
+    context = BenchmarkContext(project_path, entities)
+    operation = SCENARIOS[scenario](context)
+    # Counts come from the first run, allocations from a separate traced run
+    # so tracemalloc overhead doesn't skew the timings.
+    wall_times: List[float] = []
+    parse_count = 0
+    rpc_count = 0
+    for i in range(repeat):
+        context.parser.parse_count = 0
+        context.nvim.reset()
+        start = perf_counter()
+        operation()
+        wall_times.append(perf_counter() - start)
+        if i == 0:
+            parse_count = context.parser.parse_count
+            rpc_count = len(context.nvim.calls)
+    tracemalloc.start()
+    operation()
+    _, allocated_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ScenarioResult(
+        scenario=scenario,
+        entities=entities,
+        build_tool=build_tool,
+        median=median(wall_times),
+        p95=get_p95(wall_times),
+        peak_rss_kb=get_peak_rss_kb(),
+        allocated_kb=allocated_peak / 1024,
+        parse_count=parse_count,
+        rpc_count=rpc_count,
+    )
+
+
+def run_scenario_in_subprocess(
+    scenario: str, project_path: Path, entities: int, build_tool: str, repeat: int = 1
+) -> ScenarioResult:
+    # A fresh interpreter per scenario keeps peak RSS from leaking across runs
+    result = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--worker",
+            scenario,
+            str(project_path),
+            str(entities),
+            build_tool,
+            str(repeat),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario} failed:\n{result.stderr}")
+    return ScenarioResult(**json.loads(result.stdout.splitlines()[-1]))
+
+
+def run_benchmarks(
+    sizes: List[int],
+    build_tools: List[str],
+    scenarios: List[str],
+    projects_path: Path = DEFAULT_PROJECTS_PATH,
+    repeat: int = 1,
+) -> List[ScenarioResult]:
+    results: List[ScenarioResult] = []
+    for build_tool in build_tools:
+        for entities in sizes:
+            project_path = get_project_path(projects_path, entities, build_tool)
+            for scenario in scenarios:
+                results.append(
+                    run_scenario_in_subprocess(
+                        scenario, project_path, entities, build_tool, repeat
+                    )
+                )
+    return results
+
+
+def add_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--build-tools", nargs="+", choices=["maven", "gradle"], default=["maven"]
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--projects-path", type=Path, default=DEFAULT_PROJECTS_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+
+
+def print_results(results: List[ScenarioResult]) -> None:
+    header = (
+        f"{'scenario':<40} {'tool':<7} {'entities':>8} {'median (s)':>11} "
+        f"{'p95 (s)':>9} {'rss (MB)':>9} {'alloc (MB)':>11} {'parses':>7} {'rpc':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.scenario:<40} {r.build_tool:<7} {r.entities:>8} {r.median:>11.4f} "
+            f"{r.p95:>9.4f} {r.peak_rss_kb / 1024:>9.1f} {r.allocated_kb / 1024:>11.2f} "
+            f"{r.parse_count:>7} {r.rpc_count:>5}"
+        )
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        scenario, project_path, entities, build_tool, repeat = sys.argv[2:7]
+        result = run_scenario(
+            scenario, Path(project_path), int(entities), build_tool, int(repeat)
+        )
+        print(json.dumps(asdict(result)))
+        return
+    parser = ArgumentParser(description="Run nvim-javagenie benchmarks")
+    add_arguments(parser)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    results = run_benchmarks(
+        args.sizes, args.build_tools, args.scenarios, args.projects_path, args.repeat
+    )
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
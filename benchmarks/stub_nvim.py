@@ -0,0 +1,135 @@
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class StubBufferApi:
+    def __init__(self, buffer: "StubBuffer"):
+        self.buffer = buffer
+
+    def get_changedtick(self) -> int:
+        self.buffer.nvim.record("nvim_buf_get_changedtick", None)
+        return self.buffer.changedtick
+
+    def attach(self, send_buffer: bool, opts: Dict[str, Any]) -> bool:
+        # Events aren't sent, benchmarks apply them to the mirror themselves
+        self.buffer.nvim.record("nvim_buf_attach", opts)
+        return True
+
+
+class StubApi:
+    def __init__(self, nvim: "StubNvim"):
+        self.nvim = nvim
+
+    def call_atomic(self, calls: List[List[Any]]) -> List[Any]:
+        # One request for the whole batch, its calls are applied in order
+        self.nvim.record("nvim_call_atomic", calls)
+        results: List[Any] = []
+        for method, args in calls:
+            if method == "nvim_command":
+                self.nvim.run_command(args[0])
+            elif method == "nvim_buf_set_lines":
+                buffer = self.nvim.current.buffer
+                _, start, end, _, lines = args
+                buffer.lines[start : None if end == -1 else end] = lines
+                buffer.changedtick += 1
+            results.append(None)
+        return [results, None]
+
+
+class StubBuffer:
+    def __init__(self, nvim: "StubNvim", number: int, name: str, lines: List[str]):
+        self.nvim = nvim
+        self.number = number
+        self.name = name
+        self.lines = lines
+        self.changedtick = 1
+        self.api = StubBufferApi(self)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __getitem__(self, index):
+        self.nvim.record("nvim_buf_get_lines", self.lines[index])
+        return self.lines[index]
+
+    def __setitem__(self, index, value) -> None:
+        self.nvim.record("nvim_buf_set_lines", value)
+        self.lines[index] = value
+        self.changedtick += 1
+
+
+class StubCurrent:
+    def __init__(self, nvim: "StubNvim"):
+        self.nvim = nvim
+        self.buffer: StubBuffer = nvim.open_buffer(None)
+
+
+class StubFuncs:
+    def __init__(self, nvim: "StubNvim"):
+        self.nvim = nvim
+
+    def __getattr__(self, name: str):
+        def call(*args):
+            self.nvim.record(f"nvim_call_function:{name}", args)
+            if name == "getcwd":
+                return str(self.nvim.cwd)
+            if name == "stdpath":
+                # Caches stay inside the project so runs don't share state
+                return str(self.nvim.cwd.joinpath(".nvim", args[0]))
+            return None
+
+        return call
+
+
+class StubNvim:
+    # Stands in for pynvim's Nvim handle: every request is recorded with its
+    # payload size, buffers are kept in memory and nothing is written to disk.
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self.calls: List[Tuple[str, int]] = []
+        self.buffer_list: List[StubBuffer] = []
+        self.funcs = StubFuncs(self)
+        self.api = StubApi(self)
+        self.current = StubCurrent(self)
+
+    @property
+    def buffers(self) -> List[StubBuffer]:
+        self.record("nvim_list_bufs", None)
+        return list(self.buffer_list)
+
+    def record(self, method: str, payload: Any) -> None:
+        self.calls.append((method, len(repr(payload).encode("utf-8"))))
+
+    def reset(self) -> None:
+        self.calls = []
+
+    def get_call_counts(self) -> Dict[str, int]:
+        return dict(Counter(method for method, _ in self.calls))
+
+    def open_buffer(self, path: Optional[Path]) -> StubBuffer:
+        for buffer in self.buffer_list:
+            if path is not None and buffer.name == str(path):
+                return buffer
+        lines = [""]
+        if path is not None and path.exists():
+            lines = path.read_text("utf-8").split("\n")
+        buffer = StubBuffer(
+            self, len(self.buffer_list) + 1, str(path) if path else "", lines
+        )
+        self.buffer_list.append(buffer)
+        return buffer
+
+    def run_command(self, command: str) -> None:
+        if command.startswith("e "):
+            self.current.buffer = self.open_buffer(Path(command[2:].strip()))
+
+    def command(self, command: str) -> None:
+        self.record("nvim_command", command)
+        self.run_command(command)
+
+    def exec_lua(self, code: str, *args) -> None:
+        self.record("nvim_exec_lua", (code, args))
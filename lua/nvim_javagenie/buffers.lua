@@ -0,0 +1,60 @@
+local M = {}
+
+-- Resolved path of every Java buffer, kept current by autocmds so the plugin
+-- never has to list buffers and resolve their names itself.
+local paths = {}
+
+local function get_path(name)
+	if name == "" then
+		return nil
+	end
+	return vim.fn.resolve(vim.fn.fnamemodify(name, ":p"))
+end
+
+local function track(bufnr)
+	local name = vim.api.nvim_buf_get_name(bufnr)
+	if name:match("%.java$") then
+		paths[bufnr] = get_path(name)
+	else
+		paths[bufnr] = nil
+	end
+end
+
+local group = vim.api.nvim_create_augroup("JavagenieBuffers", { clear = true })
+vim.api.nvim_create_autocmd({ "BufAdd", "BufFilePost" }, {
+	group = group,
+	callback = function(event)
+		track(event.buf)
+	end,
+})
+vim.api.nvim_create_autocmd({ "BufDelete", "BufWipeout" }, {
+	group = group,
+	callback = function(event)
+		paths[event.buf] = nil
+	end,
+})
+
+-- Buffers opened before the module was loaded
+for _, bufnr in ipairs(vim.api.nvim_list_bufs()) do
+	track(bufnr)
+end
+
+-- One round trip for every open Java file: unmodified buffers match the file on
+-- disk, so only modified ones carry their lines.
+M.get_open_buffers = function()
+	local open_buffers = {}
+	for bufnr, path in pairs(paths) do
+		if vim.api.nvim_buf_is_loaded(bufnr) then
+			local modified = vim.bo[bufnr].modified
+			table.insert(open_buffers, {
+				path = path,
+				bufnr = bufnr,
+				modified = modified,
+				lines = modified and vim.api.nvim_buf_get_lines(bufnr, 0, -1, false) or nil,
+			})
+		end
+	end
+	return open_buffers
+end
+
+return M
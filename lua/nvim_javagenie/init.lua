@@ -1,5 +1,7 @@
 local M = {}
 
+local uv = vim.uv or vim.loop
+
 local function get_plugin_root()
 	local str = debug.getinfo(1, "S").source:sub(2)
 	return str:match("(.*/)lua/")
@@ -7,31 +9,142 @@ end
 
 local plugin_root = get_plugin_root()
 local venv_path = plugin_root .. "venv"
+local venv_python = venv_path .. "/bin/python"
+local pip_path = venv_path .. "/bin/pip"
+local requirements_path = plugin_root .. "requirements.txt"
+local rplugin_path = plugin_root .. "rplugin/python3"
+-- The venv stamp decides when pip runs, the rplugin stamp only when the
+-- remote plugin manifest is regenerated.
+local venv_stamp_path = venv_path .. "/.javagenie_stamp"
+local rplugin_stamp_path = venv_path .. "/.javagenie_rplugin_stamp"
 
--- Check if Python 3 is available
-if not vim.fn.has("python3") then
-	vim.cmd("echomsg ':python3 is not available, nvim-javagenie will not be loaded.'")
-	return
+local function read_file(path)
+	local fd = io.open(path, "r")
+	if not fd then
+		return nil
+	end
+	local content = fd:read("*a")
+	fd:close()
+	return content
 end
 
--- Create virtual environment if it doesn't exist
-if vim.fn.empty(vim.fn.glob(venv_path)) > 0 then
-	vim.fn.system({ "python3", "-m", "venv", venv_path })
+local function write_file(path, content)
+	local fd = io.open(path, "w")
+	if not fd then
+		return
+	end
+	fd:write(content)
+	fd:close()
 end
 
--- Install requirements if venv exists but requirements are not installed
-local pip_path = venv_path .. "/bin/pip"
-local requirements_path = plugin_root .. "requirements.txt"
+-- The interpreter is identified by its resolved path (which carries the
+-- version, e.g. python3.12) and mtime, so upgrading Python invalidates the stamp.
+local function get_python_key(python3_path)
+	local real_path = uv.fs_realpath(python3_path) or python3_path
+	local stat = uv.fs_stat(real_path)
+	return real_path .. ":" .. (stat and stat.mtime.sec or 0)
+end
 
--- TODO: check before installing?
-vim.fn.system({ pip_path, "install", "-r", requirements_path })
+-- Remote plugin manifests only need regenerating when the command modules change.
+local function get_rplugin_key()
+	local parts = {}
+	local handle = uv.fs_scandir(rplugin_path)
+	while handle do
+		local name, file_type = uv.fs_scandir_next(handle)
+		if not name then
+			break
+		end
+		if file_type == "file" and name:match("%.py$") then
+			local stat = uv.fs_stat(rplugin_path .. "/" .. name)
+			table.insert(parts, name .. ":" .. (stat and stat.mtime.sec or 0))
+		end
+	end
+	table.sort(parts)
+	return table.concat(parts, ",")
+end
 
--- Set Python host program
-vim.g.python3_host_prog = vim.fn.expand(venv_path .. "/bin/python")
+local function get_venv_stamp(python3_path)
+	return table.concat({
+		vim.fn.sha256(read_file(requirements_path) or ""),
+		get_python_key(python3_path),
+	}, "\n")
+end
+
+local function run_job(cmd, on_success)
+	local stderr = {}
+	local ok = vim.fn.jobstart(cmd, {
+		stderr_buffered = true,
+		on_stderr = function(_, data)
+			stderr = data or {}
+		end,
+		on_exit = function(_, code)
+			vim.schedule(function()
+				if code ~= 0 then
+					vim.notify(
+						"nvim-javagenie: '" .. table.concat(cmd, " ") .. "' failed:\n" .. table.concat(stderr, "\n"),
+						vim.log.levels.ERROR
+					)
+					return
+				end
+				on_success()
+			end)
+		end,
+	})
+	if ok <= 0 then
+		vim.notify("nvim-javagenie: unable to start '" .. cmd[1] .. "'", vim.log.levels.ERROR)
+	end
+end
 
-vim.schedule(function()
+local function update_remote_plugins(rplugin_stamp)
+	write_file(rplugin_stamp_path, rplugin_stamp)
 	vim.cmd("silent! UpdateRemotePlugins")
-end)
+	vim.notify("nvim-javagenie: commands updated, restart Neovim to load them", vim.log.levels.INFO)
+end
+
+local function bootstrap(python3_path, venv_stamp, rplugin_stamp)
+	local function finish()
+		write_file(venv_stamp_path, venv_stamp)
+		write_file(rplugin_stamp_path, rplugin_stamp)
+		vim.cmd("silent! UpdateRemotePlugins")
+		vim.notify("nvim-javagenie: environment ready, restart Neovim to load the commands", vim.log.levels.INFO)
+	end
+	local function install()
+		run_job({ pip_path, "install", "-r", requirements_path }, finish)
+	end
+	if uv.fs_stat(venv_python) then
+		install()
+	else
+		run_job({ python3_path, "-m", "venv", venv_path }, install)
+	end
+end
+
+-- Checking has("python3") would spin up the provider, so look for the executable instead
+local python3_path = vim.fn.exepath("python3")
+if python3_path == "" then
+	vim.cmd("echomsg 'python3 is not available, nvim-javagenie will not be loaded.'")
+	return M
+end
+
+-- Set Python host program
+vim.g.python3_host_prog = venv_python
+
+-- Steady state is a handful of stat calls. The venv is (re)built asynchronously
+-- only when the requirements or the interpreter changed; a change of the command
+-- modules only regenerates the remote plugin manifest.
+local venv_stamp = get_venv_stamp(python3_path)
+local rplugin_stamp = get_rplugin_key()
+if not uv.fs_stat(venv_python) or read_file(venv_stamp_path) ~= venv_stamp then
+	vim.schedule(function()
+		bootstrap(python3_path, venv_stamp, rplugin_stamp)
+	end)
+elseif read_file(rplugin_stamp_path) ~= rplugin_stamp then
+	vim.schedule(function()
+		update_remote_plugins(rplugin_stamp)
+	end)
+end
+
+-- Track open Java buffers from startup, the commands look them up by path
+require("nvim_javagenie.buffers")
 
 -- Keymaps
 vim.api.nvim_set_keymap("n", "<leader>cj", "", { noremap = true, silent = true, desc = "Java" })
@@ -47,6 +160,31 @@ vim.api.nvim_set_keymap(
 	":BuildAndRunProject<CR>",
 	{ noremap = true, silent = true, desc = "Build and run project" }
 )
+vim.api.nvim_set_keymap("n", "<leader>cjt", "", { noremap = true, silent = true, desc = "Tests" })
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjtt",
+	":RunTests nearest<CR>",
+	{ noremap = true, silent = true, desc = "Run nearest test" }
+)
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjtc",
+	":RunTests class<CR>",
+	{ noremap = true, silent = true, desc = "Run test class" }
+)
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjtf",
+	":RunTests failed<CR>",
+	{ noremap = true, silent = true, desc = "Rerun failed tests" }
+)
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjta",
+	":RunTests all<CR>",
+	{ noremap = true, silent = true, desc = "Run all tests" }
+)
 vim.api.nvim_set_keymap(
 	"n",
 	"<leader>cjn",
@@ -65,6 +203,12 @@ vim.api.nvim_set_keymap(
 	":CreateJPARepository<CR>",
 	{ noremap = true, silent = true, desc = "Create JPA Repository for this Entity" }
 )
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjJ",
+	":CreateJPARepository all<CR>",
+	{ noremap = true, silent = true, desc = "Create JPA Repositories for all Entities" }
+)
 vim.api.nvim_set_keymap("n", "<leader>cjf", "", { noremap = true, silent = true, desc = "Entity field creation" })
 vim.api.nvim_set_keymap(
 	"n",
@@ -84,6 +228,12 @@ vim.api.nvim_set_keymap(
 	":CreateEntityField enum<CR>",
 	{ noremap = true, silent = true, desc = "Create Entity enum field" }
 )
+vim.api.nvim_set_keymap(
+	"n",
+	"<leader>cjfm",
+	":CreateEntityField fields<CR>",
+	{ noremap = true, silent = true, desc = "Create several Entity fields" }
+)
 vim.api.nvim_set_keymap(
 	"n",
 	"<leader>cjr",
@@ -0,0 +1,33 @@
+local M = {}
+
+-- LSP FileChangeType
+local CREATED = 1
+local CHANGED = 2
+
+-- Called once per batch of files written by the plugin: tells the language
+-- servers about them, reloads buffers that have them open and optionally
+-- opens one of them.
+M.files_written = function(files, open_path)
+	local changes = {}
+	for _, file in ipairs(files) do
+		table.insert(changes, {
+			uri = vim.uri_from_fname(file.path),
+			type = file.created and CREATED or CHANGED,
+		})
+	end
+	local get_clients = vim.lsp.get_clients or vim.lsp.get_active_clients
+	for _, client in ipairs(get_clients()) do
+		local params = { changes = changes }
+		if vim.fn.has("nvim-0.11") == 1 then
+			client:notify("workspace/didChangeWatchedFiles", params)
+		else
+			client.notify("workspace/didChangeWatchedFiles", params)
+		end
+	end
+	vim.cmd.checktime()
+	if open_path ~= vim.NIL and open_path ~= nil then
+		vim.cmd("edit " .. vim.fn.fnameescape(open_path))
+	end
+end
+
+return M
@@ -1,83 +1,283 @@
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from pynvim.api.nvim import Nvim
 
 from constants.java_basic_types import JAVA_BASIC_TYPES
-from utils.build_helper import BuildHelper
-from utils.java_file_utils import JavaFileLib
-from utils.common_utils import CommonUtils
-from utils.entity_creation_utils import EntityCreationUtils
-from utils.entity_field_utils import EntityFieldUtils
-from utils.entity_rel_utils import EntityRelationshipUtils
-from utils.jpa_repo_utils import JpaRepositoryUtils
-from utils.logging import Logging
-from utils.path_utils import PathUtils
-from utils.treesitter_utils import TreesitterUtils
+
+if TYPE_CHECKING:
+    from utils.buffer_utils import BufferUtils
+    from utils.build_fingerprint_utils import BuildFingerprintUtils
+    from utils.build_helper import BuildHelper
+    from utils.java_file_utils import JavaFileLib
+    from utils.classpath_utils import ClasspathUtils
+    from utils.common_utils import CommonUtils
+    from utils.entity_creation_utils import EntityCreationUtils
+    from utils.entity_field_utils import EntityFieldUtils
+    from utils.entity_rel_utils import EntityRelationshipUtils
+    from utils.file_edit_utils import FileEditUtils
+    from utils.file_summary_utils import FileSummaryUtils
+    from utils.file_writer_utils import FileWriterUtils
+    from utils.formatter_utils import FormatterUtils
+    from utils.git_utils import GitUtils
+    from utils.jpa_repo_utils import JpaRepositoryUtils
+    from utils.logging import Logging
+    from utils.memory_utils import MemoryUtils
+    from utils.path_utils import PathUtils
+    from utils.profiling_utils import ProfilingUtils
+    from utils.project_index_utils import ProjectIndexUtils
+    from utils.rpc_utils import RpcUtils
+    from utils.tracing_utils import TracingUtils
+    from utils.treesitter_utils import TreesitterUtils
 
 
 class Base(object):
+    # Helpers pull in tree-sitter and the whole utils graph, so they are imported
+    # and constructed by their _create_* method on first access instead of when
+    # the remote plugin host loads the module. Resolving them through __getattr__
+    # keeps them out of dir(), so the host's handler discovery doesn't build them.
+    cwd: Path
+    logging: "Logging"
+    treesitter_utils: "TreesitterUtils"
+    path_utils: "PathUtils"
+    common_utils: "CommonUtils"
+    entity_creation_utils: "EntityCreationUtils"
+    jpa_repo_utils: "JpaRepositoryUtils"
+    entity_field_utils: "EntityFieldUtils"
+    entity_relationship_utils: "EntityRelationshipUtils"
+    java_file_utils: "JavaFileLib"
+    file_writer_utils: "FileWriterUtils"
+    formatter_utils: "FormatterUtils"
+    file_edit_utils: "FileEditUtils"
+    buffer_utils: "BufferUtils"
+    file_summary_utils: "FileSummaryUtils"
+    git_utils: "GitUtils"
+    project_index_utils: "ProjectIndexUtils"
+    classpath_utils: "ClasspathUtils"
+    build_helper: "BuildHelper"
+    build_fingerprint_utils: "BuildFingerprintUtils"
+    profiling_utils: "ProfilingUtils"
+    tracing_utils: "TracingUtils"
+    memory_utils: "MemoryUtils"
+    rpc_utils: "RpcUtils"
+
     def __init__(self, nvim: Nvim) -> None:
-        self.nvim = nvim
-        self.cwd = Path(self.nvim.funcs.getcwd()).resolve()
+        # Imported here, like the helpers, to keep it off the host's load path.
+        # Only the session is wrapped, nothing is requested while plugins load.
+        from utils.rpc_utils import RpcUtils
+
+        self.nvim = RpcUtils.instrument(nvim)
         self.ui_path = str(Path(__file__).parent.resolve().joinpath("ui"))
-        self.logging = Logging(self.nvim)
         self.java_basic_types = JAVA_BASIC_TYPES
-        self.treesitter_utils = TreesitterUtils(
+
+    def __getattr__(self, name: str) -> Any:
+        factory = getattr(type(self), f"_create_{name}", None)
+        if factory is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        value = factory(self)
+        setattr(self, name, value)
+        return value
+
+    def _create_cwd(self) -> Path:
+        return Path(self.nvim.funcs.getcwd()).resolve()
+
+    def _create_logging(self) -> "Logging":
+        from utils.logging import Logging
+
+        return Logging(self.nvim)
+
+    def _create_treesitter_utils(self) -> "TreesitterUtils":
+        from utils.treesitter_utils import TreesitterUtils
+
+        return TreesitterUtils(
             nvim=self.nvim,
             java_basic_types=self.java_basic_types,
             cwd=self.cwd,
             logging=self.logging,
         )
-        self.path_utils = PathUtils(
+
+    def _create_path_utils(self) -> "PathUtils":
+        from utils.path_utils import PathUtils
+
+        return PathUtils(
             cwd=self.cwd, treesitter_utils=self.treesitter_utils, logging=self.logging
         )
-        self.common_utils = CommonUtils(
+
+    def _create_common_utils(self) -> "CommonUtils":
+        from utils.common_utils import CommonUtils
+
+        return CommonUtils(
             cwd=self.cwd,
             path_utils=self.path_utils,
             treesitter_utils=self.treesitter_utils,
+            file_summary_utils=self.file_summary_utils,
+            project_index_utils=self.project_index_utils,
             logging=self.logging,
         )
-        self.entity_creation_utils = EntityCreationUtils(
+
+    def _create_entity_creation_utils(self) -> "EntityCreationUtils":
+        from utils.entity_creation_utils import EntityCreationUtils
+
+        return EntityCreationUtils(
             nvim=self.nvim,
             treesitter_utils=self.treesitter_utils,
             path_utils=self.path_utils,
             common_utils=self.common_utils,
+            file_writer_utils=self.file_writer_utils,
+            file_edit_utils=self.file_edit_utils,
             logging=self.logging,
         )
-        self.jpa_repo_utils = JpaRepositoryUtils(
+
+    def _create_jpa_repo_utils(self) -> "JpaRepositoryUtils":
+        from utils.jpa_repo_utils import JpaRepositoryUtils
+
+        return JpaRepositoryUtils(
             nvim=self.nvim,
             java_basic_types=self.java_basic_types,
             common_utils=self.common_utils,
             treesitter_utils=self.treesitter_utils,
             path_utils=self.path_utils,
+            file_writer_utils=self.file_writer_utils,
+            classpath_utils=self.classpath_utils,
             logging=self.logging,
         )
-        self.entity_field_utils = EntityFieldUtils(
+
+    def _create_entity_field_utils(self) -> "EntityFieldUtils":
+        from utils.entity_field_utils import EntityFieldUtils
+
+        return EntityFieldUtils(
             nvim=self.nvim,
             java_basic_types=self.java_basic_types,
             treesitter_utils=self.treesitter_utils,
             common_utils=self.common_utils,
+            file_edit_utils=self.file_edit_utils,
             logging=self.logging,
         )
-        self.entity_relationship_utils = EntityRelationshipUtils(
+
+    def _create_entity_relationship_utils(self) -> "EntityRelationshipUtils":
+        from utils.entity_rel_utils import EntityRelationshipUtils
+
+        return EntityRelationshipUtils(
             nvim=self.nvim,
             treesitter_utils=self.treesitter_utils,
             path_utils=self.path_utils,
             common_utils=self.common_utils,
+            file_edit_utils=self.file_edit_utils,
             logging=self.logging,
         )
-        self.java_file_utils = JavaFileLib(
+
+    def _create_java_file_utils(self) -> "JavaFileLib":
+        from utils.java_file_utils import JavaFileLib
+
+        return JavaFileLib(
             nvim=self.nvim,
             logging=self.logging,
             treesitter_utils=self.treesitter_utils,
             path_utils=self.path_utils,
             common_utils=self.common_utils,
+            file_writer_utils=self.file_writer_utils,
+        )
+
+    def _create_file_writer_utils(self) -> "FileWriterUtils":
+        from utils.file_writer_utils import FileWriterUtils
+
+        return FileWriterUtils(nvim=self.nvim, logging=self.logging)
+
+    def _create_formatter_utils(self) -> "FormatterUtils":
+        from utils.formatter_utils import FormatterUtils
+
+        return FormatterUtils(
+            treesitter_utils=self.treesitter_utils, logging=self.logging
+        )
+
+    def _create_file_edit_utils(self) -> "FileEditUtils":
+        from utils.file_edit_utils import FileEditUtils
+
+        return FileEditUtils(
+            treesitter_utils=self.treesitter_utils,
+            formatter_utils=self.formatter_utils,
+            logging=self.logging,
+        )
+
+    def _create_buffer_utils(self) -> "BufferUtils":
+        from utils.buffer_utils import BufferUtils
+
+        return BufferUtils(
+            nvim=self.nvim,
+            treesitter_utils=self.treesitter_utils,
+            logging=self.logging,
+        )
+
+    def _create_file_summary_utils(self) -> "FileSummaryUtils":
+        from utils.file_summary_utils import FileSummaryUtils
+
+        return FileSummaryUtils(
+            nvim=self.nvim,
+            file_writer_utils=self.file_writer_utils,
+            logging=self.logging,
+        )
+
+    def _create_git_utils(self) -> "GitUtils":
+        from utils.git_utils import GitUtils
+
+        return GitUtils(logging=self.logging)
+
+    def _create_project_index_utils(self) -> "ProjectIndexUtils":
+        from utils.project_index_utils import ProjectIndexUtils
+
+        return ProjectIndexUtils(
+            git_utils=self.git_utils,
+            file_summary_utils=self.file_summary_utils,
+            logging=self.logging,
+        )
+
+    def _create_classpath_utils(self) -> "ClasspathUtils":
+        from utils.classpath_utils import ClasspathUtils
+
+        return ClasspathUtils(
+            nvim=self.nvim, path_utils=self.path_utils, logging=self.logging
         )
-        self.build_helper = BuildHelper(
+
+    def _create_build_helper(self) -> "BuildHelper":
+        from utils.build_helper import BuildHelper
+
+        return BuildHelper(
             nvim=self.nvim,
             cwd=self.cwd,
             path_utils=self.path_utils,
             treesitter_utils=self.treesitter_utils,
             common_utils=self.common_utils,
+            build_fingerprint_utils=self.build_fingerprint_utils,
+            logging=self.logging,
+        )
+
+    def _create_build_fingerprint_utils(self) -> "BuildFingerprintUtils":
+        from utils.build_fingerprint_utils import BuildFingerprintUtils
+
+        return BuildFingerprintUtils(
+            nvim=self.nvim,
+            file_writer_utils=self.file_writer_utils,
             logging=self.logging,
         )
+
+    def _create_profiling_utils(self) -> "ProfilingUtils":
+        from utils.profiling_utils import ProfilingUtils
+
+        return ProfilingUtils(nvim=self.nvim, logging=self.logging)
+
+    def _create_tracing_utils(self) -> "TracingUtils":
+        from utils.tracing_utils import TracingUtils
+
+        return TracingUtils(nvim=self.nvim, logging=self.logging)
+
+    def _create_memory_utils(self) -> "MemoryUtils":
+        from utils.memory_utils import MemoryUtils
+
+        return MemoryUtils(nvim=self.nvim, logging=self.logging)
+
+    def _create_rpc_utils(self) -> "RpcUtils":
+        from utils.rpc_utils import RpcUtils
+
+        return RpcUtils(nvim=self.nvim, logging=self.logging)
@@ -0,0 +1,38 @@
+from typing import List, Optional
+
+from pynvim import plugin, rpc_export
+from pynvim.api import Buffer, Nvim
+
+from base import Base
+
+
+@plugin
+class BufferEvents(Base):
+    # nvim_buf_attach sends the events of every mirrored buffer to the host
+    # channel, whichever command attached to it. Only the handlers here keep
+    # the mirrors in sync.
+    def __init__(self, nvim: Nvim) -> None:
+        super().__init__(nvim)
+
+    @rpc_export("nvim_buf_lines_event")
+    def on_lines_event(
+        self,
+        buffer: Buffer,
+        changedtick: Optional[int],
+        first_line: int,
+        last_line: int,
+        lines: List[str],
+        more: bool,
+    ) -> None:
+        # more is only set for the initial send_buffer chunks, never requested
+        self.buffer_utils.apply_lines_event(
+            buffer.number, changedtick, first_line, last_line, lines
+        )
+
+    @rpc_export("nvim_buf_changedtick_event")
+    def on_changedtick_event(self, buffer: Buffer, changedtick: int) -> None:
+        self.buffer_utils.apply_changedtick_event(buffer.number, changedtick)
+
+    @rpc_export("nvim_buf_detach_event")
+    def on_detach_event(self, buffer: Buffer) -> None:
+        self.buffer_utils.remove_mirror(buffer.number)
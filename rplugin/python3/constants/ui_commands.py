@@ -0,0 +1,7 @@
+# Commands that open a UI and finish in a callback once it is confirmed
+UI_COMMANDS = [
+    "CreateEntityRelationship",
+    "CreateEntityField",
+    "CreateNewJPAEntity",
+    "CreateNewJavaFile",
+]
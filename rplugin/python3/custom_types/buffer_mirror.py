@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from tree_sitter import Parser, Tree
+
+Point = Tuple[int, int]
+
+
+@dataclass
+class BufferMirror:
+    bufnr: int
+    changedtick: int
+    # Lines are joined without a trailing newline, like buffer[:] is
+    lines: List[bytes]
+    content: bytes = field(init=False, repr=False)
+    tree: Optional["Tree"] = field(default=None, repr=False)
+    # The tree was edited but not parsed again yet
+    stale: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        self.content = b"\n".join(self.lines)
+
+    def get_line_offset(self, line: int) -> int:
+        return sum(len(v) + 1 for v in self.lines[:line])
+
+    def get_end_point(self, lines: List[bytes], first_line: int) -> Point:
+        # End of the last line, or of the line before an empty replacement
+        if lines:
+            return (first_line + len(lines) - 1, len(lines[-1]))
+        if first_line == 0:
+            return (0, 0)
+        return (first_line - 1, len(self.lines[first_line - 1]))
+
+    def apply_lines(self, first_line: int, last_line: int, lines: List[bytes]) -> None:
+        # Lines [first_line, last_line) were replaced, -1 stands for the end
+        line_count = len(self.lines)
+        if last_line < 0 or last_line > line_count:
+            last_line = line_count
+        old_lines = self.lines[first_line:last_line]
+        start_byte = self.get_line_offset(first_line)
+        if last_line < line_count or first_line == 0:
+            # Whole lines, each followed by the newline joining it to the rest
+            separator = b"\n" if last_line < line_count else b""
+            old_text = b"\n".join(old_lines) + separator if old_lines else b""
+            new_text = b"\n".join(lines) + separator if lines else b""
+            start_point: Point = (first_line, 0)
+            if last_line < line_count:
+                old_end_point: Point = (last_line, 0)
+                new_end_point: Point = (first_line + len(lines), 0)
+            else:
+                old_end_point = self.get_end_point(old_lines, first_line)
+                new_end_point = self.get_end_point(lines, first_line)
+        else:
+            # Trailing lines: the newline before them goes with them
+            start_byte -= 1
+            old_text = b"".join(b"\n" + v for v in old_lines)
+            new_text = b"".join(b"\n" + v for v in lines)
+            start_point = self.get_end_point([], first_line)
+            old_end_point = (
+                self.get_end_point(old_lines, first_line) if old_lines else start_point
+            )
+            new_end_point = (
+                self.get_end_point(lines, first_line) if lines else start_point
+            )
+        old_end_byte = start_byte + len(old_text)
+        new_end_byte = start_byte + len(new_text)
+        self.lines[first_line:last_line] = lines
+        self.content = (
+            self.content[:start_byte] + new_text + self.content[old_end_byte:]
+        )
+        if self.tree is not None:
+            self.tree.edit(
+                start_byte=start_byte,
+                old_end_byte=old_end_byte,
+                new_end_byte=new_end_byte,
+                start_point=start_point,
+                old_end_point=old_end_point,
+                new_end_point=new_end_point,
+            )
+            self.stale = True
+
+    def get_tree(self, parser: "Parser") -> "Tree":
+        # Only the edited ranges are parsed again. Callers get a tree of their
+        # own: reparsing unchanged content reuses every node, and later edits
+        # of the mirror's tree don't shift nodes a command still holds.
+        if self.tree is None:
+            self.tree = parser.parse(self.content)
+        elif self.stale:
+            self.tree = parser.parse(self.content, self.tree)
+        self.stale = False
+        return parser.parse(self.content, self.tree)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CodeStyle:
+    indent_unit: str
+    member_indent: str
+    closing_indent: str
+    line_width: int
+    member_blank_lines: int
@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from custom_types.trace_phase import TracePhase
+from custom_types.trace_span import TraceSpan
+
+
+@dataclass
+class CommandTrace:
+    command: str
+    start: float
+    duration: float = 0.0
+    failed: bool = False
+    spans: List[TraceSpan] = field(default_factory=list)
+    dropped_spans: int = 0
+    phase_totals: Dict[TracePhase, float] = field(default_factory=dict)
+    rpc_requests: int = 0
+    rpc_notifications: int = 0
+    rpc_bytes: int = 0
@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from tree_sitter import Tree
+
+
+@dataclass
+class FileEdit:
+    path: Path
+    tree: Optional["Tree"] = None
+    imports: List[str] = field(default_factory=list)
+    members: List[str] = field(default_factory=list)
+
+    def add_imports(self, imports: List[str]) -> None:
+        for import_path in imports:
+            if import_path not in self.imports:
+                self.imports.append(import_path)
@@ -1,20 +1,37 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-
-from tree_sitter import Tree
+from typing import TYPE_CHECKING, Callable, Optional
 
 from custom_types.declaration_type import DeclarationType
 
+if TYPE_CHECKING:
+    from tree_sitter import Tree
+
 
 @dataclass
 class JavaFileData:
     package_path: str
     file_name: str
     path: Path
-    tree: Tree
     declaration_type: DeclarationType
     is_jpa_entity: bool
     is_mapped_superclass: bool
+    # Data read from the summary cache comes without a tree, it is parsed on
+    # first access
+    parsed_tree: Optional["Tree"] = field(default=None, repr=False)
+    tree_loader: Optional[Callable[[Path], "Tree"]] = field(default=None, repr=False)
+
+    @property
+    def tree(self) -> "Tree":
+        if self.parsed_tree is None:
+            if self.tree_loader is None:
+                raise ValueError(f"No tree available for {str(self.path)}")
+            self.parsed_tree = self.tree_loader(self.path)
+        return self.parsed_tree
+
+    @tree.setter
+    def tree(self, tree: "Tree") -> None:
+        self.parsed_tree = tree
 
     def print(self) -> str:
         repr = (
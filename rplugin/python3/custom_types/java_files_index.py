@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from custom_types.java_file_data import JavaFileData
+
+
+@dataclass
+class JavaFilesIndex:
+    files: List[JavaFileData] = field(default_factory=list)
+    files_by_path: Dict[Path, JavaFileData] = field(init=False, default_factory=dict)
+    files_by_fqn: Dict[str, JavaFileData] = field(init=False, default_factory=dict)
+    # Several packages may declare the same simple name
+    files_by_name: Dict[str, List[JavaFileData]] = field(
+        init=False, default_factory=dict
+    )
+
+    def __post_init__(self) -> None:
+        for file_data in self.files:
+            self.files_by_path[file_data.path.resolve()] = file_data
+            self.files_by_fqn[self.get_fqn(file_data)] = file_data
+            self.files_by_name.setdefault(file_data.file_name, []).append(file_data)
+
+    def get_fqn(self, file_data: JavaFileData) -> str:
+        if not file_data.package_path:
+            return file_data.file_name
+        return f"{file_data.package_path}.{file_data.file_name}"
+
+    def get_by_path(self, file_path: Path) -> Optional[JavaFileData]:
+        return self.files_by_path.get(file_path.resolve())
+
+    def get_by_name(self, name: str) -> List[JavaFileData]:
+        # A fully qualified name matches at most one file
+        if "." in name:
+            file_data = self.files_by_fqn.get(name)
+            return [file_data] if file_data else []
+        return self.files_by_name.get(name, [])
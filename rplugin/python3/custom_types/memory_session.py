@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from tracemalloc import Snapshot
+
+
+@dataclass
+class MemorySession:
+    command: str
+    args: List[str]
+    snapshot: "Snapshot"
+    object_counts: Dict[str, int]
+    started_tracing: bool
+    awaiting_callback: bool = field(default=False)
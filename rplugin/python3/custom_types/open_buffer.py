@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass
+class OpenBuffer:
+    path: Path
+    bufnr: int
+    modified: bool
+    # Only modified buffers are fetched with their lines
+    lines: Optional[List[str]] = None
+
+    def get_bytes(self) -> bytes:
+        if self.lines is None:
+            raise ValueError(f"Lines of {str(self.path)} weren't fetched")
+        return "\n".join(self.lines).encode("utf-8")
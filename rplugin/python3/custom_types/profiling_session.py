@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from cProfile import Profile
+
+
+@dataclass
+class ProfilingSession:
+    command: str
+    args: List[str]
+    profile: "Profile"
+    started_at: float
+    awaiting_callback: bool = field(default=False)
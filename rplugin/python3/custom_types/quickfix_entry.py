@@ -0,0 +1,15 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Literal, Optional
+
+
+@dataclass
+class QuickfixEntry:
+    text: str
+    type: Literal["E", "W"] = "E"
+    # Failures that aren't about a source file have no location
+    filename: Optional[str] = None
+    lnum: int = 0
+    col: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class TestFilter:
+    # Fully qualified, nested classes are joined with $ like in class files
+    class_name: str
+    # None runs the whole class
+    method_name: Optional[str] = None
+    file_path: Optional[Path] = field(default=None, compare=False)
+
+    @property
+    def top_level_class_name(self) -> str:
+        return self.class_name.split("$")[0]
+
+    def get_gradle_pattern(self) -> str:
+        if self.method_name is None:
+            return self.class_name
+        return f"{self.class_name}.{self.method_name}"
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class TracePhase(Enum):
+    COMMAND = "command"
+    FILE_ENUMERATION = "file_enumeration"
+    PARSE = "parse"
+    QUERY = "query"
+    TEMPLATE_GENERATION = "template_generation"
+    IMPORT_INSERTION = "import_insertion"
+    FORMATTING = "formatting"
+    BUFFER_WRITE = "buffer_write"
+    SUBPROCESS = "subprocess"
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+from custom_types.trace_phase import TracePhase
+
+
+@dataclass
+class TraceSpan:
+    name: str
+    phase: TracePhase
+    start: float
+    duration: float = 0.0
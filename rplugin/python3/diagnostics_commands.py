@@ -0,0 +1,85 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from pynvim import plugin, command
+from pynvim.api import Nvim
+
+from base import Base
+from custom_types.log_level import LogLevel
+
+
+@plugin
+class DiagnosticsCommands(Base):
+    def __init__(self, nvim: Nvim) -> None:
+        super().__init__(nvim)
+        self.debug: bool = False
+
+    @command("JavaGenieProfile", nargs="+", complete="command")
+    def profile_command(self, args: List[str]) -> None:
+        self.debug = True if "debug" in args else False
+        if args[0] == "stop":
+            self.profiling_utils.finish_session(self.debug)
+            return
+        if not args[0][0].isupper():
+            error_msg = f"'{args[0]}' is not a plugin command"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        self.profiling_utils.start_session(args, self.debug)
+
+    @command("JavaGenieMemory", nargs="+", complete="command")
+    def memory_command(self, args: List[str]) -> None:
+        self.debug = True if "debug" in args else False
+        if args[0] == "stop":
+            self.memory_utils.finish_session(self.debug)
+            return
+        if not args[0][0].isupper():
+            error_msg = f"'{args[0]}' is not a plugin command"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        self.memory_utils.start_session(args, self.debug)
+
+    @command("JavaGenieStats", nargs="*", complete="file")
+    def stats_command(self, args: List[str]) -> None:
+        self.debug = True if "debug" in args else False
+        args = [a for a in args if a != "debug"]
+        if len(args) > 2 or (len(args) > 0 and args[0] != "export"):
+            error_msg = "Usage: JavaGenieStats [export [file]]"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        if len(args) == 0:
+            self.logging.open_scratch_buffer(self.tracing_utils.get_stats_summary())
+            return
+        if len(args) == 2:
+            trace_path = Path(args[1]).expanduser().resolve()
+        else:
+            trace_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+                "nvim-javagenie",
+                "traces",
+                f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json",
+            )
+        self.tracing_utils.export_chrome_trace(trace_path, self.debug)
+        self.logging.echomsg(f"Trace written to {str(trace_path)}")
+
+    @command("JavaGenieRecord", nargs="+", complete="file")
+    def record_command(self, args: List[str]) -> None:
+        self.debug = True if "debug" in args else False
+        args = [a for a in args if a != "debug"]
+        if args[0] == "start" and len(args) == 1:
+            self.rpc_utils.start_recording(self.debug)
+            self.logging.echomsg("Recording RPC traffic of plugin commands")
+            return
+        if args[0] != "stop" or len(args) > 2:
+            error_msg = "Usage: JavaGenieRecord start | stop [file]"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        if len(args) == 2:
+            recording_path = Path(args[1]).expanduser().resolve()
+        else:
+            recording_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+                "nvim-javagenie",
+                "recordings",
+                f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.msgpack",
+            )
+        self.rpc_utils.stop_recording(recording_path, self.debug)
+        self.logging.echomsg(f"Recording written to {str(recording_path)}")
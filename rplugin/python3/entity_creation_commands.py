@@ -5,6 +5,7 @@ from pynvim.api import Nvim
 from base import Base
 from custom_types.create_entity_args import CreateEntityArgs
 from custom_types.log_level import LogLevel
+from utils.instrumentation import instrumented
 
 
 @plugin
@@ -14,6 +15,7 @@ class EntityCreationCommands(Base):
         self.debug: bool = False
 
     @command("CreateNewJPAEntity", nargs="*")
+    @instrumented("command")
     def create_new_jpa_entity(self, args: List[str]) -> None:
         self.logging.reset_log_file()
         if len(args) > 1:
@@ -46,6 +48,7 @@ class EntityCreationCommands(Base):
         )
 
     @function("CreateNewJpaEntityCallback")
+    @instrumented("callback")
     def many_to_one_callback(self, args: List[Dict]):
         converted_args = CreateEntityArgs(**args[0])
         if self.debug:
@@ -1,10 +1,9 @@
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional
 
 from pynvim import plugin, command, function
 
 from pynvim.api import Nvim
-from tree_sitter import Tree
 
 from base import Base
 from custom_types.declaration_type import DeclarationType
@@ -13,6 +12,10 @@ from custom_types.java_file_data import JavaFileData
 from custom_types.create_id_field_args import CreateIdEntityFieldArgs
 from custom_types.create_basic_field_args import CreateBasicEntityFieldArgs
 from custom_types.create_enum_field_args import CreateEnumEntityFieldArgs
+from utils.instrumentation import instrumented
+
+if TYPE_CHECKING:
+    from tree_sitter import Tree
 
 
 @plugin
@@ -22,7 +25,9 @@ class EntityFieldCommands(Base):
         self.all_java_files: List[JavaFileData] = []
         self.data: List[Dict[str, str]] = []
         self.buffer_file_data: Optional[JavaFileData] = None
-        self.ui_file: Literal["basic_field.lua", "id_field.lua", "enum_field.lua"]
+        self.ui_file: Literal[
+            "basic_field.lua", "id_field.lua", "enum_field.lua", "field_specs.lua"
+        ]
         self.debug: bool = False
 
     def process_command_args(self, args: List[str]) -> None:
@@ -58,13 +63,11 @@ class EntityFieldCommands(Base):
                     for v in self.java_basic_types
                     if v[0] in ["Long", "Integer", "String", "UUID"]
                 ]
-            case "enum":
-                self.ui_file = "enum_field.lua"
-                all_enum_files = [
-                    f
-                    for f in self.all_java_files
-                    if f.declaration_type == DeclarationType.ENUM
-                ]
+            case "enum" | "fields":
+                self.ui_file = (
+                    "enum_field.lua" if args[0] == "enum" else "field_specs.lua"
+                )
+                all_enum_files = self.get_enum_files()
                 self.data = [
                     {
                         "name": f"{v.file_name} ({v.package_path})",
@@ -79,25 +82,25 @@ class EntityFieldCommands(Base):
                 self.logging.log(error_msg, LogLevel.ERROR)
                 raise FileNotFoundError(error_msg)
 
+    def get_enum_files(self) -> List[JavaFileData]:
+        return [
+            f for f in self.all_java_files if f.declaration_type == DeclarationType.ENUM
+        ]
+
     def get_buffer_file_data(
-        self, current_buffer_tree: Tree, buffer_path: Path, debug: bool = False
+        self, current_buffer_tree: "Tree", buffer_path: Path, debug: bool = False
     ) -> JavaFileData:
-        for file in self.all_java_files:
-            if file.path == buffer_path:
-                file.tree = current_buffer_tree
-                return file
-        error_msg = "Unable to get owning side buffer data"
-        if debug:
-            self.logging.log(error_msg, LogLevel.ERROR)
-        raise FileNotFoundError(error_msg)
+        file = self.common_utils.get_java_file_data_by_path(buffer_path, debug)
+        file.tree = current_buffer_tree
+        return file
 
     @command("CreateEntityField", nargs="*")
+    @instrumented("command")
     def create_entity_field(self, args) -> None:
         self.process_command_args(args)
-        buffer_tree = self.treesitter_utils.convert_buffer_to_tree(
-            self.nvim.current.buffer
-        )
-        buffer_path = Path(self.nvim.current.buffer.name)
+        buffer = self.nvim.current.buffer
+        buffer_tree = self.buffer_utils.get_buffer_tree(buffer, self.debug)
+        buffer_path = Path(buffer.name)
         self.buffer_file_data = self.get_buffer_file_data(
             buffer_tree, buffer_path, self.debug
         )
@@ -115,6 +118,7 @@ class EntityFieldCommands(Base):
             )
 
     @function("CreateBasicEntityFieldCallback")
+    @instrumented("callback")
     def crease_basic_entity_field_callback(self, args: List[Dict]):
         converted_args = CreateBasicEntityFieldArgs(**args[0])
         if self.debug:
@@ -127,6 +131,7 @@ class EntityFieldCommands(Base):
             )
 
     @function("CreateEnumEntityFieldCallback")
+    @instrumented("callback")
     def crease_enum_entity_field_callback(self, args):
         converted_args = CreateEnumEntityFieldArgs(**args[0])
         if self.debug:
@@ -139,6 +144,7 @@ class EntityFieldCommands(Base):
             )
 
     @function("CreateIdEntityFieldCallback")
+    @instrumented("callback")
     def crease_id_entity_field_callback(self, args: List[Dict]):
         converted_args = CreateIdEntityFieldArgs(**args[0])
         if self.debug:
@@ -149,3 +155,16 @@ class EntityFieldCommands(Base):
                 args=converted_args,
                 debug=self.debug,
             )
+
+    @function("CreateEntityFieldsCallback")
+    @instrumented("callback")
+    def create_entity_fields_callback(self, args: List[Dict]):
+        fields_args = self.entity_field_utils.parse_field_specs(
+            args[0]["lines"], self.debug
+        )
+        if self.buffer_file_data:
+            self.entity_field_utils.create_entity_fields(
+                buffer_file_data=self.buffer_file_data,
+                fields_args=fields_args,
+                debug=self.debug,
+            )
@@ -1,9 +1,8 @@
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional
 
 from pynvim import plugin, command, function
 from pynvim.api import Nvim
-from tree_sitter import Tree
 
 from base import Base
 from custom_types.java_file_data import JavaFileData
@@ -11,6 +10,10 @@ from custom_types.log_level import LogLevel
 from custom_types.create_many_to_one_args import CreateManyToOneRelArgs
 from custom_types.create_one_to_one_args import CreateOneToOneRelArgs
 from custom_types.create_many_to_many_args import CreateManyToManyRelArgs
+from utils.instrumentation import instrumented
+
+if TYPE_CHECKING:
+    from tree_sitter import Tree
 
 
 @plugin
@@ -45,38 +48,41 @@ class EntityRelationshipCommands(Base):
         self.all_java_files = self.common_utils.get_all_java_files_data(self.debug)
 
     def get_owning_side_file_data(
-        self, current_buffer_tree: Tree, buffer_path: Path, debug: bool = False
+        self, current_buffer_tree: "Tree", buffer_path: Path, debug: bool = False
     ) -> JavaFileData:
-        for file in self.all_java_files:
-            if file.path == buffer_path:
-                file.tree = current_buffer_tree
-                return file
-        error_msg = "Unable to get owning side buffer data"
-        if debug:
-            self.logging.log(error_msg, LogLevel.ERROR)
-        raise FileNotFoundError(error_msg)
+        file = self.common_utils.get_java_file_data_by_path(buffer_path, debug)
+        file.tree = current_buffer_tree
+        return file
 
     def get_inverse_side_file_data(
-        self, field_type: str, debug: bool = False
+        self, field_type: str, field_path: Optional[str], debug: bool = False
     ) -> JavaFileData:
-        for file in self.all_java_files:
-            if file.file_name == field_type:
-                for buf in self.nvim.buffers:
-                    if buf.name and Path(buf.name).resolve() == file.path:
-                        file.tree = self.treesitter_utils.convert_buffer_to_tree(buf)
-                return file
-        error_msg = "Unable to get inverse side buffer data"
-        if debug:
-            self.logging.log(error_msg, LogLevel.ERROR)
-        raise FileNotFoundError(error_msg)
+        # The UIs send the path of the selected Entity, which tells apart Entities
+        # with the same name in different packages
+        file = (
+            self.common_utils.get_java_file_data_by_path(Path(field_path), debug)
+            if field_path
+            else self.common_utils.get_java_file_data_by_name(
+                field_type, entities_only=True, debug=debug
+            )
+        )
+        # Unsaved changes of the inverse side are kept, unmodified buffers match
+        # the file on disk
+        open_buffers = self.buffer_utils.get_open_buffers(debug)
+        modified_buffer = self.buffer_utils.get_modified_buffer(open_buffers, file.path)
+        if modified_buffer is not None:
+            file.tree = self.treesitter_utils.convert_bytes_to_tree(
+                modified_buffer.get_bytes()
+            )
+        return file
 
     @command("CreateEntityRelationship", nargs="*")
+    @instrumented("command")
     def create_entity_relationship(self, args) -> None:
         self.process_command_args(args)
-        buffer_tree = self.treesitter_utils.convert_buffer_to_tree(
-            self.nvim.current.buffer
-        )
-        buffer_path = Path(self.nvim.current.buffer.name)
+        buffer = self.nvim.current.buffer
+        buffer_tree = self.buffer_utils.get_buffer_tree(buffer, self.debug)
+        buffer_path = Path(buffer.name)
         self.owning_side_file_data = self.get_owning_side_file_data(
             buffer_tree, buffer_path, self.debug
         )
@@ -95,12 +101,14 @@ class EntityRelationshipCommands(Base):
         )
 
     @function("ManyToOneCallback")
+    @instrumented("callback")
     def many_to_one_callback(self, args: List[Dict]):
+        inverse_field_path = args[0].pop("inverse_field_path", None)
         converted_args = CreateManyToOneRelArgs(**args[0])
         if self.debug:
             self.logging.log(f"Converted args: {converted_args}", LogLevel.DEBUG)
         self.inverse_side_file_data = self.get_inverse_side_file_data(
-            args[0]["inverse_field_type"]
+            converted_args.inverse_field_type, inverse_field_path, self.debug
         )
         if self.owning_side_file_data and self.inverse_side_file_data:
             self.entity_relationship_utils.create_many_to_one_relationship_field(
@@ -111,12 +119,14 @@ class EntityRelationshipCommands(Base):
             )
 
     @function("OneToOneCallback")
+    @instrumented("callback")
     def one_to_one_callback(self, args):
+        inverse_field_path = args[0].pop("inverse_field_path", None)
         converted_args = CreateOneToOneRelArgs(**args[0])
         if self.debug:
             self.logging.log(f"Converted args: {converted_args}", LogLevel.DEBUG)
         self.inverse_side_file_data = self.get_inverse_side_file_data(
-            args[0]["inverse_field_type"]
+            converted_args.inverse_field_type, inverse_field_path, self.debug
         )
         if self.owning_side_file_data and self.inverse_side_file_data:
             self.entity_relationship_utils.create_one_to_one_relationship_field(
@@ -127,12 +137,14 @@ class EntityRelationshipCommands(Base):
             )
 
     @function("ManyToManyCallback")
+    @instrumented("callback")
     def many_to_many_callback(self, args: List[Dict]):
+        inverse_field_path = args[0].pop("inverse_field_path", None)
         converted_args = CreateManyToManyRelArgs(**args[0])
         if self.debug:
             self.logging.log(f"Converted args: {converted_args}", LogLevel.DEBUG)
         self.inverse_side_file_data = self.get_inverse_side_file_data(
-            args[0]["inverse_field_type"]
+            converted_args.inverse_field_type, inverse_field_path, self.debug
         )
         if self.owning_side_file_data and self.inverse_side_file_data:
             self.entity_relationship_utils.create_many_to_many_relationship_field(
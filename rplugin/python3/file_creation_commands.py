@@ -5,6 +5,7 @@ from pynvim.api import Nvim
 from base import Base
 from custom_types.log_level import LogLevel
 from custom_types.create_java_file_args import CreateJavaFileArgs
+from utils.instrumentation import instrumented
 
 
 @plugin
@@ -14,6 +15,7 @@ class JavaFileCreationCommands(Base):
         self.debug: bool = False
 
     @command("CreateNewJavaFile", nargs="*")
+    @instrumented("command")
     def create_java_file(self, args: List[str]) -> None:
         self.logging.reset_log_file()
         if len(args) > 1:
@@ -31,6 +33,7 @@ class JavaFileCreationCommands(Base):
         )
 
     @function("CreateNewJavaFileCallback")
+    @instrumented("callback")
     def create_new_java_file_callback(self, args: List[Dict]):
         converted_args = CreateJavaFileArgs(**args[0])
         if self.debug:
@@ -5,6 +5,7 @@ from pynvim import List, command, plugin
 
 from base import Base
 from custom_types.log_level import LogLevel
+from utils.instrumentation import instrumented
 
 
 @plugin
@@ -13,14 +14,18 @@ class JpaRepoCommands(Base):
         super().__init__(nvim)
 
     @command("CreateJPARepository", nargs="*")
+    @instrumented("command")
     def create_jpa_repo_repository(self, args: List[str]) -> None:
         self.logging.reset_log_file()
         self.logging.log(args, LogLevel.DEBUG)
-        if len(args) > 1:
+        if len(args) > 2:
             error_msg = "At least one and max 2 arguments allowed"
             self.logging.log(error_msg, LogLevel.ERROR)
             raise ValueError(error_msg)
         self.debug = True if "debug" in args else False
+        if "all" in args:
+            self.jpa_repo_utils.create_all_jpa_repositories(debug=self.debug)
+            return
         buffer_path = Path(self.nvim.current.buffer.name)
         self.jpa_repo_utils.create_jpa_repository(
             buffer_path=buffer_path, debug=self.debug
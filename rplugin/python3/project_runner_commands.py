@@ -1,8 +1,11 @@
+from pathlib import Path
 from pynvim.api import Nvim
 from pynvim import List, command, plugin
 
 from base import Base
 from custom_types.log_level import LogLevel
+from custom_types.test_filter import TestFilter
+from utils.instrumentation import instrumented
 
 
 @plugin
@@ -12,23 +15,64 @@ class JpaRepoCommands(Base):
         self.debug: bool = False
 
     @command("BuildAndRunProject", nargs="*")
+    @instrumented("command")
     def build_and_run_project(self, args: List[str]) -> None:
         self.logging.reset_log_file()
         self.logging.log(args, LogLevel.DEBUG)
-        if len(args) > 1:
-            error_msg = "Only one argument allowed"
+        if len(args) > 2:
+            error_msg = "Max 2 arguments allowed"
             self.logging.log(error_msg, LogLevel.ERROR)
             raise ValueError(error_msg)
         self.debug = True if "debug" in args else False
-        self.build_helper.run(self.debug)
+        fail_fast = "fail-fast" in args
+        self.build_helper.run(fail_fast, self.debug)
 
     @command("BuildProject", nargs="*")
+    @instrumented("command")
     def build__project(self, args: List[str]) -> None:
         self.logging.reset_log_file()
         self.logging.log(args, LogLevel.DEBUG)
-        if len(args) > 1:
-            error_msg = "Only one argument allowed"
+        if len(args) > 2:
+            error_msg = "Max 2 arguments allowed"
             self.logging.log(error_msg, LogLevel.ERROR)
             raise ValueError(error_msg)
         self.debug = True if "debug" in args else False
-        self.build_helper.build(self.debug)
+        fail_fast = "fail-fast" in args
+        self.build_helper.build(fail_fast, self.debug)
+
+    @command("RunTests", nargs="*")
+    @instrumented("command")
+    def run_tests(self, args: List[str]) -> None:
+        self.logging.reset_log_file()
+        self.logging.log(args, LogLevel.DEBUG)
+        if len(args) > 3:
+            error_msg = "Max 3 arguments allowed"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        self.debug = True if "debug" in args else False
+        fail_fast = "fail-fast" in args
+        scopes = [a for a in args if a not in ["debug", "fail-fast"]]
+        scope = scopes[0] if scopes else "nearest"
+        if scope not in ["nearest", "class", "failed", "all"]:
+            error_msg = f"Invalid test scope: {scope}"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        test_filters: List[TestFilter] = []
+        if scope == "failed":
+            test_filters = self.build_helper.failed_tests
+            if not test_filters:
+                self.logging.echomsg("No failed tests to rerun")
+                return
+        elif scope != "all":
+            buffer = self.nvim.current.buffer
+            row, col = self.nvim.current.window.cursor
+            tree = self.buffer_utils.get_buffer_tree(buffer, self.debug)
+            test_filter = self.build_helper.get_test_filter(
+                tree,
+                (row - 1, col),
+                Path(buffer.name),
+                scope == "class",
+                self.debug,
+            )
+            test_filters.append(test_filter)
+        self.build_helper.run_tests(test_filters, fail_fast, self.debug)
@@ -0,0 +1,56 @@
+local args = ...
+
+local enums = args[2]
+local snaked_class_name = args[3]
+
+-- A scratch buffer takes one field per line and :w creates them all at once
+local lines = {
+	"# New attributes of " .. snaked_class_name .. ", one per line. :w creates them, :q cancels.",
+	"#",
+	"#   <name> <type> [mandatory] [unique] [lob] [option=value ...]",
+	"#",
+	"# Types are basic types (String, int, LocalDate, java.sql.Date) or enums of the project.",
+	"# Options: length, precision, scale, temporal, time_zone_storage, enum_type.",
+	"#",
+	"#   name String length=120 mandatory",
+	"#   age int mandatory",
+	"#   amount BigDecimal precision=19 scale=2",
+	"#   createdAt OffsetDateTime time_zone_storage=NORMALIZE_UTC",
+}
+if #enums > 0 then
+	table.insert(lines, "#")
+	table.insert(lines, "# Enums:")
+	for _, enum in ipairs(enums) do
+		table.insert(lines, "#   " .. enum.name)
+	end
+end
+table.insert(lines, "")
+
+local origin_win = vim.api.nvim_get_current_win()
+vim.cmd("botright new")
+local buf = vim.api.nvim_get_current_buf()
+vim.api.nvim_buf_set_name(buf, "javagenie://fields/" .. snaked_class_name)
+vim.bo[buf].buftype = "acwrite"
+vim.bo[buf].bufhidden = "wipe"
+vim.bo[buf].swapfile = false
+vim.bo[buf].filetype = "conf"
+vim.api.nvim_buf_set_lines(buf, 0, -1, false, lines)
+vim.bo[buf].modified = false
+vim.api.nvim_win_set_cursor(0, { #lines, 0 })
+
+vim.api.nvim_create_autocmd("BufWriteCmd", {
+	buffer = buf,
+	callback = function()
+		local spec_lines = vim.api.nvim_buf_get_lines(buf, 0, -1, false)
+		-- The Entity is edited from its own window, the specs stay open on errors
+		if vim.api.nvim_win_is_valid(origin_win) then
+			vim.api.nvim_set_current_win(origin_win)
+		end
+		local ok, err = pcall(vim.call, "CreateEntityFieldsCallback", { lines = spec_lines })
+		if not ok then
+			vim.notify(tostring(err), vim.log.levels.ERROR)
+			return
+		end
+		vim.api.nvim_buf_delete(buf, { force = true })
+	end,
+})
@@ -18,6 +18,7 @@ local signal = n.create_signal({
 	next_btn_hidden = true,
 	active_tab = "owning_side",
 	inverse_field_type = nil,
+	inverse_field_path = nil,
 	fetch_type = "lazy",
 	collection_type = "set",
 	mapping_type = "unidirectional_join_column",
@@ -63,6 +64,7 @@ local function render_field_type_component(_signal, options)
 			end
 			selected_node.is_done = true
 			_signal.inverse_field_type = selected_node.type
+			_signal.inverse_field_path = selected_node.id
 			tree:render()
 		end,
 		prepare_node = function(node, line, _)
@@ -173,6 +175,7 @@ local function render_confirm_button()
 		on_press = function()
 			local result = {
 				inverse_field_type = signal.inverse_field_type:get_value(),
+				inverse_field_path = signal.inverse_field_path:get_value(),
 				fetch_type = signal.fetch_type:get_value(),
 				collection_type = signal.collection_type:get_value(),
 				mapping_type = signal.mapping_type:get_value(),
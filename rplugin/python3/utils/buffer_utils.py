@@ -0,0 +1,115 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pynvim.api import Buffer
+from pynvim.api.nvim import Nvim
+from tree_sitter import Tree
+
+from custom_types.buffer_mirror import BufferMirror
+from custom_types.log_level import LogLevel
+from custom_types.open_buffer import OpenBuffer
+from custom_types.trace_phase import TracePhase
+from utils.logging import Logging
+from utils.tracing_utils import TracingUtils, traced
+from utils.treesitter_utils import TreesitterUtils
+
+
+class BufferUtils:
+    # The Lua side keeps the resolved path of every Java buffer current through
+    # autocmds, a snapshot of them costs a single round trip.
+    # Buffers commands ran on are mirrored: the plugin attaches to them and
+    # applies their change events, so later commands don't fetch them again.
+    # Events reach a single plugin instance, the mirrors are shared by all.
+    mirrors: Dict[int, BufferMirror] = {}
+
+    def __init__(self, nvim: Nvim, treesitter_utils: TreesitterUtils, logging: Logging):
+        self.nvim = nvim
+        self.treesitter_utils = treesitter_utils
+        self.logging = logging
+
+    def get_open_buffers(self, debug: bool = False) -> Dict[Path, OpenBuffer]:
+        entries = self.nvim.exec_lua(
+            "return require('nvim_javagenie.buffers').get_open_buffers()"
+        )
+        open_buffers: Dict[Path, OpenBuffer] = {}
+        for entry in entries or []:
+            open_buffer = OpenBuffer(
+                path=Path(entry["path"]),
+                bufnr=entry["bufnr"],
+                modified=entry["modified"],
+                lines=entry.get("lines"),
+            )
+            open_buffers[open_buffer.path] = open_buffer
+        if debug:
+            self.logging.log(
+                [
+                    f"Open buffers: {len(open_buffers)}",
+                    "Modified buffers: "
+                    f"{[str(p) for p, b in open_buffers.items() if b.modified]}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return open_buffers
+
+    def get_modified_buffer(
+        self,
+        open_buffers: Dict[Path, OpenBuffer],
+        file_path: Path,
+    ) -> Optional[OpenBuffer]:
+        open_buffer = open_buffers.get(file_path.resolve())
+        if open_buffer is None or not open_buffer.modified:
+            return None
+        return open_buffer
+
+    def encode_lines(self, lines: List[str]) -> List[bytes]:
+        return [v.encode("utf-8") for v in lines]
+
+    @traced(TracePhase.PARSE)
+    def get_buffer_tree(self, buffer: Buffer, debug: bool = False) -> Tree:
+        changedtick = buffer.api.get_changedtick()
+        mirror = self.mirrors.get(buffer.number)
+        hit = mirror is not None and mirror.changedtick == changedtick
+        TracingUtils.record_cache_access("buffer_mirrors", hit)
+        if mirror is None or not hit:
+            # Events may have been missed if the ticks differ, start over
+            if mirror is None and not buffer.api.attach(False, {}):
+                return self.treesitter_utils.convert_buffer_to_tree(buffer)
+            mirror = BufferMirror(
+                bufnr=buffer.number,
+                changedtick=changedtick,
+                lines=self.encode_lines(buffer[:]),
+            )
+            self.mirrors[buffer.number] = mirror
+        if debug:
+            self.logging.log(
+                [
+                    f"Buffer: {buffer.number}",
+                    f"Changedtick: {changedtick}",
+                    f"Mirrored: {hit}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return mirror.get_tree(self.treesitter_utils.parser)
+
+    def apply_lines_event(
+        self,
+        bufnr: int,
+        changedtick: Optional[int],
+        first_line: int,
+        last_line: int,
+        lines: List[str],
+    ) -> None:
+        mirror = self.mirrors.get(bufnr)
+        if mirror is None:
+            return
+        mirror.apply_lines(first_line, last_line, self.encode_lines(lines))
+        # Without a tick the mirror can't be trusted, the next command refetches
+        mirror.changedtick = changedtick if changedtick is not None else -1
+
+    def apply_changedtick_event(self, bufnr: int, changedtick: int) -> None:
+        mirror = self.mirrors.get(bufnr)
+        if mirror is not None:
+            mirror.changedtick = changedtick
+
+    def remove_mirror(self, bufnr: int) -> None:
+        self.mirrors.pop(bufnr, None)
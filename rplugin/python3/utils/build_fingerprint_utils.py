@@ -0,0 +1,198 @@
+import json
+from hashlib import blake2b
+from os import scandir
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pynvim.api.nvim import Nvim
+
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.file_writer_utils import FileWriterUtils
+from utils.logging import Logging
+from utils.tracing_utils import TracingUtils, traced
+
+# Relative path -> [mtime_ns, size, content digest or None]
+Fingerprint = Dict[str, List]
+
+FINGERPRINTS_VERSION = 1
+BUILD_SCRIPT_NAMES = {
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "settings.gradle",
+    "settings.gradle.kts",
+    "gradle.properties",
+}
+# Wrapper settings and version catalogs
+BUILD_CONFIG_DIRS = {".mvn", "gradle"}
+# Build outputs and tool state, skipped outside of source directories
+IGNORED_DIRS = {"target", "build", "bin", "out", "node_modules"}
+
+
+class BuildFingerprintUtils:
+    # Remembers the inputs of the last successful build of each project and the
+    # artifact it produced, so an unchanged project is launched without building
+    def __init__(
+        self, nvim: Nvim, file_writer_utils: FileWriterUtils, logging: Logging
+    ):
+        self.nvim = nvim
+        self.file_writer_utils = file_writer_utils
+        self.logging = logging
+        self.fingerprints_path: Optional[Path] = None
+
+    def get_fingerprints_path(self) -> Path:
+        if self.fingerprints_path is None:
+            self.fingerprints_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+                "nvim-javagenie", "build-fingerprints.json"
+            )
+        return self.fingerprints_path
+
+    def read_fingerprints(self) -> Dict[str, Dict]:
+        try:
+            index = json.loads(self.get_fingerprints_path().read_text("utf-8"))
+            if index.get("version") == FINGERPRINTS_VERSION:
+                return index["projects"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def get_file_digest(self, file_path: Path) -> Optional[str]:
+        try:
+            return blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+        except OSError:
+            return None
+
+    def collect_inputs(
+        self, dir_path: str, root_path: Path, in_sources: bool, inputs: Fingerprint
+    ) -> None:
+        try:
+            entries = list(scandir(dir_path))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if in_sources:
+                    self.collect_inputs(entry.path, root_path, True, inputs)
+                elif entry.name in ("src", *BUILD_CONFIG_DIRS):
+                    self.collect_inputs(entry.path, root_path, True, inputs)
+                elif not entry.name.startswith(".") and entry.name not in IGNORED_DIRS:
+                    # Modules of multi-module builds
+                    self.collect_inputs(entry.path, root_path, False, inputs)
+            elif in_sources or entry.name in BUILD_SCRIPT_NAMES:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                relative_path = Path(entry.path).relative_to(root_path).as_posix()
+                inputs[relative_path] = [stat.st_mtime_ns, stat.st_size, None]
+
+    @traced(TracePhase.FILE_ENUMERATION)
+    def get_fingerprint(self, root_path: Path, debug: bool = False) -> Fingerprint:
+        # Only stats, contents are hashed when the fingerprint is saved or when
+        # a file was touched without changing size
+        fingerprint: Fingerprint = {}
+        self.collect_inputs(str(root_path), root_path, False, fingerprint)
+        if debug:
+            self.logging.log(f"Build inputs: {len(fingerprint)}", LogLevel.DEBUG)
+        return fingerprint
+
+    def is_input_unchanged(
+        self, root_path: Path, relative_path: str, current: List, saved: List
+    ) -> bool:
+        if current[:2] == saved[:2]:
+            current[2] = saved[2]
+            return True
+        if current[1] != saved[1] or saved[2] is None:
+            return False
+        # Same size but another mtime, e.g. after a checkout or a touch
+        current[2] = self.get_file_digest(root_path.joinpath(relative_path))
+        return current[2] == saved[2]
+
+    def get_up_to_date_artifact(
+        self, root_path: Path, fingerprint: Fingerprint, debug: bool = False
+    ) -> Optional[Path]:
+        saved = self.read_fingerprints().get(str(root_path))
+        artifact_path: Optional[Path] = None
+        reason: str
+        if saved is None:
+            reason = "no successful build recorded"
+        elif saved["inputs"].keys() != fingerprint.keys():
+            reason = "files were added or removed"
+        else:
+            changed = next(
+                (
+                    p
+                    for p, v in fingerprint.items()
+                    if not self.is_input_unchanged(root_path, p, v, saved["inputs"][p])
+                ),
+                None,
+            )
+            artifact = Path(saved["artifact"])
+            if changed is not None:
+                reason = f"{changed} changed"
+            elif not artifact.is_file():
+                reason = f"{str(artifact)} is missing"
+            elif artifact.stat().st_mtime_ns != saved["artifact_mtime"]:
+                reason = f"{str(artifact)} was rebuilt elsewhere"
+            else:
+                reason = "inputs unchanged"
+                artifact_path = artifact
+                # Keep the new stats of touched files so they aren't hashed again
+                if fingerprint != saved["inputs"]:
+                    self.save_fingerprint(root_path, fingerprint, artifact, debug)
+        TracingUtils.record_cache_access(
+            "build_fingerprints", artifact_path is not None
+        )
+        if debug:
+            self.logging.log(
+                [
+                    f"Up to date artifact: {artifact_path}",
+                    f"Reason: {reason}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return artifact_path
+
+    def save_fingerprint(
+        self,
+        root_path: Path,
+        fingerprint: Fingerprint,
+        artifact_path: Path,
+        debug: bool = False,
+    ) -> None:
+        # Files edited while the build ran keep their stats from before it and
+        # no digest, so they count as changed next time
+        for relative_path, values in fingerprint.items():
+            file_path = root_path.joinpath(relative_path)
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            if [stat.st_mtime_ns, stat.st_size] == values[:2] and values[2] is None:
+                values[2] = self.get_file_digest(file_path)
+        fingerprints = self.read_fingerprints()
+        fingerprints[str(root_path)] = {
+            "inputs": fingerprint,
+            "artifact": str(artifact_path),
+            "artifact_mtime": artifact_path.stat().st_mtime_ns,
+        }
+        try:
+            self.file_writer_utils.write_file_atomically(
+                self.get_fingerprints_path(),
+                json.dumps(
+                    {"version": FINGERPRINTS_VERSION, "projects": fingerprints}
+                ).encode(),
+            )
+        except OSError as e:
+            # Only costs a build next time, not worth failing the command
+            self.logging.log(f"Unable to save build fingerprint: {e}", LogLevel.WARN)
+        if debug:
+            self.logging.log(
+                [
+                    f"Fingerprints path: {str(self.get_fingerprints_path())}",
+                    f"Build inputs: {len(fingerprint)}",
+                    f"Artifact: {str(artifact_path)}",
+                ],
+                LogLevel.DEBUG,
+            )
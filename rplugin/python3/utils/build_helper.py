@@ -1,16 +1,41 @@
-from typing import Literal
+from typing import IO, Callable, Dict, List, Literal, Tuple, cast
 from pynvim import Optional
 from pynvim.api import Nvim
+from tree_sitter import Tree
 from custom_types.log_level import LogLevel
 from custom_types.project_properties import ProjectProperties
+from custom_types.quickfix_entry import QuickfixEntry
+from custom_types.test_filter import TestFilter
+from custom_types.trace_phase import TracePhase
+from utils.build_fingerprint_utils import BuildFingerprintUtils
+from utils.build_output_parser import BuildOutputParser
 from utils.common_utils import CommonUtils
 from utils.treesitter_utils import TreesitterUtils
 from utils.path_utils import PathUtils
+from utils.tracing_utils import traced
 from pathlib import Path
 from platform import system
-import subprocess
+from subprocess import PIPE, STDOUT, Popen
+from time import perf_counter
 from utils.logging import Logging
 
+# Progress and success messages of run_build
+RUN_MESSAGES: Dict[str, Tuple[str, str]] = {
+    "Build": ("Building", "Build successful"),
+    "Tests": ("Running tests", "Tests passed"),
+}
+TEST_ANNOTATIONS = [
+    "Test",
+    "ParameterizedTest",
+    "RepeatedTest",
+    "TestFactory",
+    "TestTemplate",
+]
+MODULE_BUILD_FILES = {
+    "maven": ["pom.xml"],
+    "gradle": ["build.gradle", "build.gradle.kts"],
+}
+
 
 class BuildHelper:
     def __init__(
@@ -20,6 +45,7 @@ class BuildHelper:
         path_utils: PathUtils,
         treesitter_utils: TreesitterUtils,
         common_utils: CommonUtils,
+        build_fingerprint_utils: BuildFingerprintUtils,
         logging: Logging,
     ) -> None:
         self.nvim = nvim
@@ -28,8 +54,11 @@ class BuildHelper:
         self.treesitter_utils = treesitter_utils
         self.path_utils = path_utils
         self.common_utils = common_utils
+        self.build_fingerprint_utils = build_fingerprint_utils
         self.build_tool_type: Optional[Literal["maven", "gradle"]] = None
         self.build_tool_path: Optional[Path] = self.get_build_tool_file_path()
+        # Tests that failed in the last test run, for RunTests failed
+        self.failed_tests: List[TestFilter] = []
 
     def get_build_tool_file_path(self) -> Path:
         os_identifier = system()
@@ -177,94 +206,305 @@ class BuildHelper:
             self.logging.log(f"Executable path: {executable_path}", LogLevel.DEBUG)
         return executable_path
 
-    def maven_build(self) -> None:
-        self.logging.echomsg("Building")
-        output: Optional[str] = None
-        error: Optional[str] = None
-        try:
-            result = self.common_utils.run_subprocess(
-                [f"{str(self.build_tool_path)}", "package"]
+    def set_quickfix_list(self, entries: List[QuickfixEntry], title: str) -> None:
+        # Replaced on every build, so a successful one clears old errors
+        self.nvim.funcs.setqflist(
+            [], "r", {"title": title, "items": [e.to_dict() for e in entries]}
+        )
+        if any(e.type == "E" for e in entries):
+            self.nvim.command("copen")
+
+    def push_quickfix_entries(
+        self, entries: List[QuickfixEntry], title: str, first: bool
+    ) -> None:
+        # Sent while the build runs, as notifications so reading its output
+        # never waits for Neovim. The first push replaces the previous build's
+        # list and opens the window.
+        items = [e.to_dict() for e in entries]
+        if first:
+            self.nvim.funcs.setqflist(
+                [], "r", {"title": title, "items": items}, async_=True
             )
-            output = " ".join(result.stdout.splitlines())
-            error = " ".join(result.stderr.splitlines())
-            if output and "BUILD SUCCESS" in output:
-                self.logging.echomsg("Build successful")
-            if "BUILD SUCCESS" not in output:
-                error_msg = "Unable to build"
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
-        except subprocess.CalledProcessError as e:
-            output = " ".join(e.stdout.splitlines()) if e.stdout else None
-            error = " ".join(e.stderr.splitlines()) if e.stderr else None
-        except Exception as e:
-            error = str(e)
-            error_msg = f"Unexpected error: {error}"
-            self.logging.echomsg(error_msg)
-            self.logging.log(error_msg, LogLevel.ERROR)
-            raise ValueError(error_msg)
+            self.nvim.command("copen", async_=True)
+        else:
+            self.nvim.funcs.setqflist([], "a", {"items": items}, async_=True)
 
-    def gradle_build(self) -> None:
-        self.logging.echomsg("Building")
-        output: Optional[str] = None
-        error: Optional[str] = None
+    @traced(TracePhase.SUBPROCESS)
+    def run_build(
+        self,
+        command: List[str],
+        fail_fast: bool = False,
+        debug: bool = False,
+        parser: Optional[BuildOutputParser] = None,
+        label: Literal["Build", "Tests"] = "Build",
+    ) -> None:
+        running_msg, success_msg = RUN_MESSAGES[label]
+        self.logging.echomsg(running_msg)
+        if parser is None:
+            parser = BuildOutputParser()
+        output_lines: List[str] = []
+        first_error_time: Optional[float] = None
+        stopped = False
+        start_time = perf_counter()
         try:
-            result = self.common_utils.run_subprocess(
-                [f"{str(self.build_tool_path)}", "clean", "build", "-x", "test"]
+            # Output isn't always in the locale's encoding, a bad byte mustn't
+            # end the build
+            process = Popen(
+                command,
+                stdout=PIPE,
+                stderr=STDOUT,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
             )
-            output = " ".join(result.stdout.splitlines())
-            error = " ".join(result.stderr.splitlines())
-            if output and "BUILD SUCCESSFUL" in output:
-                self.logging.echomsg("Build successful")
-            if "BUILD SUCCESSFUL" not in output:
-                error_msg = "Unable to build"
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
-        except subprocess.CalledProcessError as e:
-            output = " ".join(e.stdout.splitlines()) if e.stdout else None
-            error = " ".join(e.stderr.splitlines()) if e.stderr else None
-        except Exception as e:
-            error = str(e)
-            error_msg = f"Unexpected error: {error}"
+        except OSError as e:
+            error_msg = f"Unable to start the build: {e}"
             self.logging.echomsg(error_msg)
             self.logging.log(error_msg, LogLevel.ERROR)
             raise ValueError(error_msg)
+        title = " ".join(command)
+        pushed_count = 0
+        # Errors are parsed and shown as they are printed rather than once the
+        # build ends
+        with process:
+            for line in cast(IO[str], process.stdout):
+                if debug:
+                    output_lines.append(line.rstrip())
+                entry = parser.parse_line(line)
+                if entry is None or entry.type != "E" or entry.filename is None:
+                    continue
+                self.push_quickfix_entries(
+                    parser.entries[pushed_count:], title, pushed_count == 0
+                )
+                pushed_count = len(parser.entries)
+                if first_error_time is None:
+                    first_error_time = perf_counter() - start_time
+                if fail_fast:
+                    # The build can't succeed anymore, don't wait for the rest
+                    process.terminate()
+                    stopped = True
+                    break
+        # Test failures get their message after they were pushed, and a clean
+        # build clears the previous errors
+        self.set_quickfix_list(parser.entries, title)
+        if debug:
+            self.logging.log(
+                [
+                    f"Command: {' '.join(command)}",
+                    f"Return code: {process.returncode}",
+                    f"Time to first error: {first_error_time}",
+                    f"Stopped at first error: {stopped}",
+                    f"Output: {chr(10).join(output_lines)}",
+                ],
+                LogLevel.DEBUG,
+            )
+        if process.returncode == 0 and not stopped:
+            self.logging.echomsg(success_msg)
+            return
+        error_count = len(parser.get_errors())
+        if stopped:
+            error_msg = f"{label} stopped at the first error"
+        elif error_count:
+            error_msg = f"{label} failed with {error_count} errors"
+        else:
+            error_msg = f"{label} failed with exit code {process.returncode}"
+        if parser.entries:
+            error_msg += ", see the quickfix list"
+        self.logging.echomsg(error_msg)
+        self.logging.log(error_msg, LogLevel.ERROR)
+        raise ValueError(error_msg)
+
+    def maven_build(self, fail_fast: bool = False, debug: bool = False) -> None:
+        self.run_build([f"{str(self.build_tool_path)}", "package"], fail_fast, debug)
 
-    def build(self, debug: bool = False) -> None:
+    def gradle_build(self, fail_fast: bool = False, debug: bool = False) -> None:
+        self.run_build(
+            [f"{str(self.build_tool_path)}", "clean", "build", "-x", "test"],
+            fail_fast,
+            debug,
+        )
+
+    def build(self, fail_fast: bool = False, debug: bool = False) -> None:
         if self.build_tool_type == "gradle":
-            self.gradle_build()
+            self.gradle_build(fail_fast, debug)
         else:
-            self.maven_build()
+            self.maven_build(fail_fast, debug)
 
-    def run(self, debug: bool = False) -> None:
+    def build_executable(self, fail_fast: bool = False, debug: bool = False) -> Path:
+        self.build(fail_fast, debug)
         if self.build_tool_type == "gradle":
-            self.gradle_build()
             project_properties = self.get_gradle_project_properties(debug)
-            if not project_properties:
-                error_msg = "Unable to get project's properties"
-                self.logging.echomsg(error_msg)
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
-            project_executable = self.get_project_executable(project_properties)
-            if not project_executable:
-                error_msg = "Unable to find built executable"
-                self.logging.echomsg(error_msg)
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
         else:
-            self.maven_build()
             project_properties = self.get_maven_project_properties(debug)
-            if not project_properties:
-                error_msg = "Unable to get project's properties"
-                self.logging.echomsg(error_msg)
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
-            project_executable = self.get_project_executable(project_properties)
-            if not project_executable:
-                error_msg = "Unable to find built executable"
-                self.logging.echomsg(error_msg)
-                self.logging.log(error_msg, LogLevel.ERROR)
-                raise ValueError(error_msg)
+        if not project_properties:
+            error_msg = "Unable to get project's properties"
+            self.logging.echomsg(error_msg)
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        project_executable = self.get_project_executable(project_properties)
+        if not project_executable:
+            error_msg = "Unable to find built executable"
+            self.logging.echomsg(error_msg)
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        return project_executable
+
+    def run(self, fail_fast: bool = False, debug: bool = False) -> None:
+        root_path = self.path_utils.get_project_root_path()
+        # Taken before building, so edits made during the build aren't missed
+        fingerprint = self.build_fingerprint_utils.get_fingerprint(root_path, debug)
+        project_executable = self.build_fingerprint_utils.get_up_to_date_artifact(
+            root_path, fingerprint, debug
+        )
+        if project_executable:
+            self.logging.echomsg("Nothing changed since the last build")
+        else:
+            project_executable = self.build_executable(fail_fast, debug)
+            self.build_fingerprint_utils.save_fingerprint(
+                root_path, fingerprint, project_executable, debug
+            )
         java_executable = self.path_utils.get_java_executable_path()
         self.nvim.command(
             f"split | terminal {str(java_executable)} -jar {str(project_executable)}"
         )
+
+    def get_test_filter(
+        self,
+        tree: Tree,
+        point: Tuple[int, int],
+        file_path: Path,
+        whole_class: bool = False,
+        debug: bool = False,
+    ) -> TestFilter:
+        # The innermost test method and every class around the point
+        class_names: List[str] = []
+        method_name: Optional[str] = None
+        for node in self.treesitter_utils.iter_enclosing_nodes(tree, point):
+            name_node = node.child_by_field_name("name")
+            if name_node is None or not name_node.text:
+                continue
+            if node.type == "method_declaration" and not class_names:
+                annotation_names = self.treesitter_utils.get_node_annotation_names(node)
+                if any(a in TEST_ANNOTATIONS for a in annotation_names):
+                    method_name = name_node.text.decode()
+            elif node.type == "class_declaration":
+                class_names.append(name_node.text.decode())
+        if not class_names:
+            error_msg = "Cursor isn't inside a test class"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        package_name = self.treesitter_utils.get_buffer_package_name(tree, debug)
+        class_name = "$".join(reversed(class_names))
+        if package_name:
+            class_name = f"{package_name}.{class_name}"
+        test_filter = TestFilter(
+            class_name=class_name,
+            method_name=None if whole_class else method_name,
+            file_path=file_path,
+        )
+        if debug:
+            self.logging.log(f"Test filter: {test_filter}", LogLevel.DEBUG)
+        return test_filter
+
+    def get_module_path(self, file_path: Path, root_path: Path) -> Path:
+        # The closest directory with a build script, the tests of other modules
+        # aren't compiled or run
+        build_files = MODULE_BUILD_FILES[self.build_tool_type or "maven"]
+        for parent in file_path.parents:
+            if parent == root_path or root_path not in parent.parents:
+                break
+            if any(parent.joinpath(f).exists() for f in build_files):
+                return parent
+        return root_path
+
+    def get_test_class_resolver(
+        self, root_path: Path
+    ) -> Callable[[str], Optional[Path]]:
+        test_roots: List[Path] = []
+
+        def resolve_test_class_path(class_name: str) -> Optional[Path]:
+            # Test sources aren't indexed, they are looked up by convention
+            if not test_roots:
+                test_roots.extend(root_path.glob("**/src/test/*"))
+            relative_path = Path(*class_name.split("."))
+            for test_root in test_roots:
+                for suffix in [".java", ".kt"]:
+                    file_path = test_root.joinpath(relative_path).with_suffix(suffix)
+                    if file_path.is_file():
+                        return file_path
+            return None
+
+        return resolve_test_class_path
+
+    def get_maven_test_command(
+        self, modules: Dict[Path, List[TestFilter]], root_path: Path
+    ) -> List[str]:
+        command = [f"{str(self.build_tool_path)}", "test"]
+        if not modules:
+            return command
+        class_methods: Dict[str, Optional[List[str]]] = {}
+        for test_filter in [f for v in modules.values() for f in v]:
+            methods = class_methods.setdefault(test_filter.class_name, [])
+            if test_filter.method_name is None:
+                class_methods[test_filter.class_name] = None
+            elif methods is not None:
+                methods.append(test_filter.method_name)
+        test_patterns = [
+            c if methods is None else f"{c}#{'+'.join(methods)}"
+            for c, methods in class_methods.items()
+        ]
+        command.extend(
+            [
+                f"-Dtest={','.join(test_patterns)}",
+                # Surefire 3 and 2 names, modules built with -am have no matches
+                "-Dsurefire.failIfNoSpecifiedTests=false",
+                "-DfailIfNoTests=false",
+            ]
+        )
+        if root_path not in modules:
+            module_paths = [m.relative_to(root_path).as_posix() for m in modules]
+            command.extend(["-pl", ",".join(module_paths), "-am"])
+        return command
+
+    def get_gradle_test_command(
+        self, modules: Dict[Path, List[TestFilter]], root_path: Path
+    ) -> List[str]:
+        command = [f"{str(self.build_tool_path)}"]
+        if not modules:
+            return command + ["test"]
+        for module_path, test_filters in modules.items():
+            # --tests applies to the task right before it
+            module_parts = module_path.relative_to(root_path).parts
+            command.append(
+                ":".join(["", *module_parts, "test"]) if module_parts else "test"
+            )
+            for test_filter in test_filters:
+                command.extend(["--tests", test_filter.get_gradle_pattern()])
+        return command
+
+    def run_tests(
+        self,
+        test_filters: List[TestFilter],
+        fail_fast: bool = False,
+        debug: bool = False,
+    ) -> None:
+        # No filter runs the whole suite
+        root_path = self.path_utils.get_project_root_path()
+        modules: Dict[Path, List[TestFilter]] = {}
+        for test_filter in test_filters:
+            module_path = (
+                self.get_module_path(test_filter.file_path, root_path)
+                if test_filter.file_path
+                else root_path
+            )
+            modules.setdefault(module_path, []).append(test_filter)
+        if self.build_tool_type == "gradle":
+            command = self.get_gradle_test_command(modules, root_path)
+        else:
+            command = self.get_maven_test_command(modules, root_path)
+        parser = BuildOutputParser(self.get_test_class_resolver(root_path))
+        try:
+            self.run_build(command, fail_fast, debug, parser, "Tests")
+        finally:
+            self.failed_tests = parser.failed_tests
@@ -0,0 +1,213 @@
+import re
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+from custom_types.quickfix_entry import QuickfixEntry
+from custom_types.test_filter import TestFilter
+
+# [ERROR] /src/Foo.java:[12,5] cannot find symbol
+MAVEN_JAVAC_LINE = re.compile(
+    r"^\[(?P<level>ERROR|WARNING)\] (?P<file>.+?\.java):"
+    r"\[(?P<line>\d+)(?:,(?P<col>\d+))?\] (?P<text>.*)$"
+)
+# /src/Foo.java:12: error: cannot find symbol, the column comes from the caret
+JAVAC_LINE = re.compile(
+    r"^(?P<file>.+?\.java):(?P<line>\d+): (?P<level>error|warning): (?P<text>.*)$"
+)
+JAVAC_CARET_LINE = re.compile(r"^(?P<indent>\s*)\^\s*$")
+# e: file:///src/Foo.kt:12:5 Unresolved reference
+KOTLIN_LINE = re.compile(
+    r"^(?:\[(?P<level>ERROR|WARNING)\]|(?P<short_level>[ew]):) (?:file://)?"
+    r"(?P<file>.+?\.kts?):(?P<line>\d+):(?P<col>\d+):? (?P<text>.*)$"
+)
+# e: /src/Foo.kt: (12, 5): Unresolved reference
+KOTLIN_LEGACY_LINE = re.compile(
+    r"^(?:\[(?P<level>ERROR|WARNING)\]|(?P<short_level>[ew]):) "
+    r"(?P<file>.+?\.kts?): \((?P<line>\d+), (?P<col>\d+)\): (?P<text>.*)$"
+)
+MAVEN_FAILURE_LINE = re.compile(r"^\[ERROR\] (?P<text>Failed to execute goal .*)$")
+GRADLE_FAILURE_HEADER = "* What went wrong:"
+# [ERROR] com.example.FooTest.bar -- Time elapsed: 0.01 s <<< FAILURE!
+SUREFIRE_TEST_LINE = re.compile(
+    r"^\[ERROR\] (?P<class>[\w.$]+)\.(?P<method>[\w$]+)(?:\(.*?\))?(?:\[\d+\])?"
+    r"\s+(?:-- )?Time elapsed: .*<<< (?:FAILURE|ERROR)!$"
+)
+# Surefire 2: bar(com.example.FooTest)  Time elapsed: 0.01 sec  <<< FAILURE!
+SUREFIRE_LEGACY_TEST_LINE = re.compile(
+    r"^(?:\[ERROR\] )?(?P<method>[\w$]+)\((?P<class>[\w.$]+)\)"
+    r"\s+Time elapsed: .*<<< (?:FAILURE|ERROR)!$"
+)
+STACK_FRAME_LINE = re.compile(
+    r"^\s*at (?P<class>[\w.$]+)\.(?P<method>[\w$<>]+)"
+    r"\([\w$]+\.(?:java|kt):(?P<line>\d+)\)$"
+)
+# com.example.FooTest > bar() FAILED
+GRADLE_TEST_LINE = re.compile(
+    r"^(?P<class>[\w.$]+) > (?P<method>[\w$]+)(?:\(.*?\))?(?: > .*)? FAILED$"
+)
+#     org.opentest4j.AssertionFailedError at FooTest.java:12
+GRADLE_TEST_DETAIL_LINE = re.compile(
+    r"^\s+(?P<text>\S.*?) at [\w$]+\.(?:java|kt):(?P<line>\d+)$"
+)
+# Lines of a failed test's report searched for its message and line
+MAX_TEST_REPORT_LINES = 50
+# Lines between a javac error and the caret under its column
+MAX_CARET_DISTANCE = 2
+
+
+class BuildOutputParser:
+    # Fed one line at a time while the build runs, so a compile error is known
+    # as soon as it is printed
+    def __init__(
+        self, resolve_class_path: Optional[Callable[[str], Optional[Path]]] = None
+    ) -> None:
+        # Test reports name classes, resolve_class_path finds their files
+        self.resolve_class_path = resolve_class_path
+        self.entries: List[QuickfixEntry] = []
+        self.seen: Set[Tuple] = set()
+        self.caret_entry: Optional[QuickfixEntry] = None
+        self.caret_distance = 0
+        self.in_gradle_failure = False
+        self.failed_tests: List[TestFilter] = []
+        self.test_entry: Optional[QuickfixEntry] = None
+        self.test_filter: Optional[TestFilter] = None
+        self.test_report_distance = 0
+        self.test_message_found = False
+
+    def get_level(self, level: Optional[str]) -> str:
+        return "W" if level and level[0].lower() == "w" else "E"
+
+    def add_entry(self, entry: QuickfixEntry) -> Optional[QuickfixEntry]:
+        # Maven repeats compile errors in its failure summary
+        key = (entry.filename, entry.lnum, entry.col, entry.text)
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        self.entries.append(entry)
+        return entry
+
+    def parse_caret(self, line: str) -> bool:
+        if self.caret_entry is None:
+            return False
+        match = JAVAC_CARET_LINE.match(line)
+        if match:
+            self.caret_entry.col = len(match.group("indent")) + 1
+            self.caret_entry = None
+            return True
+        self.caret_distance += 1
+        if self.caret_distance > MAX_CARET_DISTANCE:
+            self.caret_entry = None
+        return False
+
+    def add_failed_test(self, class_name: str, method_name: str) -> QuickfixEntry:
+        file_path: Optional[Path] = None
+        if self.resolve_class_path is not None:
+            file_path = self.resolve_class_path(class_name.split("$")[0])
+        test_filter = TestFilter(class_name, method_name, file_path)
+        if test_filter not in self.failed_tests:
+            self.failed_tests.append(test_filter)
+        entry = QuickfixEntry(
+            text=f"{method_name} failed",
+            filename=str(file_path) if file_path else None,
+        )
+        self.entries.append(entry)
+        self.test_entry = entry
+        self.test_filter = test_filter
+        self.test_report_distance = 0
+        self.test_message_found = False
+        return entry
+
+    def parse_test_report(self, line: str) -> bool:
+        # Fills the message and line of the last failed test from the lines
+        # that follow it
+        entry, test_filter = self.test_entry, self.test_filter
+        if entry is None or test_filter is None:
+            return False
+        self.test_report_distance += 1
+        if self.test_report_distance > MAX_TEST_REPORT_LINES:
+            self.test_entry = None
+            return False
+        match = GRADLE_TEST_DETAIL_LINE.match(line)
+        if match and not self.test_message_found:
+            entry.text = f"{test_filter.method_name}: {match.group('text')}"
+            entry.lnum = int(match.group("line"))
+            self.test_entry = None
+            return True
+        match = STACK_FRAME_LINE.match(line)
+        if match:
+            if (
+                match.group("class") == test_filter.class_name
+                and match.group("method") == test_filter.method_name
+            ):
+                entry.lnum = int(match.group("line"))
+                self.test_entry = None
+            return True
+        if line.strip() and not self.test_message_found:
+            entry.text = f"{test_filter.method_name}: {line.strip()}"
+            self.test_message_found = True
+            return True
+        return False
+
+    def parse_line(self, line: str) -> Optional[QuickfixEntry]:
+        line = line.rstrip()
+        if self.parse_caret(line):
+            return None
+        match = SUREFIRE_TEST_LINE.match(line) or SUREFIRE_LEGACY_TEST_LINE.match(line)
+        if match is None:
+            match = GRADLE_TEST_LINE.match(line)
+        if match:
+            return self.add_failed_test(match.group("class"), match.group("method"))
+        if self.parse_test_report(line):
+            return None
+        if self.in_gradle_failure:
+            if not line:
+                return None
+            self.in_gradle_failure = False
+            return self.add_entry(QuickfixEntry(text=line))
+        if line == GRADLE_FAILURE_HEADER:
+            self.in_gradle_failure = True
+            return None
+        match = MAVEN_JAVAC_LINE.match(line)
+        if match:
+            return self.add_entry(
+                QuickfixEntry(
+                    text=match.group("text"),
+                    type=self.get_level(match.group("level")),  # type: ignore
+                    filename=match.group("file"),
+                    lnum=int(match.group("line")),
+                    col=int(match.group("col") or 0),
+                )
+            )
+        match = JAVAC_LINE.match(line)
+        if match:
+            entry = self.add_entry(
+                QuickfixEntry(
+                    text=match.group("text"),
+                    type=self.get_level(match.group("level")),  # type: ignore
+                    filename=match.group("file"),
+                    lnum=int(match.group("line")),
+                )
+            )
+            self.caret_entry = entry
+            self.caret_distance = 0
+            return entry
+        match = KOTLIN_LINE.match(line) or KOTLIN_LEGACY_LINE.match(line)
+        if match:
+            return self.add_entry(
+                QuickfixEntry(
+                    text=match.group("text"),
+                    type=self.get_level(  # type: ignore
+                        match.group("level") or match.group("short_level")
+                    ),
+                    filename=match.group("file"),
+                    lnum=int(match.group("line")),
+                    col=int(match.group("col")),
+                )
+            )
+        match = MAVEN_FAILURE_LINE.match(line)
+        if match:
+            return self.add_entry(QuickfixEntry(text=match.group("text")))
+        return None
+
+    def get_errors(self) -> List[QuickfixEntry]:
+        return [e for e in self.entries if e.type == "E"]
@@ -0,0 +1,263 @@
+import json
+from collections import deque
+from os import environ
+from pathlib import Path
+from re import findall, sub
+from typing import Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
+from zipfile import BadZipFile, ZipFile
+
+from pynvim.api.nvim import Nvim
+
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.logging import Logging
+from utils.path_utils import PathUtils
+from utils.tracing_utils import TracingUtils, traced
+
+# (groupId, artifactId, version), version None when it is managed elsewhere
+Dependency = Tuple[str, str, Optional[str]]
+
+INDEX_VERSION = 1
+
+
+class ClasspathUtils:
+    def __init__(self, nvim: Nvim, path_utils: PathUtils, logging: Logging):
+        self.nvim = nvim
+        self.path_utils = path_utils
+        self.logging = logging
+        self.maven_repository_path = Path.home().joinpath(".m2", "repository")
+        self.gradle_cache_path = Path(
+            environ.get("GRADLE_USER_HOME", Path.home().joinpath(".gradle"))
+        ).joinpath("caches", "modules-2", "files-2.1")
+        self.gradle_configurations = [
+            "implementation",
+            "api",
+            "compileOnly",
+            "runtimeOnly",
+            "annotationProcessor",
+        ]
+        self.classes_by_simple_name: Optional[Dict[str, List[str]]] = None
+
+    def get_index_path(self) -> Path:
+        return Path(self.nvim.funcs.stdpath("cache")).joinpath(
+            "nvim-javagenie", "classpath-index.json"
+        )
+
+    def get_version_key(self, version: str) -> Tuple:
+        return tuple(
+            (0, int(part)) if part.isdigit() else (1, part)
+            for part in version.replace("-", ".").split(".")
+        )
+
+    def find_artifact_file(
+        self, dependency: Dependency, extension: str
+    ) -> Optional[Path]:
+        group, artifact, version = dependency
+        maven_path = self.maven_repository_path.joinpath(*group.split("."), artifact)
+        gradle_path = self.gradle_cache_path.joinpath(group, artifact)
+        for artifact_path in (maven_path, gradle_path):
+            if not artifact_path.is_dir():
+                continue
+            if version is None:
+                # Managed versions (BOMs, parents) resolve to the newest local one
+                versions = [p.name for p in artifact_path.iterdir() if p.is_dir()]
+                if not versions:
+                    continue
+                version = max(versions, key=self.get_version_key)
+            file_name = f"{artifact}-{version}.{extension}"
+            version_path = artifact_path.joinpath(version)
+            if version_path.joinpath(file_name).exists():
+                return version_path.joinpath(file_name)
+            # Gradle keeps every file in a directory named after its checksum
+            for file_path in version_path.glob(f"*/{file_name}"):
+                return file_path
+        return None
+
+    def get_pom_dependencies(
+        self, pom_path: Path, include_provided: bool
+    ) -> List[Dependency]:
+        try:
+            pom_root = ElementTree.parse(pom_path).getroot()
+        except (ElementTree.ParseError, OSError):
+            return []
+        # Drop the POM namespace so paths stay readable
+        for element in pom_root.iter():
+            element.tag = element.tag.rpartition("}")[2]
+        properties: Dict[str, str] = {
+            p.tag: (p.text or "").strip() for p in pom_root.findall("properties/*")
+        }
+        project_version = pom_root.findtext("version") or pom_root.findtext(
+            "parent/version"
+        )
+        if project_version:
+            properties["project.version"] = project_version.strip()
+        excluded_scopes = ["test", "system", "import"]
+        if not include_provided:
+            excluded_scopes.append("provided")
+        dependencies: List[Dependency] = []
+        for dependency in pom_root.findall("dependencies/dependency"):
+            group = (dependency.findtext("groupId") or "").strip()
+            artifact = (dependency.findtext("artifactId") or "").strip()
+            version = (dependency.findtext("version") or "").strip()
+            scope = (dependency.findtext("scope") or "compile").strip()
+            optional = (dependency.findtext("optional") or "false").strip()
+            if scope in excluded_scopes or optional == "true":
+                continue
+            version = sub(
+                r"\$\{([^}]+)\}",
+                lambda m: properties.get(m.group(1), m.group(0)),
+                version,
+            )
+            if not group or not artifact or "${" in group + artifact:
+                continue
+            if not version or "${" in version:
+                dependencies.append((group, artifact, None))
+            else:
+                dependencies.append((group, artifact, version))
+        return dependencies
+
+    def get_gradle_dependencies(self, build_file_path: Path) -> List[Dependency]:
+        dependencies: List[Dependency] = []
+        build_file = build_file_path.read_text("utf-8")
+        configurations = "|".join(self.gradle_configurations)
+        for notation in findall(
+            rf"(?:{configurations})\s*\(?\s*[\"']([^\"'\s]+)[\"']", build_file
+        ):
+            parts = notation.split(":")
+            if len(parts) < 2 or "$" in notation:
+                continue
+            version = parts[2] if len(parts) > 2 else None
+            dependencies.append((parts[0], parts[1], version))
+        return dependencies
+
+    def get_project_dependencies(self, debug: bool = False) -> List[Dependency]:
+        root_path = self.path_utils.get_project_root_path()
+        dependencies: List[Dependency] = []
+        pom_path = root_path.joinpath("pom.xml")
+        if pom_path.exists():
+            dependencies.extend(self.get_pom_dependencies(pom_path, True))
+        for build_file_name in ("build.gradle", "build.gradle.kts"):
+            build_file_path = root_path.joinpath(build_file_name)
+            if build_file_path.exists():
+                dependencies.extend(self.get_gradle_dependencies(build_file_path))
+        if debug:
+            self.logging.log(f"Project dependencies: {dependencies}", LogLevel.DEBUG)
+        return dependencies
+
+    @traced(TracePhase.FILE_ENUMERATION)
+    def get_dependency_jars(self, debug: bool = False) -> List[Path]:
+        # Follows each dependency's POM through the local caches; versions left
+        # to a BOM fall back to the newest one downloaded. Breadth first, so the
+        # versions declared by the project win.
+        pending = deque(self.get_project_dependencies(debug))
+        seen: Set[Tuple[str, str]] = set()
+        jar_paths: List[Path] = []
+        while pending:
+            dependency = pending.popleft()
+            if dependency[:2] in seen:
+                continue
+            seen.add(dependency[:2])
+            jar_path = self.find_artifact_file(dependency, "jar")
+            if jar_path is not None:
+                jar_paths.append(jar_path)
+            pom_path = self.find_artifact_file(dependency, "pom")
+            if pom_path is not None:
+                pending.extend(self.get_pom_dependencies(pom_path, False))
+        if debug:
+            self.logging.log(
+                [
+                    f"Resolved artifacts: {len(seen)}",
+                    f"Dependency jars: {[str(p) for p in jar_paths]}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return jar_paths
+
+    def read_jar_classes(self, jar_path: Path) -> List[str]:
+        # Only the central directory is read, class files are never inflated
+        try:
+            with ZipFile(jar_path) as jar:
+                names = jar.namelist()
+        except (BadZipFile, OSError):
+            return []
+        return [
+            name[:-6].replace("/", ".")
+            for name in names
+            if name.endswith(".class")
+            and "$" not in name
+            and not name.startswith("META-INF/")
+            and not name.endswith(("module-info.class", "package-info.class"))
+        ]
+
+    def build_index(self, debug: bool = False) -> Dict[str, List[str]]:
+        index_path = self.get_index_path()
+        cached_jars: Dict[str, Dict] = {}
+        try:
+            index = json.loads(index_path.read_text("utf-8"))
+            if index.get("version") == INDEX_VERSION:
+                cached_jars = index["jars"]
+        except (OSError, ValueError, KeyError):
+            pass
+        jars: Dict[str, Dict] = {}
+        for jar_path in self.get_dependency_jars(debug):
+            jar_key = str(jar_path)
+            mtime = jar_path.stat().st_mtime
+            cached_jar = cached_jars.get(jar_key)
+            if cached_jar is not None and cached_jar["mtime"] == mtime:
+                jars[jar_key] = cached_jar
+                TracingUtils.record_cache_access("classpath_jars", True)
+                continue
+            TracingUtils.record_cache_access("classpath_jars", False)
+            jars[jar_key] = {
+                "mtime": mtime,
+                "classes": self.read_jar_classes(jar_path),
+            }
+        # The index is shared by every project, keep the other projects' jars
+        indexed_jars = {
+            jar_key: jar
+            for jar_key, jar in cached_jars.items()
+            if jar_key not in jars and Path(jar_key).exists()
+        }
+        indexed_jars.update(jars)
+        if indexed_jars != cached_jars:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            index_path.write_text(
+                json.dumps({"version": INDEX_VERSION, "jars": indexed_jars}), "utf-8"
+            )
+        classes_by_simple_name: Dict[str, List[str]] = {}
+        for jar in jars.values():
+            for class_name in jar["classes"]:
+                simple_name = class_name.rpartition(".")[2]
+                fully_qualified_names = classes_by_simple_name.setdefault(
+                    simple_name, []
+                )
+                if class_name not in fully_qualified_names:
+                    fully_qualified_names.append(class_name)
+        TracingUtils.set_gauge("classpath_jars", len(jars))
+        TracingUtils.set_gauge("classpath_types", len(classes_by_simple_name))
+        if debug:
+            self.logging.log(
+                [
+                    f"Index path: {str(index_path)}",
+                    f"Indexed jars: {len(jars)}",
+                    f"Indexed simple names: {len(classes_by_simple_name)}",
+                ],
+                LogLevel.DEBUG,
+            )
+        self.classes_by_simple_name = classes_by_simple_name
+        return classes_by_simple_name
+
+    def get_fully_qualified_names(
+        self, simple_name: str, debug: bool = False
+    ) -> List[str]:
+        classes_by_simple_name = self.classes_by_simple_name
+        if classes_by_simple_name is None:
+            classes_by_simple_name = self.build_index(debug)
+        fully_qualified_names = classes_by_simple_name.get(simple_name, [])
+        if debug:
+            self.logging.log(
+                f"Classpath matches for {simple_name}: {fully_qualified_names}",
+                LogLevel.DEBUG,
+            )
+        return fully_qualified_names
@@ -4,13 +4,20 @@ from typing import List, Optional
 
 
 from custom_types.java_file_data import JavaFileData
+from custom_types.java_files_index import JavaFilesIndex
 from custom_types.declaration_type import DeclarationType
 from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.file_summary_utils import FileSummary, FileSummaryUtils
 from utils.treesitter_utils import TreesitterUtils
 from utils.path_utils import PathUtils
+from utils.project_index_utils import ProjectIndexUtils
 from pathlib import Path
 
+from tree_sitter import Tree
+
 from utils.logging import Logging
+from utils.tracing_utils import TracingUtils, traced
 
 
 class CommonUtils:
@@ -19,11 +26,16 @@ class CommonUtils:
         cwd: Path,
         path_utils: PathUtils,
         treesitter_utils: TreesitterUtils,
+        file_summary_utils: FileSummaryUtils,
+        project_index_utils: ProjectIndexUtils,
         logging: Logging,
     ) -> None:
         self.cwd = cwd
         self.logging = logging
         self.treesitter_utils = treesitter_utils
+        self.file_summary_utils = file_summary_utils
+        self.project_index_utils = project_index_utils
+        self.java_files_index: Optional[JavaFilesIndex] = None
         self.path_utils = path_utils
 
     def pluralize_word(self, word: str, debug: bool = False) -> str:
@@ -79,9 +91,48 @@ class CommonUtils:
         return package_path
 
     def get_java_file_data(
-        self, file_path: Path, debug: bool = False
+        self, file_path: Path, debug: bool = False, summary_key: Optional[str] = None
     ) -> Optional[JavaFileData]:
-        file_tree = self.treesitter_utils.convert_path_to_tree(file_path)
+        summary: Optional[FileSummary] = None
+        if summary_key is not None:
+            summary = self.file_summary_utils.get_summary(summary_key)
+        file_tree: Optional[Tree] = None
+        if summary is None:
+            try:
+                file_bytes = file_path.read_bytes()
+            except OSError as e:
+                error_msg = f"Error reading from file path {str(file_path)}: {e}"
+                self.logging.log(error_msg, LogLevel.ERROR)
+                raise RuntimeError(error_msg)
+            if not file_bytes:
+                return None
+            if summary_key is None:
+                summary_key = self.file_summary_utils.get_summary_key(
+                    file_path, file_bytes
+                )
+                summary = self.file_summary_utils.get_summary(summary_key)
+            if summary is None:
+                file_tree = self.treesitter_utils.convert_bytes_to_tree(file_bytes)
+                summary = self.get_java_file_summary(file_path, file_tree, debug)
+                self.file_summary_utils.set_summary(summary_key, summary)
+        if not summary:
+            return None
+        return JavaFileData(
+            file_name=summary["file_name"],
+            package_path=self.get_buffer_package_path(
+                buffer_path=file_path, debug=debug
+            ),
+            path=file_path,
+            declaration_type=DeclarationType(summary["declaration_type"]),
+            is_jpa_entity=summary["is_jpa_entity"],
+            is_mapped_superclass=summary["is_mapped_superclass"],
+            parsed_tree=file_tree,
+            tree_loader=self.treesitter_utils.convert_path_to_tree,
+        )
+
+    def get_java_file_summary(
+        self, file_path: Path, file_tree: Tree, debug: bool = False
+    ) -> FileSummary:
         decl_type_query_param = """
         [
             (class_declaration) 
@@ -127,27 +178,31 @@ class CommonUtils:
                         declaration_type = DeclarationType.ANNOTATION
                     else:
                         declaration_type = DeclarationType.RECORD
-                    return JavaFileData(
-                        file_name=decl_name_str,
-                        package_path=self.get_buffer_package_path(
-                            buffer_path=file_path, debug=debug
-                        ),
-                        path=file_path,
-                        tree=file_tree,
-                        declaration_type=declaration_type,
-                        is_jpa_entity=is_jpa_entity,
-                        is_mapped_superclass=is_mapped_superclass,
-                    )
+                    return {
+                        "file_name": decl_name_str,
+                        "declaration_type": declaration_type.value,
+                        "is_jpa_entity": is_jpa_entity,
+                        "is_mapped_superclass": is_mapped_superclass,
+                    }
+        return {}
 
+    @traced(TracePhase.FILE_ENUMERATION)
     def get_all_java_files_data(self, debug: bool = False) -> List[JavaFileData]:
         root_path = self.path_utils.get_project_root_path()
         files_found: List[JavaFileData] = []
-        for p in root_path.rglob("*.java"):
+        self.file_summary_utils.load_summaries()
+        summary_keys = self.project_index_utils.get_summary_keys(root_path, debug)
+        for p, summary_key in summary_keys.items():
             if "main" not in p.parts:
                 continue
-            file_data: Optional[JavaFileData] = self.get_java_file_data(p, debug)
+            file_data: Optional[JavaFileData] = self.get_java_file_data(
+                p, debug, summary_key
+            )
             if file_data:
                 files_found.append(file_data)
+        self.file_summary_utils.save_summaries(debug)
+        self.java_files_index = JavaFilesIndex(files_found)
+        TracingUtils.set_gauge("java_files", len(files_found))
         if debug:
             self.logging.log(
                 [
@@ -158,6 +213,48 @@ class CommonUtils:
             )
         return files_found
 
+    def get_java_files_index(self, debug: bool = False) -> JavaFilesIndex:
+        # Lookups use the files found by the last enumeration, commands refresh
+        # it when they start
+        if self.java_files_index is None:
+            self.get_all_java_files_data(debug)
+        return self.java_files_index or JavaFilesIndex()
+
+    def get_java_file_data_by_path(
+        self, file_path: Path, debug: bool = False
+    ) -> JavaFileData:
+        file_data = self.get_java_files_index(debug).get_by_path(file_path)
+        if file_data is None:
+            error_msg = f"Unable to find Java file data for {str(file_path)}"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise FileNotFoundError(error_msg)
+        return file_data
+
+    def get_java_file_data_by_name(
+        self,
+        name: str,
+        entities_only: bool = False,
+        debug: bool = False,
+    ) -> JavaFileData:
+        # Either a simple name, which has to be unique, or a fully qualified one
+        matches = [
+            f
+            for f in self.get_java_files_index(debug).get_by_name(name)
+            if f.is_jpa_entity or not entities_only
+        ]
+        if not matches:
+            error_msg = f"Unable to find Java file data for '{name}'"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise FileNotFoundError(error_msg)
+        if len(matches) > 1:
+            candidates = ", ".join(sorted(f"{f.package_path}.{name}" for f in matches))
+            error_msg = f"'{name}' is ambiguous, use one of: {candidates}"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        if debug:
+            self.logging.log(f"Found {name}: {matches[0].print()}", LogLevel.DEBUG)
+        return matches[0]
+
     def generate_field_name(
         self, field_type: str, plural: bool = False, debug: bool = False
     ) -> str:
@@ -215,6 +312,7 @@ class CommonUtils:
             self.logging.log(f"File path: {str(file_path)}", LogLevel.DEBUG)
         return file_path
 
+    @traced(TracePhase.SUBPROCESS)
     def run_subprocess(
         self, command: list[str], debug: bool = False
     ) -> CompletedProcess:
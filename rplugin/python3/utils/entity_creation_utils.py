@@ -4,10 +4,15 @@ from pynvim.api.nvim import Nvim
 from custom_types.entity_type import EntityType
 from custom_types.log_level import LogLevel
 from custom_types.create_entity_args import CreateEntityArgs
+from custom_types.file_edit import FileEdit
+from custom_types.trace_phase import TracePhase
 from utils.treesitter_utils import TreesitterUtils
 from utils.common_utils import CommonUtils
+from utils.file_edit_utils import FileEditUtils
+from utils.file_writer_utils import FileWriterUtils
 from utils.path_utils import PathUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
 
 
 class EntityCreationUtils:
@@ -17,6 +22,8 @@ class EntityCreationUtils:
         treesitter_utils: TreesitterUtils,
         path_utils: PathUtils,
         common_utils: CommonUtils,
+        file_writer_utils: FileWriterUtils,
+        file_edit_utils: FileEditUtils,
         logging: Logging,
     ):
         self.nvim = nvim
@@ -24,9 +31,13 @@ class EntityCreationUtils:
         self.path_utils = path_utils
         self.logging = logging
         self.common_utils = common_utils
+        self.file_writer_utils = file_writer_utils
+        self.file_edit_utils = file_edit_utils
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_new_entity_template(
         self,
+        file_edit: FileEdit,
         package_path: str,
         entity_name: str,
         entity_type: EntityType,
@@ -62,7 +73,7 @@ class EntityCreationUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return template
 
     def create_new_entity(
@@ -79,7 +90,9 @@ class EntityCreationUtils:
         if final_path.exists():
             error_msg = f"File {str(final_path)} already exists"
             self.logging.log(error_msg, LogLevel.ERROR)
+        file_edit = FileEdit(path=final_path)
         template = self.generate_new_entity_template(
+            file_edit,
             package_path=args.package_path,
             entity_name=args.entity_name,
             entity_type=args.entity_type_enum,
@@ -87,10 +100,10 @@ class EntityCreationUtils:
             parent_entity_package_path=args.parent_entity_package_path,
             debug=debug,
         )
-        buffer_tree = self.treesitter_utils.convert_bytes_to_tree(template.encode())
-        buffer_tree = self.treesitter_utils.add_imports_to_file_tree(buffer_tree, debug)
-        self.treesitter_utils.update_buffer(
-            tree=buffer_tree, buffer_path=final_path, save=True, debug=debug
+        file_edit.tree = self.treesitter_utils.convert_bytes_to_tree(template.encode())
+        buffer_tree = self.file_edit_utils.prepare_file_edit(file_edit, debug)
+        self.file_writer_utils.write_files(
+            {final_path: buffer_tree}, open_last=True, debug=debug
         )
         if debug:
             self.logging.log(
@@ -1,9 +1,9 @@
-from pathlib import Path
-from typing import List, Optional
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pynvim.api.nvim import Nvim
-from tree_sitter import Tree
 
+from custom_types.declaration_type import DeclarationType
 from custom_types.enum_type import EnumType
 from custom_types.other import Other
 from custom_types.field_time_zone_storage import FieldTimeZoneStorage
@@ -15,10 +15,43 @@ from custom_types.java_file_data import JavaFileData
 from custom_types.create_id_field_args import CreateIdEntityFieldArgs
 from custom_types.create_basic_field_args import CreateBasicEntityFieldArgs
 from custom_types.create_enum_field_args import CreateEnumEntityFieldArgs
+from custom_types.file_edit import FileEdit
+from custom_types.trace_phase import TracePhase
 
 from utils.treesitter_utils import TreesitterUtils
 from utils.common_utils import CommonUtils
+from utils.file_edit_utils import FileEditUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
+
+FieldArgs = Union[CreateBasicEntityFieldArgs, CreateEnumEntityFieldArgs]
+
+# Flags and options of a :CreateEntityField fields line
+FIELD_SPEC_FLAGS = {
+    "mandatory": Other.MANDATORY.value,
+    "unique": Other.UNIQUE.value,
+    "lob": Other.LARGE_OBJECT.value,
+    "large_object": Other.LARGE_OBJECT.value,
+}
+FIELD_SPEC_VALUES = [
+    "length",
+    "precision",
+    "scale",
+    "temporal",
+    "time_zone_storage",
+    "enum_type",
+]
+# Options that only apply to one kind of field type
+BASIC_FIELD_SPEC_VALUES = ["precision", "scale", "temporal", "time_zone_storage"]
+ENUM_FIELD_SPEC_VALUES = ["enum_type"]
+JAVA_IDENTIFIER = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+JAVA_RESERVED_WORDS = set(
+    "abstract assert boolean break byte case catch char class const continue "
+    "default do double else enum extends false final finally float for goto if "
+    "implements import instanceof int interface long native new null package "
+    "private protected public return short static strictfp super switch "
+    "synchronized this throw throws transient true try void volatile while _".split()
+)
 
 
 class EntityFieldUtils:
@@ -28,6 +61,7 @@ class EntityFieldUtils:
         java_basic_types: list[tuple],
         treesitter_utils: TreesitterUtils,
         common_utils: CommonUtils,
+        file_edit_utils: FileEditUtils,
         logging: Logging,
     ):
         self.nvim = nvim
@@ -35,6 +69,7 @@ class EntityFieldUtils:
         self.logging = logging
         self.java_basic_types = java_basic_types
         self.common_utils = common_utils
+        self.file_edit_utils = file_edit_utils
 
     def merge_field_params(self, params: List[str], debug: bool = False) -> str:
         merged_params = ", ".join(params)
@@ -66,8 +101,10 @@ class EntityFieldUtils:
             )
         return field_body_line
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_basic_field_template(
         self,
+        file_edit: FileEdit,
         field_package_path: str,
         field_type: str,
         field_name: str,
@@ -88,10 +125,14 @@ class EntityFieldUtils:
         temporal_body: Optional[str] = None
         lob_body: Optional[str] = None
         imports_to_add.append("jakarta.persistence.Column")
-        if "." in field_package_path:
-            imports_to_add.append(field_package_path + "." + field_type)
+        # Primitives come without a package (or "None" from the basic field UI)
+        qualified_type = (
+            f"{field_package_path}.{field_type}" if field_package_path else field_type
+        )
+        if field_package_path and "." in field_package_path:
+            imports_to_add.append(qualified_type)
         if (
-            field_package_path + "." + field_type
+            qualified_type
             in [
                 "java.lang.String",
                 "java.net.URL",
@@ -107,7 +148,7 @@ class EntityFieldUtils:
         ):
             column_params.append(f"length = {field_length}")
         if (
-            field_package_path + "." + field_type
+            qualified_type
             in [
                 "java.time.OffsetDateTime",
                 "java.time.OffsetTime",
@@ -125,7 +166,7 @@ class EntityFieldUtils:
                 f"@TimeZoneStorage(TimeZoneStorageType.{field_time_zone_storage.value})"
             )
         if (
-            field_package_path + "." + field_type
+            qualified_type
             in [
                 "java.util.Date",
                 "java.util.Calendar",
@@ -137,7 +178,7 @@ class EntityFieldUtils:
             )
             temporal_body = f"@Temporal(TemporalType.{field_temporal.value})"
         if (
-            field_package_path + "." + field_type == "java.math.BigDecimal"
+            qualified_type == "java.math.BigDecimal"
             and field_precision is not None
             and field_scale is not None
         ):
@@ -157,12 +198,12 @@ class EntityFieldUtils:
         )
         template = ""
         if lob_body:
-            template += "\n\t" + lob_body
+            template += "\n" + lob_body
         if time_zone_storage_body:
-            template += "\n\t" + time_zone_storage_body
+            template += "\n" + time_zone_storage_body
         if temporal_body:
-            template += "\n\t" + temporal_body
-        template += "\n\t" + column_body + "\n\t" + field_body + "\n"
+            template += "\n" + temporal_body
+        template += "\n" + column_body + "\n" + field_body + "\n"
         if debug:
             self.logging.log(
                 [
@@ -174,11 +215,13 @@ class EntityFieldUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return template
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_id_field_template(
         self,
+        file_edit: FileEdit,
         field_package_path: str,
         field_type: str,
         field_name: str,
@@ -239,12 +282,12 @@ class EntityFieldUtils:
             self.common_utils.generate_field_name(field_name, False, debug),
             debug,
         )
-        template = "\n\t" + id_field_body
+        template = "\n" + id_field_body
         if generated_value_body:
-            template += "\n\t" + generated_value_body
+            template += "\n" + generated_value_body
         if sequence_generator_body:
-            template += "\n\t" + sequence_generator_body
-        template += "\n\t" + column_body + "\n\t" + field_body + "\n"
+            template += "\n" + sequence_generator_body
+        template += "\n" + column_body + "\n" + field_body + "\n"
         if debug:
             self.logging.log(
                 [
@@ -256,11 +299,13 @@ class EntityFieldUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return template
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_enum_field_template(
         self,
+        file_edit: FileEdit,
         field_package_path: str,
         field_type: str,
         field_name: str,
@@ -294,7 +339,7 @@ class EntityFieldUtils:
             debug,
         )
         template = (
-            "\n\t" + enumerated_body + "\n\t" + column_body + "\n\t" + field_body + "\n"
+            "\n" + enumerated_body + "\n" + column_body + "\n" + field_body + "\n"
         )
         if debug:
             self.logging.log(
@@ -307,45 +352,17 @@ class EntityFieldUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return template
 
-    def update_buffer(
-        self, buffer_tree: Tree, buffer_path: Path, template: str, debug: bool = False
-    ) -> None:
-        updated_buffer_tree = self.treesitter_utils.add_imports_to_file_tree(
-            buffer_tree, debug
-        )
-        insert_byte = self.treesitter_utils.get_entity_field_insert_byte(
-            updated_buffer_tree, debug
-        )
-        if not insert_byte:
-            error_msg = "Unable to get field insert position"
-            self.logging.log(error_msg, LogLevel.ERROR)
-            raise ValueError(error_msg)
-        updated_buffer_tree = self.treesitter_utils.insert_code_at_position(
-            template, insert_byte, updated_buffer_tree
-        )
-        self.treesitter_utils.update_buffer(
-            tree=updated_buffer_tree, buffer_path=buffer_path, save=True, debug=debug
-        )
-        if debug:
-            self.logging.log(
-                [
-                    f"Template:\n{template}\n"
-                    f"Node before:\n{self.treesitter_utils.get_node_text_as_string(buffer_tree.root_node)}\n"
-                    f"Node after:\n{self.treesitter_utils.get_node_text_as_string(updated_buffer_tree.root_node)}\n"
-                ],
-                LogLevel.DEBUG,
-            )
-
-    def create_basic_entity_field(
+    def add_basic_entity_field(
         self,
-        buffer_file_data: JavaFileData,
+        file_edit: FileEdit,
         args: CreateBasicEntityFieldArgs,
         debug: bool = False,
     ) -> None:
         template = self.generate_basic_field_template(
+            file_edit,
             field_package_path=args.field_package_path,
             field_type=args.field_type,
             field_name=args.field_name,
@@ -359,17 +376,16 @@ class EntityFieldUtils:
             large_object=True if Other.LARGE_OBJECT in args.other_enum else False,
             debug=debug,
         )
-        self.update_buffer(
-            buffer_file_data.tree, buffer_file_data.path, template, debug
-        )
+        file_edit.members.append(template)
 
-    def create_enum_entity_field(
+    def add_enum_entity_field(
         self,
-        buffer_file_data: JavaFileData,
+        file_edit: FileEdit,
         args: CreateEnumEntityFieldArgs,
         debug: bool = False,
     ) -> None:
         template = self.generate_enum_field_template(
+            file_edit,
             field_package_path=args.field_package_path,
             field_type=args.field_type,
             field_name=args.field_name,
@@ -379,9 +395,27 @@ class EntityFieldUtils:
             unique=True if Other.UNIQUE in args.other_enum else False,
             debug=debug,
         )
-        self.update_buffer(
-            buffer_file_data.tree, buffer_file_data.path, template, debug
-        )
+        file_edit.members.append(template)
+
+    def create_basic_entity_field(
+        self,
+        buffer_file_data: JavaFileData,
+        args: CreateBasicEntityFieldArgs,
+        debug: bool = False,
+    ) -> None:
+        file_edit = FileEdit(path=buffer_file_data.path, tree=buffer_file_data.tree)
+        self.add_basic_entity_field(file_edit, args, debug)
+        self.file_edit_utils.apply_file_edits([file_edit], debug)
+
+    def create_enum_entity_field(
+        self,
+        buffer_file_data: JavaFileData,
+        args: CreateEnumEntityFieldArgs,
+        debug: bool = False,
+    ) -> None:
+        file_edit = FileEdit(path=buffer_file_data.path, tree=buffer_file_data.tree)
+        self.add_enum_entity_field(file_edit, args, debug)
+        self.file_edit_utils.apply_file_edits([file_edit], debug)
 
     def create_id_entity_field(
         self,
@@ -389,7 +423,9 @@ class EntityFieldUtils:
         args: CreateIdEntityFieldArgs,
         debug: bool = False,
     ) -> None:
+        file_edit = FileEdit(path=buffer_file_data.path, tree=buffer_file_data.tree)
         template = self.generate_id_field_template(
+            file_edit,
             field_package_path=args.field_package_path,
             field_type=args.field_type,
             field_name=args.field_name,
@@ -402,6 +438,129 @@ class EntityFieldUtils:
             mandatory=True if Other.MANDATORY in args.other_enum else False,
             debug=debug,
         )
-        self.update_buffer(
-            buffer_file_data.tree, buffer_file_data.path, template, debug
+        file_edit.members.append(template)
+        self.file_edit_utils.apply_file_edits([file_edit], debug)
+
+    def resolve_field_spec_type(
+        self, type_name: str, debug: bool = False
+    ) -> Optional[Union[Tuple[str, str], JavaFileData]]:
+        # Basic types win over enums; "Date" is java.util.Date unless qualified
+        package_path, _, simple_name = type_name.rpartition(".")
+        for basic_type, basic_package_path in self.java_basic_types:
+            if basic_type == simple_name and package_path in ("", basic_package_path):
+                # Primitives and their arrays have no package
+                return (basic_package_path or "", basic_type)
+        java_files_index = self.common_utils.get_java_files_index(debug)
+        matching_enums = [
+            f
+            for f in java_files_index.get_by_name(type_name)
+            if f.declaration_type == DeclarationType.ENUM
+        ]
+        if len(matching_enums) == 1:
+            return matching_enums[0]
+        return None
+
+    def parse_field_spec_line(self, line: str, debug: bool = False) -> FieldArgs:
+        field_name, type_name, *options = line.split()
+        if (
+            not JAVA_IDENTIFIER.fullmatch(field_name)
+            or field_name in JAVA_RESERVED_WORDS
+        ):
+            raise ValueError(f"'{field_name}' isn't a valid Java field name")
+        flags: List[str] = []
+        values: Dict[str, str] = {}
+        for option in options:
+            key, has_value, value = option.partition("=")
+            if has_value:
+                if key not in FIELD_SPEC_VALUES:
+                    raise ValueError(f"unknown option '{key}'")
+                values[key] = value
+            elif key in FIELD_SPEC_FLAGS:
+                flags.append(FIELD_SPEC_FLAGS[key])
+            else:
+                raise ValueError(f"unknown flag '{key}'")
+        field_type = self.resolve_field_spec_type(type_name, debug)
+        if field_type is None:
+            raise ValueError(f"'{type_name}' is neither a basic type nor a single enum")
+        # Options of the other kind of type would be dropped without a word
+        invalid_options = (
+            BASIC_FIELD_SPEC_VALUES
+            if isinstance(field_type, JavaFileData)
+            else ENUM_FIELD_SPEC_VALUES
         )
+        for key in invalid_options:
+            if key in values:
+                raise ValueError(f"option '{key}' doesn't apply to '{type_name}'")
+        # Same arguments as the callbacks of the field UIs
+        field_kwargs: Dict[str, Any] = {"field_name": field_name, "other": flags}
+        if "length" in values:
+            field_kwargs["field_length"] = values["length"]
+        field_args: FieldArgs
+        if isinstance(field_type, JavaFileData):
+            field_args = CreateEnumEntityFieldArgs(
+                field_path=str(field_type.path),
+                field_package_path=field_type.package_path,
+                field_type=field_type.file_name,
+                enum_type=values.get("enum_type", EnumType.ORDINAL.value).upper(),
+                **field_kwargs,
+            )
+        else:
+            for key in ("precision", "scale"):
+                if key in values:
+                    field_kwargs[f"field_{key}"] = values[key]
+            for key in ("temporal", "time_zone_storage"):
+                if key in values:
+                    field_kwargs[f"field_{key}"] = values[key].upper()
+            field_args = CreateBasicEntityFieldArgs(
+                field_package_path=field_type[0],
+                field_type=field_type[1],
+                **field_kwargs,
+            )
+        if debug:
+            self.logging.log(f"Field spec '{line}': {field_args}", LogLevel.DEBUG)
+        return field_args
+
+    def parse_field_specs(
+        self, lines: List[str], debug: bool = False
+    ) -> List[FieldArgs]:
+        # One field per line: <name> <type> [flag ...] [option=value ...]
+        fields_args: List[FieldArgs] = []
+        field_names: List[str] = []
+        for line_number, line in enumerate(lines, 1):
+            line = line.partition("#")[0].strip()
+            if not line:
+                continue
+            try:
+                if len(line.split()) < 2:
+                    raise ValueError("expected a field name and a type")
+                field_args = self.parse_field_spec_line(line, debug)
+                if field_args.field_name in field_names:
+                    raise ValueError(f"duplicate field '{field_args.field_name}'")
+            except ValueError as e:
+                error_msg = f"Invalid field spec on line {line_number}: {e}"
+                self.logging.log(error_msg, LogLevel.ERROR)
+                raise ValueError(error_msg)
+            field_names.append(field_args.field_name)
+            fields_args.append(field_args)
+        if not fields_args:
+            error_msg = "No fields to create"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        return fields_args
+
+    def create_entity_fields(
+        self,
+        buffer_file_data: JavaFileData,
+        fields_args: List[FieldArgs],
+        debug: bool = False,
+    ) -> None:
+        # All fields go into one edit: one tree edit and one buffer update
+        file_edit = FileEdit(path=buffer_file_data.path, tree=buffer_file_data.tree)
+        for field_args in fields_args:
+            if isinstance(field_args, CreateEnumEntityFieldArgs):
+                self.add_enum_entity_field(file_edit, field_args, debug)
+            else:
+                self.add_basic_entity_field(file_edit, field_args, debug)
+        self.file_edit_utils.apply_file_edits([file_edit], debug)
+        if debug:
+            self.logging.log(f"Created fields: {len(fields_args)}", LogLevel.DEBUG)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from textwrap import dedent
 from typing import List, Optional, Tuple
 
 from tree_sitter import Tree
@@ -10,14 +11,18 @@ from custom_types.log_level import LogLevel
 from custom_types.java_file_data import JavaFileData
 from custom_types.collection_type import CollectionType
 from custom_types.fetch_type import FetchType
+from custom_types.file_edit import FileEdit
 from custom_types.mapping_type import MappingType
 from custom_types.cascade_type import CascadeType
 from custom_types.other import Other
+from custom_types.trace_phase import TracePhase
 from utils.path_utils import PathUtils
 from utils.treesitter_utils import TreesitterUtils
 from pynvim.api.nvim import Nvim
 from utils.common_utils import CommonUtils
+from utils.file_edit_utils import FileEditUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
 
 
 class EntityRelationshipUtils:
@@ -27,16 +32,19 @@ class EntityRelationshipUtils:
         treesitter_utils: TreesitterUtils,
         path_utils: PathUtils,
         common_utils: CommonUtils,
+        file_edit_utils: FileEditUtils,
         logging: Logging,
     ):
         self.nvim = nvim
         self.treesitter_utils = treesitter_utils
         self.path_utils = path_utils
         self.common_utils = common_utils
+        self.file_edit_utils = file_edit_utils
         self.logging = logging
 
     def process_cascades_params(
         self,
+        file_edit: FileEdit,
         cascade_persist: bool,
         cascade_merge: bool,
         cascade_remove: bool,
@@ -75,11 +83,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return merged_params
 
     def process_extra_params(
         self,
+        file_edit: FileEdit,
         nullable: Optional[bool] = None,
         optional: Optional[bool] = None,
         unique: Optional[bool] = None,
@@ -115,7 +124,7 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return joined_params
 
     def proccess_collection_type(
@@ -142,21 +151,24 @@ class EntityRelationshipUtils:
         class_name: str,
         debug: bool = False,
     ) -> JavaFileData:
-        all_java_files = self.common_utils.get_all_java_files_data(debug)
-        all_entities = [f for f in all_java_files if f.is_jpa_entity]
-        return [f for f in all_entities if f.file_name == class_name][0]
+        return self.common_utils.get_java_file_data_by_name(
+            class_name, entities_only=True, debug=debug
+        )
 
     def get_entity_data_by_path(
         self,
         file_path: Path,
         debug: bool = False,
     ) -> JavaFileData:
-        all_java_files = self.common_utils.get_all_java_files_data(debug)
-        all_entities = [f for f in all_java_files if f.is_jpa_entity]
-        return [f for f in all_entities if f.path == file_path][0]
+        file_data = self.common_utils.get_java_file_data_by_path(file_path, debug)
+        if not file_data.is_jpa_entity:
+            error_msg = f"{str(file_path)} is not an Entity"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        return file_data
 
     def generate_equals_hashcode_methods(
-        self, field_type: str, file_tree: Tree, debug: bool = False
+        self, file_edit: FileEdit, field_type: str, file_tree: Tree, debug: bool = False
     ) -> Optional[str]:
         imports_to_add: List[str] = [
             "org.hibernate.proxy.HibernateProxy",
@@ -171,35 +183,39 @@ class EntityRelationshipUtils:
             )
         )
         snaked_field_name = self.common_utils.convert_to_snake_case(field_type, debug)
-        equals_method = f"""
-        @Override
-        public final boolean equals(Object o) {{
-            if (this == o) return true;
-            if (o == null) return false;
-            Class<?> oEffectiveClass =
-                    o instanceof HibernateProxy
-                            ? ((HibernateProxy) o).getHibernateLazyInitializer().getPersistentClass()
-                            : o.getClass();
-            Class<?> thisEffectiveClass =
-                    this instanceof HibernateProxy
-                            ? ((HibernateProxy) this).getHibernateLazyInitializer().getPersistentClass()
-                            : this.getClass();
-            if (thisEffectiveClass != oEffectiveClass) return false;
-            {field_type} {snaked_field_name} = ({field_type}) o;
-            return getId() != null && Objects.equals(getId(), {snaked_field_name}.getId());
-        }}
-        """
-        hashcode_method = """
-        @Override
-        public final int hashCode() {
-            return this instanceof HibernateProxy
-                    ? ((HibernateProxy) this)
-                            .getHibernateLazyInitializer()
-                            .getPersistentClass()
-                            .hashCode()
-                    : getClass().hashCode();
-        }
-        """
+        equals_method = dedent(
+            f"""
+            @Override
+            public final boolean equals(Object o) {{
+                if (this == o) return true;
+                if (o == null) return false;
+                Class<?> oEffectiveClass =
+                        o instanceof HibernateProxy
+                                ? ((HibernateProxy) o).getHibernateLazyInitializer().getPersistentClass()
+                                : o.getClass();
+                Class<?> thisEffectiveClass =
+                        this instanceof HibernateProxy
+                                ? ((HibernateProxy) this).getHibernateLazyInitializer().getPersistentClass()
+                                : this.getClass();
+                if (thisEffectiveClass != oEffectiveClass) return false;
+                {field_type} {snaked_field_name} = ({field_type}) o;
+                return getId() != null && Objects.equals(getId(), {snaked_field_name}.getId());
+            }}
+            """
+        )
+        hashcode_method = dedent(
+            """
+            @Override
+            public final int hashCode() {
+                return this instanceof HibernateProxy
+                        ? ((HibernateProxy) this)
+                                .getHibernateLazyInitializer()
+                                .getPersistentClass()
+                                .hashCode()
+                        : getClass().hashCode();
+            }
+            """
+        )
         if debug:
             self.logging.log(
                 [
@@ -212,13 +228,14 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         if not buffer_has_equals_method and not buffer_has_hashcode_method:
             return equals_method + "\n" + hashcode_method
         return None
 
     def generate_one_to_many_annotation_body(
         self,
+        file_edit: FileEdit,
         one_field_type: str,
         cascade_persist: bool,
         cascade_merge: bool,
@@ -232,6 +249,7 @@ class EntityRelationshipUtils:
         body = "@OneToMany"
         params: List[str] = []
         cascade_param: Optional[str] = self.process_cascades_params(
+            file_edit,
             cascade_persist,
             cascade_merge,
             cascade_remove,
@@ -240,6 +258,7 @@ class EntityRelationshipUtils:
             debug,
         )
         extra_params: str = self.process_extra_params(
+            file_edit,
             orphan_removal=orphan_removal,
             mapped_by=self.common_utils.convert_to_snake_case(one_field_type),
             debug=debug,
@@ -258,11 +277,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_many_to_one_annotation_body(
         self,
+        file_edit: FileEdit,
         fetch_type: FetchType,
         cascade_persist: bool,
         cascade_merge: bool,
@@ -276,6 +296,7 @@ class EntityRelationshipUtils:
         body = "@ManyToOne"
         params: List[str] = []
         cascade_param: Optional[str] = self.process_cascades_params(
+            file_edit,
             cascade_persist,
             cascade_merge,
             cascade_remove,
@@ -284,6 +305,7 @@ class EntityRelationshipUtils:
             debug,
         )
         extra_params: str = self.process_extra_params(
+            file_edit,
             fetch_type=fetch_type if fetch_type != FetchType.NONE else None,
             optional=not mandatory,
             debug=debug,
@@ -301,11 +323,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_many_to_many_annotation_body(
         self,
+        file_edit: FileEdit,
         cascade_persist: bool,
         cascade_merge: bool,
         cascade_refresh: bool,
@@ -318,6 +341,7 @@ class EntityRelationshipUtils:
         params: List[str] = []
         extra_params: Optional[str]
         cascade_param: Optional[str] = self.process_cascades_params(
+            file_edit,
             cascade_persist,
             cascade_merge,
             False,
@@ -327,6 +351,7 @@ class EntityRelationshipUtils:
         )
         if mapped_by is not None:
             extra_params = self.process_extra_params(
+                file_edit,
                 mapped_by=mapped_by if mapped_by is not None else None,
                 debug=debug,
             )
@@ -343,11 +368,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_one_to_one_annotation_body(
         self,
+        file_edit: FileEdit,
         cascade_persist: bool,
         cascade_merge: bool,
         cascade_remove: bool,
@@ -362,6 +388,7 @@ class EntityRelationshipUtils:
         body = "@OneToOne"
         params: List[str] = []
         cascade_param: Optional[str] = self.process_cascades_params(
+            file_edit,
             cascade_persist,
             cascade_merge,
             cascade_remove,
@@ -370,6 +397,7 @@ class EntityRelationshipUtils:
             debug,
         )
         extra_params: str = self.process_extra_params(
+            file_edit,
             mapped_by=(
                 self.common_utils.convert_to_snake_case(inverse_field_type)
                 if inverse_field_type is not None
@@ -392,11 +420,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_join_table_body(
         self,
+        file_edit: FileEdit,
         owning_side_field_type: str,
         inverse_side_field_type: str,
         debug: bool = False,
@@ -427,11 +456,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_join_column_body(
         self,
+        file_edit: FileEdit,
         inverse_side_field_type: str,
         mandatory: bool,
         unique: bool,
@@ -446,7 +476,11 @@ class EntityRelationshipUtils:
             + "_id"
         )
         extra_params = self.process_extra_params(
-            name=snaked_field_name, nullable=not mandatory, unique=unique, debug=debug
+            file_edit,
+            name=snaked_field_name,
+            nullable=not mandatory,
+            unique=unique,
+            debug=debug,
         )
         body += "(" + extra_params + ")"
         if debug:
@@ -457,11 +491,12 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
     def generate_field_body(
         self,
+        file_edit: FileEdit,
         field_type: str,
         is_collection: bool,
         collection_type: Optional[CollectionType],
@@ -495,11 +530,13 @@ class EntityRelationshipUtils:
                 ],
                 LogLevel.DEBUG,
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_one_to_many_template(
         self,
+        file_edit: FileEdit,
         owning_side_file_data: JavaFileData,
         inverse_side_file_data: JavaFileData,
         cascade_persist: bool,
@@ -515,6 +552,7 @@ class EntityRelationshipUtils:
             owning_side_file_data.package_path + "." + owning_side_file_data.file_name
         ]
         one_to_many_body = self.generate_one_to_many_annotation_body(
+            file_edit,
             inverse_side_file_data.file_name,
             cascade_persist,
             cascade_merge,
@@ -525,16 +563,18 @@ class EntityRelationshipUtils:
             debug,
         )
         field_body = self.generate_field_body(
-            owning_side_file_data.file_name, True, collection_type, debug
+            file_edit, owning_side_file_data.file_name, True, collection_type, debug
         )
-        body = "\n\t" + one_to_many_body + "\n\t" + field_body + "\n"
+        body = "\n" + one_to_many_body + "\n" + field_body + "\n"
         if debug:
             self.logging.log(f"Body:\n{body}", LogLevel.DEBUG)
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return body
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_many_to_one_template(
         self,
+        file_edit: FileEdit,
         inverse_side_file_data: JavaFileData,
         fetch_type: FetchType,
         cascade_persist: bool,
@@ -550,6 +590,7 @@ class EntityRelationshipUtils:
             inverse_side_file_data.package_path + "." + inverse_side_file_data.file_name
         ]
         many_to_one_body = self.generate_many_to_one_annotation_body(
+            file_edit,
             fetch_type,
             cascade_persist,
             cascade_merge,
@@ -560,17 +601,17 @@ class EntityRelationshipUtils:
             debug,
         )
         join_column_body = self.generate_join_column_body(
-            inverse_side_file_data.file_name, mandatory, unique, debug
+            file_edit, inverse_side_file_data.file_name, mandatory, unique, debug
         )
         field_body = self.generate_field_body(
-            inverse_side_file_data.file_name, False, None, debug
+            file_edit, inverse_side_file_data.file_name, False, None, debug
         )
         complete_field_body = (
-            "\n\t"
+            "\n"
             + many_to_one_body
-            + "\n\t"
+            + "\n"
             + join_column_body
-            + "\n\t"
+            + "\n"
             + field_body
             + "\n"
         )
@@ -578,11 +619,13 @@ class EntityRelationshipUtils:
             self.logging.log(
                 f"Complete field body: {complete_field_body}", LogLevel.DEBUG
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return complete_field_body
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_one_to_one_field_template(
         self,
+        file_edit: FileEdit,
         inverse_side_file_data: JavaFileData,
         owning_side_file_data: Optional[JavaFileData],
         cascade_persist: bool,
@@ -599,6 +642,7 @@ class EntityRelationshipUtils:
             inverse_side_file_data.package_path + "." + inverse_side_file_data.file_name
         ]
         one_to_one_body = self.generate_one_to_one_annotation_body(
+            file_edit,
             cascade_persist=cascade_persist,
             cascade_merge=cascade_merge,
             cascade_remove=cascade_remove,
@@ -617,7 +661,7 @@ class EntityRelationshipUtils:
         field_body: str = ""
         if owning_side_file_data is None:
             join_column_body = self.generate_join_column_body(
-                inverse_side_file_data.file_name, mandatory, unique, debug
+                file_edit, inverse_side_file_data.file_name, mandatory, unique, debug
             )
         if owning_side_file_data is not None:
             imports_to_add.append(
@@ -626,25 +670,27 @@ class EntityRelationshipUtils:
                 + owning_side_file_data.file_name
             )
             field_body = self.generate_field_body(
-                owning_side_file_data.file_name, False, None, debug
+                file_edit, owning_side_file_data.file_name, False, None, debug
             )
         else:
             field_body = self.generate_field_body(
-                inverse_side_file_data.file_name, False, None, debug
+                file_edit, inverse_side_file_data.file_name, False, None, debug
             )
-        complete_field_body = "\n\t" + one_to_one_body
+        complete_field_body = "\n" + one_to_one_body
         if owning_side_file_data is None:
-            complete_field_body += "\n\t" + join_column_body
-        complete_field_body += "\n\t" + field_body + "\n"
+            complete_field_body += "\n" + join_column_body
+        complete_field_body += "\n" + field_body + "\n"
         if debug:
             self.logging.log(
                 f"Complete field body: {complete_field_body}", LogLevel.DEBUG
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return complete_field_body
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_many_to_many_field_template(
         self,
+        file_edit: FileEdit,
         owning_side_file_data: JavaFileData,
         inverse_side_file_data: JavaFileData,
         cascade_persist: bool,
@@ -659,6 +705,7 @@ class EntityRelationshipUtils:
             inverse_side_file_data.package_path + "." + inverse_side_file_data.file_name
         ]
         many_to_many_body = self.generate_many_to_many_annotation_body(
+            file_edit,
             cascade_persist,
             cascade_merge,
             cascade_refresh,
@@ -670,27 +717,37 @@ class EntityRelationshipUtils:
         field_body: str = ""
         if owning_side:
             join_table_body = self.generate_join_table_body(
-                owning_side_file_data.file_name, inverse_side_file_data.file_name, debug
+                file_edit,
+                owning_side_file_data.file_name,
+                inverse_side_file_data.file_name,
+                debug,
             )
             field_body = self.generate_field_body(
-                inverse_side_file_data.file_name, True, CollectionType.SET
+                file_edit, inverse_side_file_data.file_name, True, CollectionType.SET
             )
         else:
             field_body = self.generate_field_body(
-                owning_side_file_data.file_name, True, CollectionType.SET, debug
+                file_edit,
+                owning_side_file_data.file_name,
+                True,
+                CollectionType.SET,
+                debug,
             )
             imports_to_add.append(
                 owning_side_file_data.package_path
                 + "."
                 + owning_side_file_data.file_name
             )
-        complete_field_body = "\n\t" + many_to_many_body
+        complete_field_body = "\n" + many_to_many_body
         if owning_side:
-            complete_field_body += "\n\t" + join_table_body
-        complete_field_body += "\n\t" + field_body + "\n"
+            complete_field_body += "\n" + join_table_body
+        complete_field_body += "\n" + field_body + "\n"
         if not owning_side and equals_hashcode:
             equals_and_hashcode = self.generate_equals_hashcode_methods(
-                inverse_side_file_data.file_name, inverse_side_file_data.tree, debug
+                file_edit,
+                inverse_side_file_data.file_name,
+                inverse_side_file_data.tree,
+                debug,
             )
             if equals_and_hashcode is not None:
                 complete_field_body += equals_and_hashcode
@@ -698,38 +755,9 @@ class EntityRelationshipUtils:
             self.logging.log(
                 f"Complete field body: {complete_field_body}", LogLevel.DEBUG
             )
-        self.treesitter_utils.add_to_importing_list(imports_to_add, debug)
+        file_edit.add_imports(imports_to_add)
         return complete_field_body
 
-    def update_buffer(
-        self, buffer_tree: Tree, buffer_path: Path, template: str, debug: bool = False
-    ) -> None:
-        updated_buffer_tree = self.treesitter_utils.add_imports_to_file_tree(
-            buffer_tree, debug
-        )
-        insert_byte = self.treesitter_utils.get_entity_field_insert_byte(
-            updated_buffer_tree, debug
-        )
-        if not insert_byte:
-            error_msg = "Unable to get field insert position"
-            self.logging.log(error_msg, LogLevel.ERROR)
-            raise ValueError(error_msg)
-        updated_buffer_tree = self.treesitter_utils.insert_code_at_position(
-            template, insert_byte, updated_buffer_tree
-        )
-        self.treesitter_utils.update_buffer(
-            tree=updated_buffer_tree, buffer_path=buffer_path, save=True, debug=debug
-        )
-        if debug:
-            self.logging.log(
-                [
-                    f"Template:\n{template}\n"
-                    f"Node before:\n{self.treesitter_utils.get_node_text_as_string(buffer_tree.root_node)}\n"
-                    f"Node after:\n{self.treesitter_utils.get_node_text_as_string(updated_buffer_tree.root_node)}\n"
-                ],
-                LogLevel.DEBUG,
-            )
-
     def create_many_to_one_relationship_field(
         self,
         owning_side_file_data: JavaFileData,
@@ -737,7 +765,12 @@ class EntityRelationshipUtils:
         args: CreateManyToOneRelArgs,
         debug: bool = False,
     ):
+        file_edits: List[FileEdit] = []
+        owning_side_edit = FileEdit(
+            path=owning_side_file_data.path, tree=owning_side_file_data.tree
+        )
         field_template = self.generate_many_to_one_template(
+            owning_side_edit,
             inverse_side_file_data=inverse_side_file_data,
             fetch_type=args.fetch_type_enum,
             cascade_persist=True
@@ -759,14 +792,14 @@ class EntityRelationshipUtils:
             unique=True if Other.UNIQUE in args.owning_side_other_enum else False,
             debug=debug,
         )
-        self.update_buffer(
-            owning_side_file_data.tree,
-            owning_side_file_data.path,
-            field_template,
-            debug,
-        )
+        owning_side_edit.members.append(field_template)
+        file_edits.append(owning_side_edit)
         if args.mapping_type_enum == MappingType.BIDIRECTIONAL_JOIN_COLUMN:
+            inverse_side_edit = FileEdit(
+                path=inverse_side_file_data.path, tree=inverse_side_file_data.tree
+            )
             field_template = self.generate_one_to_many_template(
+                inverse_side_edit,
                 owning_side_file_data=owning_side_file_data,
                 inverse_side_file_data=inverse_side_file_data,
                 cascade_persist=True
@@ -789,12 +822,9 @@ class EntityRelationshipUtils:
                 else False,
                 collection_type=args.collection_type_enum,
             )
-            self.update_buffer(
-                inverse_side_file_data.tree,
-                inverse_side_file_data.path,
-                field_template,
-                debug,
-            )
+            inverse_side_edit.members.append(field_template)
+            file_edits.append(inverse_side_edit)
+        self.file_edit_utils.apply_file_edits(file_edits, debug)
 
     def create_one_to_one_relationship_field(
         self,
@@ -803,7 +833,12 @@ class EntityRelationshipUtils:
         args: CreateOneToOneRelArgs,
         debug: bool = False,
     ):
+        file_edits: List[FileEdit] = []
+        owning_side_edit = FileEdit(
+            path=owning_side_file_data.path, tree=owning_side_file_data.tree
+        )
         field_template = self.generate_one_to_one_field_template(
+            owning_side_edit,
             inverse_side_file_data=inverse_side_file_data,
             owning_side_file_data=None,
             cascade_persist=True
@@ -828,14 +863,14 @@ class EntityRelationshipUtils:
             else False,
             debug=debug,
         )
-        self.update_buffer(
-            owning_side_file_data.tree,
-            owning_side_file_data.path,
-            field_template,
-            debug,
-        )
+        owning_side_edit.members.append(field_template)
+        file_edits.append(owning_side_edit)
         if args.mapping_type_enum != MappingType.UNIDIRECTIONAL_JOIN_COLUMN:
+            inverse_side_edit = FileEdit(
+                path=inverse_side_file_data.path, tree=inverse_side_file_data.tree
+            )
             field_template = self.generate_one_to_one_field_template(
+                inverse_side_edit,
                 inverse_side_file_data=inverse_side_file_data,
                 owning_side_file_data=owning_side_file_data,
                 cascade_persist=True
@@ -862,12 +897,9 @@ class EntityRelationshipUtils:
                 else False,
                 debug=debug,
             )
-            self.update_buffer(
-                inverse_side_file_data.tree,
-                inverse_side_file_data.path,
-                field_template,
-                debug,
-            )
+            inverse_side_edit.members.append(field_template)
+            file_edits.append(inverse_side_edit)
+        self.file_edit_utils.apply_file_edits(file_edits, debug)
 
     def create_many_to_many_relationship_field(
         self,
@@ -876,7 +908,12 @@ class EntityRelationshipUtils:
         args: CreateManyToManyRelArgs,
         debug: bool = False,
     ):
+        file_edits: List[FileEdit] = []
+        owning_side_edit = FileEdit(
+            path=owning_side_file_data.path, tree=owning_side_file_data.tree
+        )
         field_template = self.generate_many_to_many_field_template(
+            owning_side_edit,
             owning_side_file_data=owning_side_file_data,
             inverse_side_file_data=inverse_side_file_data,
             cascade_persist=True
@@ -895,14 +932,14 @@ class EntityRelationshipUtils:
             owning_side=True,
             debug=debug,
         )
-        self.update_buffer(
-            owning_side_file_data.tree,
-            owning_side_file_data.path,
-            field_template,
-            debug,
-        )
+        owning_side_edit.members.append(field_template)
+        file_edits.append(owning_side_edit)
         if args.mapping_type_enum != MappingType.UNIDIRECTIONAL_JOIN_COLUMN:
+            inverse_side_edit = FileEdit(
+                path=inverse_side_file_data.path, tree=inverse_side_file_data.tree
+            )
             field_template = self.generate_many_to_many_field_template(
+                inverse_side_edit,
                 owning_side_file_data=owning_side_file_data,
                 inverse_side_file_data=inverse_side_file_data,
                 cascade_persist=True
@@ -923,9 +960,6 @@ class EntityRelationshipUtils:
                 owning_side=False,
                 debug=debug,
             )
-            self.update_buffer(
-                inverse_side_file_data.tree,
-                inverse_side_file_data.path,
-                field_template,
-                debug,
-            )
+            inverse_side_edit.members.append(field_template)
+            file_edits.append(inverse_side_edit)
+        self.file_edit_utils.apply_file_edits(file_edits, debug)
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Dict, List
+
+from tree_sitter import Tree
+
+from custom_types.file_edit import FileEdit
+from custom_types.log_level import LogLevel
+from utils.formatter_utils import FormatterUtils
+from utils.logging import Logging
+from utils.treesitter_utils import TreesitterUtils
+
+
+class FileEditUtils:
+    def __init__(
+        self,
+        treesitter_utils: TreesitterUtils,
+        formatter_utils: FormatterUtils,
+        logging: Logging,
+    ):
+        self.treesitter_utils = treesitter_utils
+        self.formatter_utils = formatter_utils
+        self.logging = logging
+
+    def merge_file_edits(self, file_edits: List[FileEdit]) -> List[FileEdit]:
+        # Both sides of a self-referencing relationship target the same file
+        merged_edits: Dict[Path, FileEdit] = {}
+        for file_edit in file_edits:
+            merged_edit = merged_edits.get(file_edit.path)
+            if merged_edit is None:
+                merged_edits[file_edit.path] = FileEdit(
+                    path=file_edit.path,
+                    tree=file_edit.tree,
+                    imports=list(file_edit.imports),
+                    members=list(file_edit.members),
+                )
+                continue
+            merged_edit.add_imports(file_edit.imports)
+            merged_edit.members.extend(file_edit.members)
+        return list(merged_edits.values())
+
+    def prepare_file_edit(self, file_edit: FileEdit, debug: bool = False) -> Tree:
+        if file_edit.tree is None:
+            error_msg = f"No tree to edit for {str(file_edit.path)}"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        updated_tree = self.treesitter_utils.add_imports_to_file_tree(
+            file_edit.tree, file_edit.imports, debug
+        )
+        if file_edit.members:
+            updated_tree = self.formatter_utils.insert_class_members(
+                updated_tree, "\n\n".join(file_edit.members), debug
+            )
+        return updated_tree
+
+    def prepare_file_edits(
+        self, file_edits: List[FileEdit], debug: bool = False
+    ) -> Dict[Path, Tree]:
+        # Parsing and formatting hold the GIL, so edits are prepared one after
+        # the other
+        merged_edits = self.merge_file_edits(file_edits)
+        trees = [self.prepare_file_edit(e, debug) for e in merged_edits]
+        if debug:
+            self.logging.log(
+                f"Edited files: {[str(e.path) for e in merged_edits]}", LogLevel.DEBUG
+            )
+        return {e.path: tree for e, tree in zip(merged_edits, trees)}
+
+    def apply_file_edits(self, file_edits: List[FileEdit], debug: bool = False) -> None:
+        # Every edit is prepared before the first buffer changes, so one that
+        # fails leaves all the files untouched, and all of them are applied in
+        # a single round trip
+        self.treesitter_utils.update_buffers(
+            self.prepare_file_edits(file_edits, debug), save=True, debug=debug
+        )
@@ -0,0 +1,105 @@
+import json
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pynvim.api.nvim import Nvim
+
+from custom_types.log_level import LogLevel
+from utils.file_writer_utils import FileWriterUtils
+from utils.logging import Logging
+from utils.tracing_utils import TracingUtils
+
+# An empty summary means the file declares no type named after it
+FileSummary = Dict[str, Any]
+
+SUMMARIES_VERSION = 1
+MAX_SUMMARIES = 50_000
+
+
+class FileSummaryUtils:
+    def __init__(
+        self, nvim: Nvim, file_writer_utils: FileWriterUtils, logging: Logging
+    ):
+        self.nvim = nvim
+        self.file_writer_utils = file_writer_utils
+        self.logging = logging
+        self.summaries_path: Optional[Path] = None
+        self.summaries: Optional[Dict[str, FileSummary]] = None
+        self.new_summaries: Dict[str, FileSummary] = {}
+
+    def get_summaries_path(self) -> Path:
+        if self.summaries_path is None:
+            self.summaries_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+                "nvim-javagenie", "file-summaries.json"
+            )
+        return self.summaries_path
+
+    def read_summaries(self) -> Dict[str, FileSummary]:
+        try:
+            index = json.loads(self.get_summaries_path().read_text("utf-8"))
+            if index.get("version") == SUMMARIES_VERSION:
+                return index["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def get_summary_key(self, file_path: Path, file_bytes: bytes) -> str:
+        # Keyed by content rather than path and mtime, so entries stay valid
+        # across branches and worktrees. The stem is part of the key because it
+        # selects the declaration the summary describes.
+        digest = blake2b(file_bytes, digest_size=16).hexdigest()
+        return f"{file_path.stem}:{digest}"
+
+    def get_blob_summary_key(self, file_path: Path, blob_id: str) -> str:
+        # Git already hashed committed files, their blob ids are used unread
+        return f"{file_path.stem}:git:{blob_id}"
+
+    def load_summaries(self) -> None:
+        # Loaded by project enumerations only, single file lookups shouldn't pay
+        # for reading the whole store
+        if self.summaries is None:
+            self.summaries = self.read_summaries()
+
+    def get_summary(self, summary_key: str) -> Optional[FileSummary]:
+        if self.summaries is None:
+            return None
+        summary = self.summaries.get(summary_key)
+        TracingUtils.record_cache_access("file_summaries", summary is not None)
+        return summary
+
+    def set_summary(self, summary_key: str, summary: FileSummary) -> None:
+        if self.summaries is None:
+            return
+        self.summaries[summary_key] = summary
+        self.new_summaries[summary_key] = summary
+
+    def save_summaries(self, debug: bool = False) -> None:
+        if not self.new_summaries:
+            return
+        # Other Neovim instances may have saved since the summaries were read.
+        # Entries never go stale, so merging is a union; the oldest are dropped
+        # once the store is full.
+        summaries = self.read_summaries()
+        summaries.update(self.new_summaries)
+        if len(summaries) > MAX_SUMMARIES:
+            summaries = dict(list(summaries.items())[-MAX_SUMMARIES:])
+        try:
+            self.file_writer_utils.write_file_atomically(
+                self.get_summaries_path(),
+                json.dumps({"version": SUMMARIES_VERSION, "files": summaries}).encode(),
+            )
+        except OSError as e:
+            # The summaries are only a cache, failing to save them isn't fatal
+            self.logging.log(f"Unable to save file summaries: {e}", LogLevel.WARN)
+        if debug:
+            self.logging.log(
+                [
+                    f"Summaries path: {str(self.get_summaries_path())}",
+                    f"New summaries: {len(self.new_summaries)}",
+                    f"Total summaries: {len(summaries)}",
+                ],
+                LogLevel.DEBUG,
+            )
+        self.summaries = summaries
+        self.new_summaries = {}
@@ -0,0 +1,81 @@
+from os import chmod, fsync, replace, umask
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Dict, List, Optional
+
+from pynvim.api.nvim import Nvim
+from tree_sitter import Tree
+
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.logging import Logging
+from utils.tracing_utils import traced
+
+
+class FileWriterUtils:
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+        # umask can only be read by setting it
+        current_umask = umask(0)
+        umask(current_umask)
+        self.new_file_mode = 0o666 & ~current_umask
+
+    def write_file_atomically(self, file_path: Path, content: bytes) -> None:
+        # The temp file lives next to the target so the rename stays on one
+        # filesystem and readers never see a half written file
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_mode = (
+            file_path.stat().st_mode if file_path.exists() else self.new_file_mode
+        )
+        with NamedTemporaryFile(
+            dir=file_path.parent, prefix=f".{file_path.name}.", delete=False
+        ) as temp_file:
+            try:
+                temp_file.write(content)
+                temp_file.flush()
+                fsync(temp_file.fileno())
+                # Temp files are created private, give it the mode the file would have
+                chmod(temp_file.name, file_mode)
+            except BaseException:
+                Path(temp_file.name).unlink(missing_ok=True)
+                raise
+        replace(temp_file.name, file_path)
+
+    @traced(TracePhase.BUFFER_WRITE)
+    def write_files(
+        self,
+        files: Dict[Path, Tree],
+        open_last: bool = False,
+        debug: bool = False,
+    ) -> List[Path]:
+        written_files: List[Dict] = []
+        for file_path, file_tree in files.items():
+            content = file_tree.root_node.text
+            if not content:
+                error_msg = f"Root node of {str(file_path)} doesn't have text"
+                self.logging.log(error_msg, LogLevel.ERROR)
+                raise ValueError(error_msg)
+            if not content.endswith(b"\n"):
+                content += b"\n"
+            created = not file_path.exists()
+            self.write_file_atomically(file_path, content)
+            written_files.append({"path": str(file_path), "created": created})
+        open_path: Optional[str] = None
+        if open_last and written_files:
+            open_path = written_files[-1]["path"]
+        # One round trip per batch: LSP watchers, checktime and the optional edit
+        self.nvim.exec_lua(
+            "require('nvim_javagenie.workspace').files_written(...)",
+            written_files,
+            open_path,
+        )
+        if debug:
+            self.logging.log(
+                [
+                    f"Written files: {[f['path'] for f in written_files]}",
+                    f"Opened file: {open_path}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return list(files.keys())
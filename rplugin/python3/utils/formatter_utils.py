@@ -0,0 +1,191 @@
+from collections import Counter
+from typing import List, Optional
+
+from tree_sitter import Node, Tree
+
+from custom_types.code_style import CodeStyle
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.logging import Logging
+from utils.tracing_utils import traced
+from utils.treesitter_utils import TreesitterUtils
+
+# Templates are written with members at column 0 and one TEMPLATE_INDENT per level
+TEMPLATE_INDENT = "    "
+# Same as jdtls' default formatter profile
+DEFAULT_INDENT_UNIT = "\t"
+DEFAULT_MEMBER_BLANK_LINES = 1
+LINE_WIDTHS = [80, 100, 120]
+TAB_WIDTH = 4
+CONTINUATION_LEVELS = 2
+COMMENT_NODE_TYPES = ["line_comment", "block_comment"]
+
+
+class FormatterUtils:
+    def __init__(self, treesitter_utils: TreesitterUtils, logging: Logging):
+        self.treesitter_utils = treesitter_utils
+        self.logging = logging
+
+    def get_line_indent(self, source: bytes, byte: int) -> str:
+        line_start = source.rfind(b"\n", 0, byte) + 1
+        line = source[line_start:byte]
+        return line[: len(line) - len(line.lstrip(b" \t"))].decode("utf-8")
+
+    def starts_line(self, source: bytes, byte: int) -> bool:
+        line_start = source.rfind(b"\n", 0, byte) + 1
+        return source[line_start:byte].strip() == b""
+
+    def get_line_width(self, source: bytes) -> int:
+        longest_line = max(
+            len(line.decode("utf-8", "replace").expandtabs(TAB_WIDTH))
+            for line in source.split(b"\n")
+        )
+        # Round up to the usual formatter widths, the file may not be full yet
+        for line_width in LINE_WIDTHS:
+            if longest_line <= line_width:
+                return line_width
+        return longest_line
+
+    def detect_code_style(
+        self, file_tree: Tree, class_body: Node, debug: bool = False
+    ) -> CodeStyle:
+        source = file_tree.root_node.text or b""
+        members = class_body.named_children
+        closing_indent = self.get_line_indent(source, class_body.start_byte)
+        member_indent: Optional[str] = None
+        for member in members:
+            if self.starts_line(source, member.start_byte):
+                member_indent = self.get_line_indent(source, member.start_byte)
+                break
+        indent_unit = DEFAULT_INDENT_UNIT
+        if (
+            member_indent is not None
+            and member_indent.startswith(closing_indent)
+            and len(member_indent) > len(closing_indent)
+        ):
+            indent_unit = member_indent[len(closing_indent) :]
+        else:
+            member_indent = closing_indent + indent_unit
+        gaps = Counter(
+            max(0, next_member.start_point[0] - member.end_point[0] - 1)
+            for member, next_member in zip(members, members[1:])
+            if member.type not in COMMENT_NODE_TYPES
+            and next_member.type not in COMMENT_NODE_TYPES
+        )
+        code_style = CodeStyle(
+            indent_unit=indent_unit,
+            member_indent=member_indent,
+            closing_indent=closing_indent,
+            line_width=self.get_line_width(source),
+            member_blank_lines=(
+                gaps.most_common(1)[0][0] if gaps else DEFAULT_MEMBER_BLANK_LINES
+            ),
+        )
+        if debug:
+            self.logging.log(f"Code style: {code_style}", LogLevel.DEBUG)
+        return code_style
+
+    def split_arguments(self, arguments: str) -> List[str]:
+        parts: List[str] = []
+        depth = 0
+        in_string = False
+        part_start = 0
+        for index, char in enumerate(arguments):
+            if in_string:
+                if char == '"' and arguments[index - 1] != "\\":
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "({[":
+                depth += 1
+            elif char in ")}]":
+                depth -= 1
+            elif char == "," and depth == 0:
+                parts.append(arguments[part_start:index].strip())
+                part_start = index + 1
+        parts.append(arguments[part_start:].strip())
+        return parts
+
+    def wrap_line(self, line: str, code_style: CodeStyle) -> List[str]:
+        # Only annotation arguments are wrapped, everything else is left as written
+        if len(line.expandtabs(TAB_WIDTH)) <= code_style.line_width:
+            return [line]
+        text = line.lstrip(" \t")
+        if not text.startswith("@") or "(" not in text or not text.endswith(")"):
+            return [line]
+        indent = line[: len(line) - len(text)]
+        continuation_indent = indent + code_style.indent_unit * CONTINUATION_LEVELS
+        annotation, _, arguments = text[:-1].partition("(")
+        parts = self.split_arguments(arguments)
+        lines: List[str] = [indent + annotation + "("]
+        for index, part in enumerate(parts):
+            part += ")" if index == len(parts) - 1 else ","
+            separator = "" if lines[-1].endswith("(") else " "
+            candidate = lines[-1] + separator + part
+            if len(candidate.expandtabs(TAB_WIDTH)) <= code_style.line_width:
+                lines[-1] = candidate
+            else:
+                lines.append(continuation_indent + part)
+        return lines
+
+    def format_snippet(self, snippet: str, code_style: CodeStyle) -> List[str]:
+        lines: List[str] = []
+        blank_lines = 0
+        for template_line in snippet.split("\n"):
+            text = template_line.strip()
+            if not text:
+                blank_lines += 1
+                continue
+            prefix = template_line[: len(template_line) - len(template_line.lstrip())]
+            levels, spaces = divmod(
+                len(prefix.expandtabs(len(TEMPLATE_INDENT))), len(TEMPLATE_INDENT)
+            )
+            # Blank lines between members follow the file, ones in bodies are kept
+            if lines and blank_lines:
+                if levels == 0:
+                    blank_lines = code_style.member_blank_lines
+                lines.extend([""] * blank_lines)
+            blank_lines = 0
+            line = (
+                code_style.member_indent
+                + code_style.indent_unit * levels
+                + " " * spaces
+                + text
+            )
+            lines.extend(self.wrap_line(line, code_style))
+        return lines
+
+    @traced(TracePhase.FORMATTING)
+    def insert_class_members(
+        self, file_tree: Tree, snippet: str, debug: bool = False
+    ) -> Tree:
+        class_body = self.treesitter_utils.get_buffer_public_class_body(
+            file_tree, debug
+        )
+        if class_body is None or class_body.children[-1].type != "}":
+            error_msg = "Unable to get field insert position"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        code_style = self.detect_code_style(file_tree, class_body, debug)
+        formatted_snippet = "\n".join(self.format_snippet(snippet, code_style))
+        members = class_body.named_children
+        # Only the whitespace between the last member and the brace is rewritten
+        if members:
+            start_byte = members[-1].end_byte
+            separator = "\n" * (code_style.member_blank_lines + 1)
+        else:
+            start_byte = class_body.start_byte + 1
+            separator = "\n"
+        code = separator + formatted_snippet + "\n" + code_style.closing_indent
+        updated_tree = self.treesitter_utils.replace_byte_ranges(
+            file_tree, [(start_byte, class_body.children[-1].start_byte, code)]
+        )
+        if debug:
+            self.logging.log(
+                [
+                    f"Snippet:\n{snippet}",
+                    f"Formatted snippet:\n{formatted_snippet}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return updated_tree
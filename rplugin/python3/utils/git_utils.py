@@ -0,0 +1,113 @@
+from pathlib import Path
+from subprocess import run
+from typing import Dict, List, Optional, Set
+
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from utils.logging import Logging
+from utils.tracing_utils import traced
+
+JAVA_PATHSPEC = "*.java"
+
+
+class GitUtils:
+    # Only reads the local repository. Every method returns None when the path
+    # isn't in a git work tree or git fails, so callers can fall back to
+    # scanning the file system.
+    def __init__(self, logging: Logging):
+        self.logging = logging
+
+    @traced(TracePhase.SUBPROCESS)
+    def run_git(
+        self, repo_path: Path, args: List[str], debug: bool = False
+    ) -> Optional[str]:
+        try:
+            result = run(
+                ["git", "-C", str(repo_path), *args],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError as e:
+            if debug:
+                self.logging.log(f"Unable to run git: {e}", LogLevel.DEBUG)
+            return None
+        if debug:
+            self.logging.log(
+                [
+                    f"Command: git {' '.join(args)}",
+                    f"Return code: {result.returncode}",
+                    f"Error: {result.stderr}",
+                ],
+                LogLevel.DEBUG,
+            )
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    def get_paths(self, repo_path: Path, output: str) -> Set[Path]:
+        # Paths in -z output are NUL terminated and relative to repo_path
+        return {repo_path.joinpath(p) for p in output.split("\0") if p}
+
+    def get_head_commit(self, repo_path: Path, debug: bool = False) -> Optional[str]:
+        output = self.run_git(repo_path, ["rev-parse", "--verify", "HEAD"], debug)
+        return output.strip() if output else None
+
+    def get_java_blob_ids(
+        self, repo_path: Path, debug: bool = False
+    ) -> Optional[Dict[Path, str]]:
+        output = self.run_git(
+            repo_path, ["ls-files", "-s", "-z", "--", JAVA_PATHSPEC], debug
+        )
+        if output is None:
+            return None
+        blob_ids: Dict[Path, str] = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            # <mode> <blob id> <stage>\t<path>
+            file_info, _, file_path = entry.partition("\t")
+            blob_ids[repo_path.joinpath(file_path)] = file_info.split(" ")[1]
+        return blob_ids
+
+    def get_changed_java_paths(
+        self, repo_path: Path, from_commit: str, to_commit: str, debug: bool = False
+    ) -> Optional[Set[Path]]:
+        # Added, modified and deleted files alike, renames count as both
+        output = self.run_git(
+            repo_path,
+            [
+                "diff",
+                "--name-only",
+                "--no-renames",
+                "--relative",
+                "-z",
+                from_commit,
+                to_commit,
+                "--",
+                JAVA_PATHSPEC,
+            ],
+            debug,
+        )
+        return None if output is None else self.get_paths(repo_path, output)
+
+    def get_uncommitted_java_paths(
+        self, repo_path: Path, debug: bool = False
+    ) -> Optional[Set[Path]]:
+        # Staged, modified, deleted and untracked (but not ignored) files
+        staged_output = self.run_git(
+            repo_path,
+            ["diff", "--cached", "--name-only", "--no-renames", "--relative", "-z"]
+            + ["--", JAVA_PATHSPEC],
+            debug,
+        )
+        worktree_output = self.run_git(
+            repo_path,
+            ["ls-files", "-m", "-o", "--exclude-standard", "-z", "--", JAVA_PATHSPEC],
+            debug,
+        )
+        if staged_output is None or worktree_output is None:
+            return None
+        return self.get_paths(repo_path, staged_output) | self.get_paths(
+            repo_path, worktree_output
+        )
@@ -0,0 +1,42 @@
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Optional
+
+from custom_types.command_trace import CommandTrace
+
+if TYPE_CHECKING:
+    from utils.profiling_utils import HandlerType
+
+
+def instrumented(handler_type: "HandlerType") -> Callable:
+    # Wraps every command and callback handler: records a trace per invocation,
+    # warns when it goes over the RPC budget, records its RPC traffic while
+    # :JavaGenieRecord is on and lets an active :JavaGenieProfile or
+    # :JavaGenieMemory session know when the command, and the UI callback it
+    # opened, have finished.
+    def decorator(handler: Callable) -> Callable:
+        @wraps(handler)
+        def wrapper(self, *args, **kwargs):
+            # Imported on the first call, the decorator runs while the host loads
+            from utils.memory_utils import MemoryUtils
+            from utils.profiling_utils import ProfilingUtils
+            from utils.rpc_utils import RpcUtils
+            from utils.tracing_utils import TracingUtils
+
+            # pynvim tags the wrapper with the RPC name after we return it
+            rpc_name = getattr(wrapper, "_nvim_rpc_method_name", handler.__name__)
+            trace: Optional[CommandTrace] = None
+            try:
+                with TracingUtils.invocation(rpc_name.split(":")[-1]) as trace:
+                    with RpcUtils.recorded_invocation(self, handler.__name__, args):
+                        return handler(self, *args, **kwargs)
+            finally:
+                if trace is not None:
+                    self.rpc_utils.check_budget(trace)
+                if ProfilingUtils.session is not None:
+                    self.profiling_utils.handler_finished(handler_type)
+                if MemoryUtils.session is not None:
+                    self.memory_utils.handler_finished(handler_type)
+
+        return wrapper
+
+    return decorator
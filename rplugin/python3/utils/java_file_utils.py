@@ -3,10 +3,13 @@ from pathlib import Path
 from custom_types.log_level import LogLevel
 from custom_types.create_java_file_args import CreateJavaFileArgs
 from custom_types.java_file_type import JavaFileType
+from custom_types.trace_phase import TracePhase
 from utils.path_utils import PathUtils
 from utils.common_utils import CommonUtils
+from utils.file_writer_utils import FileWriterUtils
 from utils.treesitter_utils import TreesitterUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
 
 
 class JavaFileLib:
@@ -17,13 +20,16 @@ class JavaFileLib:
         treesitter_utils: TreesitterUtils,
         path_utils: PathUtils,
         common_utils: CommonUtils,
+        file_writer_utils: FileWriterUtils,
     ):
         self.nvim = nvim
         self.logging = logging
         self.treesitter_utils = treesitter_utils
         self.path_utils = path_utils
         self.common_utils = common_utils
+        self.file_writer_utils = file_writer_utils
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def get_boiler_plate(
         self,
         file_type: JavaFileType,
@@ -80,4 +86,4 @@ class JavaFileLib:
         )
         file_path = self.get_file_path(args.package_path, args.file_name, debug)
         file_tree = self.treesitter_utils.convert_bytes_to_tree(boiler_plate)
-        self.treesitter_utils.update_buffer(file_tree, file_path, True)
+        self.file_writer_utils.write_files({file_path: file_tree}, True, debug)
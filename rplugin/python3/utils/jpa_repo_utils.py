@@ -1,15 +1,21 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pynvim.api.nvim import Nvim
 from tree_sitter import Node, Tree
 
 from custom_types.log_level import LogLevel
 from custom_types.declaration_type import DeclarationType
+from custom_types.java_file_data import JavaFileData
+from custom_types.java_files_index import JavaFilesIndex
+from custom_types.trace_phase import TracePhase
+from utils.classpath_utils import ClasspathUtils
 from utils.common_utils import CommonUtils
+from utils.file_writer_utils import FileWriterUtils
 from utils.path_utils import PathUtils
 from utils.treesitter_utils import TreesitterUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
 
 
 class JpaRepositoryUtils:
@@ -20,35 +26,49 @@ class JpaRepositoryUtils:
         common_utils: CommonUtils,
         treesitter_utils: TreesitterUtils,
         path_utils: PathUtils,
+        file_writer_utils: FileWriterUtils,
+        classpath_utils: ClasspathUtils,
         logging: Logging,
     ):
         self.nvim = nvim
         self.java_basic_types = java_basic_types
+        # First entry wins, as with the list scan (java.util.Date before java.sql)
+        self.java_basic_type_packages: Dict[str, Optional[str]] = {}
+        for type_name, package_path in java_basic_types:
+            self.java_basic_type_packages.setdefault(type_name, package_path)
         self.common_utils = common_utils
         self.treesitter_utils = treesitter_utils
         self.path_utils = path_utils
+        self.file_writer_utils = file_writer_utils
+        self.classpath_utils = classpath_utils
         self.logging = logging
 
     def get_basic_field_type_import_path(
         self, field_type: str, debug: bool = False
     ) -> Optional[str]:
-        for type_tuple in self.java_basic_types:
-            if field_type == type_tuple[0]:
-                import_path: str = ""
-                if type_tuple[1] is not None:
-                    import_path = f"{type_tuple[1]}.{type_tuple[0]}"
-                else:
-                    # For primitive types or when value is None
-                    import_path = field_type[0]
-                if debug:
-                    self.logging.log(
-                        [f"Field type: {field_type}", f"Import path: {import_path}"],
-                        LogLevel.DEBUG,
-                    )
-                return import_path
+        import_path: Optional[str] = None
+        if field_type in self.java_basic_type_packages:
+            package_path = self.java_basic_type_packages[field_type]
+            if package_path is not None:
+                import_path = f"{package_path}.{field_type}"
+            else:
+                # For primitive types or when value is None
+                import_path = field_type[0]
+        else:
+            # Only an unambiguous match on the classpath is safe to import
+            fully_qualified_names = self.classpath_utils.get_fully_qualified_names(
+                field_type, debug
+            )
+            if len(fully_qualified_names) == 1:
+                import_path = fully_qualified_names[0]
         if debug:
-            self.logging.log(f"Field type {field_type} not found", LogLevel.DEBUG)
+            self.logging.log(
+                [f"Field type: {field_type}", f"Import path: {import_path}"],
+                LogLevel.DEBUG,
+            )
+        return import_path
 
+    @traced(TracePhase.TEMPLATE_GENERATION)
     def generate_jpa_repository_template(
         self, class_name: str, package_path: str, id_type: str, debug: bool = False
     ) -> Tree:
@@ -75,16 +95,14 @@ class JpaRepositoryUtils:
         (modifiers
             (marker_annotation
                 name: (identifier) @annotation_name
+                (#eq? @annotation_name "Id")
             )
         )
         """
-        query_results = self.treesitter_utils.query_match(
-            file_tree, id_field_annotation_query
+        id_annotation_found = (
+            self.treesitter_utils.query_first(file_tree, id_field_annotation_query)
+            is not None
         )
-        id_annotation_found = False
-        for result in query_results:
-            if result.text and result.text.decode() == "Id":
-                id_annotation_found = True
         if debug:
             self.logging.log(
                 f"ID annotation found: {id_annotation_found}",
@@ -96,31 +114,24 @@ class JpaRepositoryUtils:
         self, file_tree: Tree, debug: bool = False
     ) -> Optional[str]:
         superclass_name: Optional[str] = None
-        class_declaration_query = "(class_declaration) @class_decl"
-        super_class_query = """
-        (class_declaration
-            superclass: (superclass
-                (type_identifier) @superclass_type))
-        """
-        query_results = self.treesitter_utils.query_match(
-            file_tree, class_declaration_query
+        main_class_node = self.treesitter_utils.get_buffer_public_class_node(
+            file_tree, debug
         )
-        main_class_node = (
-            self.treesitter_utils.get_buffer_public_class_node_from_query_results(
-                query_results, debug
-            )
+        superclass_node = (
+            main_class_node.child_by_field_name("superclass")
+            if main_class_node
+            else None
         )
-        if main_class_node:
-            main_class_tree = self.treesitter_utils.convert_node_to_tree(
-                main_class_node
-            )
-            query_results = self.treesitter_utils.query_match(
-                main_class_tree, super_class_query
-            )
-            if len(query_results) != 1:
-                return None
-            if query_results[0].text:
-                superclass_name = query_results[0].text.decode()
+        superclass_type_node = (
+            superclass_node.named_children[0]
+            if superclass_node and superclass_node.named_children
+            else None
+        )
+        # Type arguments aren't part of the name, a qualified name is kept whole
+        if superclass_type_node and superclass_type_node.type == "generic_type":
+            superclass_type_node = superclass_type_node.named_children[0]
+        if superclass_type_node and superclass_type_node.text:
+            superclass_name = superclass_type_node.text.decode()
         if debug:
             self.logging.log(
                 f"Superclass name: {superclass_name}",
@@ -128,26 +139,22 @@ class JpaRepositoryUtils:
             )
         return superclass_name
 
+    @traced(TracePhase.FILE_ENUMERATION)
     def find_superclass_file_tree(
         self, superclass_name: str, debug: bool = False
     ) -> Optional[Tree]:
-        class_name_query = """
+        class_name_query = f"""
         (class_declaration
             name: (identifier) @class_name
+            (#eq? @class_name "{superclass_name}")
             )
         """
         root_path = self.path_utils.get_project_root_path()
         super_class_tree: Optional[Tree] = None
         for p in root_path.rglob("*.java"):
             file_tree = self.treesitter_utils.convert_path_to_tree(p)
-            query_results = self.treesitter_utils.query_match(
-                file_tree, class_name_query
-            )
-            if len(query_results) == 0:
-                continue
-            for result in query_results:
-                if result.text and result.text.decode() == superclass_name:
-                    return file_tree
+            if self.treesitter_utils.query_first(file_tree, class_name_query):
+                return file_tree
         if debug:
             self.logging.log(
                 [
@@ -163,22 +170,13 @@ class JpaRepositoryUtils:
         (field_declaration
             (modifiers
                 (marker_annotation
-                    name: (identifier) @annotation_name)))
+                    name: (identifier) @annotation_name
+                    (#eq? @annotation_name "Id"))))
         """
-        query_results = self.treesitter_utils.query_match(
-            file_tree, field_marker_name_query
-        )
-        if len(query_results) == 0:
-            return None
         field_declaration: Optional[Node] = None
         id_field_type_node: Optional[Node] = None
         id_field_type: Optional[str] = None
-        id_node: Optional[Node] = None
-        for annotation in query_results:
-            if annotation.text:
-                name = self.treesitter_utils.convert_bytes_to_string(annotation.text)
-                if name == "Id":
-                    id_node = annotation
+        id_node = self.treesitter_utils.query_first(file_tree, field_marker_name_query)
         if id_node is None:
             return None
         marker_annotation = id_node.parent
@@ -219,7 +217,9 @@ class JpaRepositoryUtils:
             if not superclass_name:
                 self.logging.log(error_msg, LogLevel.ERROR)
                 raise ValueError(error_msg)
-            superclass_tree = self.find_superclass_file_tree(superclass_name, debug)
+            superclass_tree = self.find_superclass_file_tree(
+                superclass_name.rpartition(".")[2], debug
+            )
             if superclass_tree is None:
                 self.logging.log(
                     error_msg,
@@ -251,14 +251,149 @@ class JpaRepositoryUtils:
         jpa_repo_path = buffer_path.parent.joinpath(
             f"{file_data.file_name}Repository.java"
         )
-        self.treesitter_utils.update_buffer(
-            tree=jpa_repo_tree,
-            buffer_path=jpa_repo_path,
-            save=True,
-            debug=debug,
+        self.file_writer_utils.write_files(
+            {jpa_repo_path: jpa_repo_tree}, open_last=True, debug=debug
         )
         if debug:
             self.logging.log(
                 f"JPA Repository tree:\n{jpa_repo_tree.__repr__()}\n",
                 LogLevel.DEBUG,
             )
+
+    def get_superclass_fqn_candidates(
+        self, file_data: JavaFileData, superclass_name: str
+    ) -> List[str]:
+        # Same order as Java's lookup: qualified name, single type import, own
+        # package, then on demand imports
+        if "." in superclass_name:
+            return [superclass_name]
+        imports = [
+            path
+            for is_static, path in (
+                self.treesitter_utils.get_import_key(n)
+                for n in file_data.tree.root_node.children
+                if n.type == "import_declaration"
+            )
+            if not is_static
+        ]
+        candidates = [p for p in imports if p.rpartition(".")[2] == superclass_name]
+        candidates.append(
+            f"{file_data.package_path}.{superclass_name}"
+            if file_data.package_path
+            else superclass_name
+        )
+        candidates.extend(
+            f"{p.removesuffix('.*')}.{superclass_name}"
+            for p in imports
+            if p.endswith(".*")
+        )
+        return candidates
+
+    def find_superclass_file_data(
+        self, file_data: JavaFileData, index: JavaFilesIndex, debug: bool = False
+    ) -> Optional[JavaFileData]:
+        superclass_data: Optional[JavaFileData] = None
+        superclass_name = self.get_superclass_name(file_data.tree, debug)
+        if superclass_name:
+            candidates = self.get_superclass_fqn_candidates(file_data, superclass_name)
+            superclass_data = next(
+                (
+                    f
+                    for f in (index.files_by_fqn.get(c) for c in candidates)
+                    if f is not None and f.declaration_type == DeclarationType.CLASS
+                ),
+                None,
+            )
+        if debug:
+            self.logging.log(
+                f"Superclass of {index.get_fqn(file_data)}: "
+                f"{index.get_fqn(superclass_data) if superclass_data else None}",
+                LogLevel.DEBUG,
+            )
+        return superclass_data
+
+    def resolve_id_field_type(
+        self,
+        file_data: JavaFileData,
+        index: JavaFilesIndex,
+        resolved_id_types: Dict[str, Optional[str]],
+        debug: bool = False,
+    ) -> Optional[str]:
+        # Walks up the superclass chain until a class declares the @Id field.
+        # Every class on the way shares the result, so siblings extending the
+        # same base class are only resolved once.
+        visited: List[str] = []
+        current: Optional[JavaFileData] = file_data
+        id_type: Optional[str] = None
+        while current is not None and index.get_fqn(current) not in visited:
+            fqn = index.get_fqn(current)
+            if fqn in resolved_id_types:
+                id_type = resolved_id_types[fqn]
+                break
+            visited.append(fqn)
+            id_type = self.find_id_field_type(current.tree, debug)
+            if id_type:
+                break
+            current = self.find_superclass_file_data(current, index, debug)
+        for fqn in visited:
+            resolved_id_types[fqn] = id_type
+        if debug:
+            self.logging.log(
+                [
+                    f"Class hierarchy: {' -> '.join(visited)}",
+                    f"Id field type: {id_type}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return id_type
+
+    def create_all_jpa_repositories(self, debug: bool = False) -> None:
+        all_files = self.common_utils.get_all_java_files_data(debug)
+        index = self.common_utils.get_java_files_index(debug)
+        resolved_id_types: Dict[str, Optional[str]] = {}
+        repositories: Dict[Path, Tree] = {}
+        skipped: List[str] = []
+        failed: List[str] = []
+        for file_data in sorted(all_files, key=lambda f: str(f.path)):
+            if (
+                not file_data.is_jpa_entity
+                or file_data.declaration_type != DeclarationType.CLASS
+            ):
+                continue
+            # Only a repository next to the entity counts, the same name in
+            # another package may belong to an unrelated class
+            jpa_repo_path = file_data.path.parent.joinpath(
+                f"{file_data.file_name}Repository.java"
+            )
+            if jpa_repo_path.exists():
+                skipped.append(index.get_fqn(file_data))
+                continue
+            id_type = self.resolve_id_field_type(
+                file_data, index, resolved_id_types, debug
+            )
+            if id_type is None:
+                failed.append(
+                    f"{index.get_fqn(file_data)}: "
+                    "no @Id field found in its class hierarchy"
+                )
+                continue
+            repositories[jpa_repo_path] = self.generate_jpa_repository_template(
+                class_name=file_data.file_name,
+                package_path=file_data.package_path,
+                id_type=id_type,
+                debug=debug,
+            )
+        if repositories:
+            self.file_writer_utils.write_files(repositories, debug=debug)
+        root_path = self.path_utils.get_project_root_path()
+        report: List[str] = [f"Created {len(repositories)} JPA repositories"]
+        report.extend(f"  {str(p.relative_to(root_path))}" for p in repositories.keys())
+        report.extend(
+            ["", f"Skipped {len(skipped)} entities that already have a repository"]
+        )
+        report.extend(f"  {name}" for name in skipped)
+        report.extend(["", f"Failed {len(failed)} entities"])
+        report.extend(f"  {reason}" for reason in failed)
+        if debug:
+            self.logging.log(report, LogLevel.DEBUG)
+        self.logging.open_scratch_buffer("\n".join(report))
@@ -12,9 +12,8 @@ class Logging:
     def __init__(self, nvim: Nvim):
         self.nvim = nvim
         self.file_path = Path(__file__).resolve()
-        self.plugin_path = Path(
-            *self.file_path.parts[: self.file_path.parts.index("nvim-javagenie") + 1]
-        )
+        # utils/logging.py -> rplugin/python3/utils -> plugin root
+        self.plugin_path = self.file_path.parents[3]
         self.log_file_path = self.plugin_path.joinpath("logging.log")
         if not self.plugin_path.exists():
             raise FileNotFoundError
@@ -35,7 +34,11 @@ class Logging:
     def build_call_stack(self) -> str:
         call_stack: list[str] = []
         for i, s in enumerate(stack()):
-            class_name = s[0].f_locals["self"].__class__.__name__
+            caller = s[0].f_locals.get("self")
+            # Module functions and the traced/instrumented wrappers
+            if caller is None:
+                continue
+            class_name = caller.__class__.__name__
             method_name = s[0].f_code.co_name
             if class_name == "Host":
                 break
@@ -85,3 +88,11 @@ class Logging:
 
     def echomsg(self, msg: str) -> None:
         self.nvim.command(f"echomsg '{msg}'")
+
+    def open_scratch_buffer(self, content: str) -> None:
+        self.nvim.command("botright new")
+        buffer = self.nvim.current.buffer
+        buffer.options["buftype"] = "nofile"
+        buffer.options["bufhidden"] = "wipe"
+        buffer.options["swapfile"] = False
+        buffer[:] = content.split("\n")
@@ -0,0 +1,170 @@
+from collections import Counter
+from datetime import datetime
+from gc import collect, get_objects
+from pathlib import Path
+import sys
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pynvim.api.nvim import Nvim
+
+from constants.ui_commands import UI_COMMANDS
+from custom_types.log_level import LogLevel
+from custom_types.memory_session import MemorySession
+from utils.logging import Logging
+from utils.profiling_utils import HandlerType
+
+if TYPE_CHECKING:
+    from tracemalloc import Snapshot
+
+
+class MemoryUtils:
+    # Shared at class level for the same reason as ProfilingUtils.session
+    session: Optional[MemorySession] = None
+
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+        self.rplugin_path = Path(__file__).resolve().parents[1]
+        self.import_paths = [p for p in sys.path if p]
+        self.traceback_frames = 1
+        self.summary_lines = 25
+
+    def get_snapshots_path(self) -> Path:
+        snapshots_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+            "nvim-javagenie", "memory"
+        )
+        snapshots_path.mkdir(parents=True, exist_ok=True)
+        return snapshots_path
+
+    def count_objects_by_type(self) -> Dict[str, int]:
+        return Counter(type(o).__qualname__ for o in get_objects())
+
+    def get_module_label(self, file_name: str) -> str:
+        file_path = Path(file_name)
+        # Longest sys.path entry first, so site-packages wins over the stdlib
+        import_paths = sorted(self.import_paths, key=len, reverse=True)
+        for import_path in [self.rplugin_path, *map(Path, import_paths)]:
+            if file_path.is_relative_to(import_path):
+                return str(file_path.relative_to(import_path))
+        return file_name
+
+    def take_snapshot(self) -> "Snapshot":
+        from tracemalloc import Filter, take_snapshot
+
+        # Whatever is still referenced after a full collection is retained
+        collect()
+        return take_snapshot().filter_traces(
+            [
+                Filter(False, "<frozen importlib._bootstrap>"),
+                Filter(False, "<frozen importlib._bootstrap_external>"),
+                Filter(False, "<unknown>"),
+                Filter(False, __file__),
+            ]
+        )
+
+    def start_session(self, command_args: List[str], debug: bool = False) -> None:
+        from tracemalloc import is_tracing, start
+
+        if MemoryUtils.session is not None:
+            self.logging.log(
+                f"Discarding unfinished memory trace of {MemoryUtils.session.command}",
+                LogLevel.WARN,
+            )
+            self.stop_tracing(MemoryUtils.session)
+            MemoryUtils.session = None
+        started_tracing = not is_tracing()
+        if started_tracing:
+            start(self.traceback_frames)
+        MemoryUtils.session = MemorySession(
+            command=command_args[0],
+            args=command_args[1:],
+            snapshot=self.take_snapshot(),
+            object_counts=self.count_objects_by_type(),
+            started_tracing=started_tracing,
+        )
+        if debug:
+            self.logging.log(
+                f"Tracing memory of command: {' '.join(command_args)}", LogLevel.DEBUG
+            )
+        self.nvim.command(" ".join(command_args))
+
+    def stop_tracing(self, session: MemorySession) -> None:
+        from tracemalloc import stop
+
+        if session.started_tracing:
+            stop()
+
+    def handler_finished(self, handler_type: HandlerType) -> None:
+        session = MemoryUtils.session
+        if session is None:
+            return
+        if handler_type == "command" and not session.awaiting_callback:
+            if session.command in UI_COMMANDS:
+                session.awaiting_callback = True
+                return
+            self.finish_session()
+        elif handler_type == "callback" and session.awaiting_callback:
+            self.finish_session()
+
+    def generate_module_diff(self, before: "Snapshot", after: "Snapshot") -> List[str]:
+        lines: List[str] = [
+            f"{'module':<56} {'retained':>12} {'blocks':>8} {'total':>12}"
+        ]
+        # compare_to sorts by the absolute size difference
+        for diff in after.compare_to(before, "filename")[: self.summary_lines]:
+            label = self.get_module_label(diff.traceback[0].filename)
+            lines.append(
+                f"{label[-56:]:<56} {diff.size_diff / 1024:>+10.1f}KB "
+                f"{diff.count_diff:>+8} {diff.size / 1024:>10.1f}KB"
+            )
+        return lines
+
+    def generate_object_diff(self, before: Dict[str, int]) -> List[str]:
+        after = self.count_objects_by_type()
+        lines: List[str] = [f"{'type':<56} {'retained':>12} {'alive':>8}"]
+        diffs = [
+            (type_name, count - before.get(type_name, 0), count)
+            for type_name, count in after.items()
+            if count != before.get(type_name, 0)
+        ]
+        diffs.sort(key=lambda diff: -abs(diff[1]))
+        for type_name, count_diff, count in diffs[: self.summary_lines]:
+            lines.append(f"{type_name[-56:]:<56} {count_diff:>+12} {count:>8}")
+        return lines
+
+    def finish_session(self, debug: bool = False) -> None:
+        session = MemoryUtils.session
+        if session is None:
+            error_msg = "No memory session in progress"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        MemoryUtils.session = None
+        after = self.take_snapshot()
+        self.stop_tracing(session)
+        file_stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{session.command}"
+        snapshots_path = self.get_snapshots_path()
+        before_path = snapshots_path.joinpath(f"{file_stem}-before.snapshot")
+        after_path = snapshots_path.joinpath(f"{file_stem}-after.snapshot")
+        session.snapshot.dump(str(before_path))
+        after.dump(str(after_path))
+        before_size = sum(s.size for s in session.snapshot.statistics("filename"))
+        after_size = sum(s.size for s in after.statistics("filename"))
+        summary = "\n".join(
+            [
+                f"Command: {' '.join([session.command] + session.args)}",
+                f"Traced memory: {before_size / 1024:.1f}KB -> "
+                f"{after_size / 1024:.1f}KB "
+                f"({(after_size - before_size) / 1024:+.1f}KB)",
+                f"Snapshots: {before_path}",
+                f"           {after_path}",
+                "",
+                "Retained allocations by module:",
+                *self.generate_module_diff(session.snapshot, after),
+                "",
+                "Retained objects by type (gc-tracked):",
+                *self.generate_object_diff(session.object_counts),
+            ]
+        )
+        if debug:
+            self.logging.log(summary, LogLevel.DEBUG)
+        self.logging.open_scratch_buffer(summary)
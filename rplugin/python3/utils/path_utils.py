@@ -1,8 +1,10 @@
 from pathlib import Path
 
 from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
 from utils.treesitter_utils import TreesitterUtils
 from utils.logging import Logging
+from utils.tracing_utils import traced
 from shutil import which
 
 
@@ -40,6 +42,7 @@ class PathUtils:
         )
         raise FileNotFoundError(error_msg)
 
+    @traced(TracePhase.FILE_ENUMERATION)
     def get_spring_main_class_path(self) -> Path:
         root_path = self.get_project_root_path()
         for p in root_path.rglob("*.java"):
@@ -0,0 +1,142 @@
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Literal, Optional, Tuple
+
+from pynvim.api.nvim import Nvim
+
+from constants.ui_commands import UI_COMMANDS
+from custom_types.log_level import LogLevel
+from custom_types.profiling_session import ProfilingSession
+from utils.logging import Logging
+
+HandlerType = Literal["command", "callback"]
+FunctionKey = Tuple[str, int, str]
+
+
+class ProfilingUtils:
+    # Plugin classes are instantiated separately by the host, so the session
+    # is shared at class level to follow a command into its callback.
+    session: Optional[ProfilingSession] = None
+
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+        self.max_stack_depth = 128
+        self.summary_lines = 40
+
+    def get_profiles_path(self) -> Path:
+        profiles_path = Path(self.nvim.funcs.stdpath("cache")).joinpath(
+            "nvim-javagenie", "profiles"
+        )
+        profiles_path.mkdir(parents=True, exist_ok=True)
+        return profiles_path
+
+    def start_session(self, command_args: List[str], debug: bool = False) -> None:
+        from cProfile import Profile
+
+        if ProfilingUtils.session is not None:
+            self.logging.log(
+                f"Discarding unfinished profile of {ProfilingUtils.session.command}",
+                LogLevel.WARN,
+            )
+            ProfilingUtils.session.profile.disable()
+        profile = Profile()
+        ProfilingUtils.session = ProfilingSession(
+            command=command_args[0],
+            args=command_args[1:],
+            profile=profile,
+            started_at=perf_counter(),
+        )
+        if debug:
+            self.logging.log(
+                f"Profiling command: {' '.join(command_args)}", LogLevel.DEBUG
+            )
+        profile.enable()
+        # Commands are async notifications, so the handler runs after this
+        # returns and the profile stays enabled until it (and its callback) ends
+        self.nvim.command(" ".join(command_args))
+
+    def handler_finished(self, handler_type: HandlerType) -> None:
+        session = ProfilingUtils.session
+        if session is None:
+            return
+        if handler_type == "command" and not session.awaiting_callback:
+            if session.command in UI_COMMANDS:
+                session.awaiting_callback = True
+                return
+            self.finish_session()
+        elif handler_type == "callback" and session.awaiting_callback:
+            self.finish_session()
+
+    def get_function_label(self, function_key: FunctionKey) -> str:
+        file_name, line_number, function_name = function_key
+        if file_name == "~":
+            return function_name
+        return f"{Path(file_name).stem}.{function_name}:{line_number}"
+
+    def generate_collapsed_stacks(self, stats: Dict) -> List[str]:
+        # cProfile only records caller -> callee edges, so stacks are rebuilt by
+        # walking the call graph from its roots, attributing each edge's own time.
+        callees: Dict[FunctionKey, Dict[FunctionKey, float]] = {}
+        roots: List[FunctionKey] = []
+        for function_key, (_, _, total_time, _, callers) in stats.items():
+            if not callers:
+                roots.append(function_key)
+            for caller_key, caller_stats in callers.items():
+                callees.setdefault(caller_key, {})[function_key] = caller_stats[2]
+        lines: List[str] = []
+
+        def walk(stack: List[FunctionKey], function_key: FunctionKey, own_time: float):
+            stack.append(function_key)
+            microseconds = int(own_time * 1_000_000)
+            if microseconds > 0:
+                lines.append(
+                    f"{';'.join(self.get_function_label(f) for f in stack)} {microseconds}"
+                )
+            if len(stack) < self.max_stack_depth:
+                for callee_key, callee_time in callees.get(function_key, {}).items():
+                    if callee_key not in stack:
+                        walk(stack, callee_key, callee_time)
+            stack.pop()
+
+        for root_key in roots:
+            walk([], root_key, stats[root_key][2])
+        return lines
+
+    def finish_session(self, debug: bool = False) -> None:
+        from pstats import Stats
+
+        session = ProfilingUtils.session
+        if session is None:
+            error_msg = "No profiling session in progress"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        session.profile.disable()
+        ProfilingUtils.session = None
+        elapsed = perf_counter() - session.started_at
+        file_stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{session.command}"
+        profiles_path = self.get_profiles_path()
+        pstats_path = profiles_path.joinpath(f"{file_stem}.pstats")
+        collapsed_path = profiles_path.joinpath(f"{file_stem}.collapsed")
+        session.profile.dump_stats(str(pstats_path))
+        summary_stream = StringIO()
+        stats = Stats(session.profile, stream=summary_stream)
+        collapsed_path.write_text(
+            "\n".join(self.generate_collapsed_stacks(stats.stats)) + "\n"  # type: ignore
+        )
+        stats.sort_stats("cumulative").print_stats(self.summary_lines)
+        summary = "\n".join(
+            [
+                f"Command: {' '.join([session.command] + session.args)}",
+                f"Elapsed (including UI interaction): {elapsed:.3f}s",
+                f"pstats: {pstats_path}",
+                f"Collapsed stacks: {collapsed_path}",
+                "",
+                summary_stream.getvalue().strip(),
+            ]
+        )
+        if debug:
+            self.logging.log(summary, LogLevel.DEBUG)
+        self.logging.open_scratch_buffer(summary)
@@ -0,0 +1,126 @@
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from custom_types.log_level import LogLevel
+from utils.file_summary_utils import FileSummaryUtils
+from utils.git_utils import GitUtils
+from utils.logging import Logging
+from utils.tracing_utils import TracingUtils
+
+
+class ProjectIndexUtils:
+    # Keeps the summary key of every Java file of the project between
+    # enumerations, so only the files that changed since are read again
+    def __init__(
+        self,
+        git_utils: GitUtils,
+        file_summary_utils: FileSummaryUtils,
+        logging: Logging,
+    ):
+        self.git_utils = git_utils
+        self.file_summary_utils = file_summary_utils
+        self.logging = logging
+        self.reset_index()
+
+    def reset_index(self) -> None:
+        self.indexed_root: Optional[Path] = None
+        self.indexed_commit: Optional[str] = None
+        self.uncommitted_paths: Set[Path] = set()
+        self.summary_keys: Dict[Path, str] = {}
+        self.file_stats: Dict[Path, Tuple[int, int]] = {}
+
+    def read_summary_key(self, file_path: Path) -> Optional[str]:
+        try:
+            file_bytes = file_path.read_bytes()
+        except OSError:
+            return None
+        return self.file_summary_utils.get_summary_key(file_path, file_bytes)
+
+    def get_git_summary_keys(
+        self, root_path: Path, debug: bool = False
+    ) -> Optional[Dict[Path, str]]:
+        head_commit = self.git_utils.get_head_commit(root_path, debug)
+        if head_commit is None:
+            return None
+        uncommitted_paths = self.git_utils.get_uncommitted_java_paths(root_path, debug)
+        if uncommitted_paths is None:
+            return None
+        changed_paths: Optional[Set[Path]] = None
+        if self.indexed_commit is not None:
+            changed_paths = self.git_utils.get_changed_java_paths(
+                root_path, self.indexed_commit, head_commit, debug
+            )
+        summary_keys: Dict[Path, str]
+        if changed_paths is None:
+            # First run, or the indexed commit is gone: committed files are keyed
+            # by the blob ids in the git index without being read
+            blob_ids = self.git_utils.get_java_blob_ids(root_path, debug)
+            if blob_ids is None:
+                return None
+            summary_keys = {
+                p: self.file_summary_utils.get_blob_summary_key(p, blob_id)
+                for p, blob_id in blob_ids.items()
+            }
+            changed_paths = set()
+        else:
+            summary_keys = dict(self.summary_keys)
+        # Files that were uncommitted last time may have been reverted since
+        stale_paths = changed_paths | uncommitted_paths | self.uncommitted_paths
+        for file_path in stale_paths:
+            summary_key = self.read_summary_key(file_path)
+            if summary_key is None:
+                summary_keys.pop(file_path, None)
+            else:
+                summary_keys[file_path] = summary_key
+        self.indexed_commit = head_commit
+        self.uncommitted_paths = uncommitted_paths
+        self.file_stats = {}
+        if debug:
+            self.logging.log(
+                [
+                    f"Indexed commit: {head_commit}",
+                    f"Files read: {len(stale_paths)}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return summary_keys
+
+    def get_scanned_summary_keys(
+        self, root_path: Path, debug: bool = False
+    ) -> Dict[Path, str]:
+        # Outside git, files whose modification time and size are unchanged
+        # keep their key
+        summary_keys: Dict[Path, str] = {}
+        file_stats: Dict[Path, Tuple[int, int]] = {}
+        files_read = 0
+        for file_path in root_path.rglob("*.java"):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            file_stat = (stat.st_mtime_ns, stat.st_size)
+            summary_key = self.summary_keys.get(file_path)
+            if summary_key is None or self.file_stats.get(file_path) != file_stat:
+                summary_key = self.read_summary_key(file_path)
+                files_read += 1
+                if summary_key is None:
+                    continue
+            summary_keys[file_path] = summary_key
+            file_stats[file_path] = file_stat
+        self.indexed_commit = None
+        self.uncommitted_paths = set()
+        self.file_stats = file_stats
+        if debug:
+            self.logging.log(f"Files read: {files_read}", LogLevel.DEBUG)
+        return summary_keys
+
+    def get_summary_keys(self, root_path: Path, debug: bool = False) -> Dict[Path, str]:
+        if self.indexed_root != root_path:
+            self.reset_index()
+        summary_keys = self.get_git_summary_keys(root_path, debug)
+        if summary_keys is None:
+            summary_keys = self.get_scanned_summary_keys(root_path, debug)
+        self.indexed_root = root_path
+        self.summary_keys = summary_keys
+        TracingUtils.set_gauge("indexed_java_files", len(summary_keys))
+        return summary_keys
@@ -0,0 +1,221 @@
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, cast
+
+from msgpack import packb, unpackb
+from pynvim.api.nvim import Nvim
+from pynvim.msgpack_rpc import Session
+
+from custom_types.command_trace import CommandTrace
+from custom_types.log_level import LogLevel
+from utils.logging import Logging
+from utils.tracing_utils import TracingUtils
+
+RECORDING_VERSION = 1
+DEFAULT_RPC_BUDGET = 100
+
+
+class RpcSession:
+    # Stands in for the msgpack-rpc session behind an Nvim handle. Every API
+    # call, including buffer and window methods, goes through session.request,
+    # so this is the one place where round trips can be counted and recorded.
+    def __init__(self, session: Any) -> None:
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def request(self, method: Any, *args: Any, **kwargs: Any) -> Any:
+        trace = TracingUtils.current
+        calls = RpcUtils.recorded_calls
+        if trace is None and calls is None:
+            return self._session.request(method, *args, **kwargs)
+        notification = bool(kwargs.get("async_", False))
+        error: Optional[str] = None
+        result: Any = None
+        try:
+            result = self._session.request(method, *args, **kwargs)
+            return result
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            if trace is not None:
+                if notification:
+                    trace.rpc_notifications += 1
+                else:
+                    trace.rpc_requests += 1
+                trace.rpc_bytes += len(packb([method, args])) + len(packb(result))
+            if calls is not None:
+                calls.append([method, list(args), notification, error, result])
+
+
+class ReplaySession:
+    # Answers requests from a recording instead of a running Neovim, so a
+    # command can be re-run with the exact responses it originally received.
+    _loop_thread = None
+    # Set by Nvim.from_session, turns a recorded error into pynvim's exception
+    error_wrapper: Callable[[List[Any]], Exception]
+
+    def __init__(self, api_info: List[Any], calls: List[List[Any]]) -> None:
+        self.api_info = api_info
+        self.calls: Deque[List[Any]] = deque(calls)
+
+    def request(self, method: Any, *args: Any, **kwargs: Any) -> Any:
+        if isinstance(method, bytes):
+            method = method.decode()
+        if method == "nvim_get_api_info":
+            return self.api_info
+        if not self.calls:
+            raise ValueError(f"Replay has no recorded response left for {method}")
+        recorded_method, _, _, error, result = self.calls.popleft()
+        if isinstance(recorded_method, bytes):
+            recorded_method = recorded_method.decode()
+        if recorded_method != method:
+            raise ValueError(
+                f"Replay diverged: expected {recorded_method}, got {method}"
+            )
+        if error is not None:
+            raise self.error_wrapper([0, error])
+        return result
+
+    def threadsafe_call(self, fn: Any, *args: Any, **kwargs: Any) -> None:
+        fn(*args, **kwargs)
+
+
+class RpcBatch:
+    # Queues API calls and sends them in one nvim_call_atomic, so a multi-step
+    # edit costs one round trip and no other event runs between its steps
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+        self.calls: List[List[Any]] = []
+
+    def call(self, method: str, *args: Any) -> None:
+        self.calls.append([method, list(args)])
+
+    def command(self, command: str) -> None:
+        self.call("nvim_command", command)
+
+    def flush(self, debug: bool = False) -> None:
+        calls, self.calls = self.calls, []
+        if not calls:
+            return
+        _, error = self.nvim.api.call_atomic(calls)
+        if error is not None:
+            index, _, message = error
+            error_msg = f"{calls[index][0]} failed: {message}"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        if debug:
+            self.logging.log(f"Batched calls: {[c[0] for c in calls]}", LogLevel.DEBUG)
+
+
+class RpcUtils:
+    # Shared by every plugin instance in the host, like TracingUtils
+    budget: Optional[int] = None
+    recording: Optional[Dict[str, Any]] = None
+    recorded_calls: Optional[List[List[Any]]] = None
+
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+
+    @classmethod
+    def instrument(cls, nvim: Nvim) -> Nvim:
+        # The host hands the same Nvim to every plugin, so wrap its session once
+        if not hasattr(nvim, "_session") or isinstance(nvim._session, RpcSession):
+            return nvim
+        # Stands in for the session, like ReplaySession does for Nvim.from_session
+        nvim._session = cast(Session, RpcSession(nvim._session))
+        return nvim
+
+    @classmethod
+    @contextmanager
+    def recorded_invocation(
+        cls, plugin: Any, handler_name: str, args: tuple
+    ) -> Iterator[None]:
+        if cls.recording is None or cls.recorded_calls is not None:
+            yield
+            return
+        calls: List[List[Any]] = []
+        cls.recording["invocations"].append(
+            {
+                "module": type(plugin).__module__,
+                "plugin": type(plugin).__name__,
+                "handler": handler_name,
+                "args": list(args),
+                "calls": calls,
+            }
+        )
+        cls.recorded_calls = calls
+        try:
+            yield
+        finally:
+            cls.recorded_calls = None
+
+    def check_budget(self, trace: CommandTrace) -> None:
+        # Read on the first command rather than while the host loads plugins
+        if RpcUtils.budget is None:
+            RpcUtils.budget = int(
+                self.nvim.vars.get("javagenie_rpc_budget", DEFAULT_RPC_BUDGET)
+            )
+        budget = RpcUtils.budget
+        rpc_count = trace.rpc_requests + trace.rpc_notifications
+        if rpc_count <= budget:
+            return
+        msg = (
+            f"{trace.command} made {rpc_count} RPC calls "
+            f"({trace.rpc_bytes / 1024:.1f} KB), over the budget of {budget}"
+        )
+        self.logging.log(msg, LogLevel.WARN)
+        self.logging.echomsg(msg)
+
+    def start_recording(self, debug: bool = False) -> None:
+        if RpcUtils.recording is not None:
+            error_msg = "An RPC recording is already in progress"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        RpcUtils.recording = {
+            "version": RECORDING_VERSION,
+            "cwd": self.nvim.funcs.getcwd(),
+            "api_info": [self.nvim.channel_id, self.nvim.metadata],
+            "invocations": [],
+        }
+        if debug:
+            self.logging.log("Started RPC recording", LogLevel.DEBUG)
+
+    def stop_recording(self, file_path: Path, debug: bool = False) -> Path:
+        recording = RpcUtils.recording
+        if recording is None:
+            error_msg = "No RPC recording in progress"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        RpcUtils.recording = None
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(packb(recording))
+        if debug:
+            self.logging.log(
+                [
+                    f"Recorded invocations: {len(recording['invocations'])}",
+                    f"Recording path: {str(file_path)}",
+                ],
+                LogLevel.DEBUG,
+            )
+        return file_path
+
+    @staticmethod
+    def load_recording(file_path: Path) -> Dict[str, Any]:
+        recording = unpackb(file_path.read_bytes(), strict_map_key=False)
+        if recording.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported RPC recording version in {str(file_path)}")
+        return recording
+
+    @staticmethod
+    def create_replay_nvim(
+        recording: Dict[str, Any], invocation: Dict[str, Any]
+    ) -> Nvim:
+        return Nvim.from_session(
+            cast(Session, ReplaySession(recording["api_info"], invocation["calls"]))
+        )
@@ -0,0 +1,200 @@
+import json
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from statistics import quantiles
+from time import perf_counter
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from pynvim.api.nvim import Nvim
+
+from custom_types.command_trace import CommandTrace
+from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
+from custom_types.trace_span import TraceSpan
+from utils.logging import Logging
+
+
+def traced(phase: TracePhase) -> Callable:
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if TracingUtils.current is None:
+                return method(*args, **kwargs)
+            with TracingUtils.span(phase, method.__qualname__):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingUtils:
+    # Shared by every plugin instance in the host so :JavaGenieStats sees all
+    # commands. Phase totals are inclusive: a parse inside a file enumeration
+    # counts towards both.
+    invocations: Deque[CommandTrace] = deque(maxlen=256)
+    current: Optional[CommandTrace] = None
+    gauges: Dict[str, float] = {}
+    cache_accesses: Dict[str, List[int]] = {}
+    max_spans_per_invocation = 10_000
+
+    def __init__(self, nvim: Nvim, logging: Logging):
+        self.nvim = nvim
+        self.logging = logging
+
+    @classmethod
+    @contextmanager
+    def invocation(cls, command: str) -> Iterator[CommandTrace]:
+        previous = cls.current
+        trace = CommandTrace(command=command, start=perf_counter())
+        cls.current = trace
+        try:
+            yield trace
+        except BaseException:
+            trace.failed = True
+            raise
+        finally:
+            trace.duration = perf_counter() - trace.start
+            cls.current = previous
+            cls.invocations.append(trace)
+
+    @classmethod
+    @contextmanager
+    def span(cls, phase: TracePhase, name: str) -> Iterator[None]:
+        trace = cls.current
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            if trace is not None:
+                duration = perf_counter() - start
+                trace.phase_totals[phase] = trace.phase_totals.get(phase, 0) + duration
+                if len(trace.spans) < cls.max_spans_per_invocation:
+                    trace.spans.append(TraceSpan(name, phase, start, duration))
+                else:
+                    trace.dropped_spans += 1
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float) -> None:
+        cls.gauges[name] = value
+
+    @classmethod
+    def record_cache_access(cls, cache_name: str, hit: bool) -> None:
+        accesses = cls.cache_accesses.setdefault(cache_name, [0, 0])
+        accesses[0 if hit else 1] += 1
+
+    def get_rss_kb(self) -> int:
+        try:
+            # Second field of statm is the resident set size in pages
+            from os import sysconf
+
+            pages = int(Path("/proc/self/statm").read_text().split()[1])
+            return pages * sysconf("SC_PAGE_SIZE") // 1024
+        except (OSError, ValueError, IndexError):
+            from resource import RUSAGE_SELF, getrusage
+
+            return getrusage(RUSAGE_SELF).ru_maxrss
+
+    def get_percentiles(self, durations: List[float]) -> List[float]:
+        if len(durations) == 1:
+            return durations * 3
+        cuts = quantiles(durations, n=100, method="inclusive")
+        return [cuts[49], cuts[89], cuts[98]]
+
+    def get_stats_summary(self) -> str:
+        lines: List[str] = [
+            f"Host RSS: {self.get_rss_kb() / 1024:.1f} MB",
+            f"Recorded invocations: {len(self.invocations)}",
+            "",
+            f"{'command':<36} {'count':>5} {'failed':>6} "
+            f"{'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} "
+            f"{'rpc/call':>8} {'KB/call':>8}",
+        ]
+        durations_by_command: Dict[str, List[float]] = {}
+        failures_by_command: Dict[str, int] = {}
+        rpc_by_command: Dict[str, List[int]] = {}
+        phase_totals: Dict[TracePhase, float] = {}
+        for trace in self.invocations:
+            durations_by_command.setdefault(trace.command, []).append(trace.duration)
+            failures_by_command[trace.command] = failures_by_command.get(
+                trace.command, 0
+            ) + (1 if trace.failed else 0)
+            rpc_totals = rpc_by_command.setdefault(trace.command, [0, 0])
+            rpc_totals[0] += trace.rpc_requests + trace.rpc_notifications
+            rpc_totals[1] += trace.rpc_bytes
+            for phase, total in trace.phase_totals.items():
+                phase_totals[phase] = phase_totals.get(phase, 0) + total
+        for command, durations in sorted(durations_by_command.items()):
+            p50, p90, p99 = self.get_percentiles(durations)
+            rpc_count, rpc_bytes = rpc_by_command[command]
+            lines.append(
+                f"{command:<36} {len(durations):>5} {failures_by_command[command]:>6} "
+                f"{p50 * 1000:>9.1f} {p90 * 1000:>9.1f} {p99 * 1000:>9.1f} "
+                f"{rpc_count / len(durations):>8.1f} "
+                f"{rpc_bytes / 1024 / len(durations):>8.1f}"
+            )
+        lines.extend(["", "Time per phase (inclusive):"])
+        for phase in TracePhase:
+            if phase in phase_totals:
+                lines.append(
+                    f"  {phase.value:<24} {phase_totals[phase] * 1000:>10.1f} ms"
+                )
+        lines.extend(["", "Index:"])
+        if not self.gauges:
+            lines.append("  nothing indexed yet")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"  {name:<24} {value:>10.0f}")
+        lines.extend(["", "Cache hit rates:"])
+        if not self.cache_accesses:
+            lines.append("  no cache accesses recorded")
+        for cache_name, (hits, misses) in sorted(self.cache_accesses.items()):
+            total = hits + misses
+            lines.append(
+                f"  {cache_name:<24} {hits / total * 100 if total else 0:>6.1f}% "
+                f"({hits} hits, {misses} misses)"
+            )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, file_path: Path, debug: bool = False) -> Path:
+        events: List[Dict] = []
+        for trace in self.invocations:
+            events.append(
+                {
+                    "name": trace.command,
+                    "cat": TracePhase.COMMAND.value,
+                    "ph": "X",
+                    "ts": trace.start * 1_000_000,
+                    "dur": trace.duration * 1_000_000,
+                    "pid": 1,
+                    "tid": 1,
+                    "args": {
+                        "failed": trace.failed,
+                        "dropped_spans": trace.dropped_spans,
+                        "rpc_requests": trace.rpc_requests,
+                        "rpc_notifications": trace.rpc_notifications,
+                        "rpc_bytes": trace.rpc_bytes,
+                    },
+                }
+            )
+            for span in trace.spans:
+                events.append(
+                    {
+                        "name": span.name,
+                        "cat": span.phase.value,
+                        "ph": "X",
+                        "ts": span.start * 1_000_000,
+                        "dur": span.duration * 1_000_000,
+                        "pid": 1,
+                        "tid": 1,
+                    }
+                )
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(json.dumps({"traceEvents": events}))
+        if debug:
+            self.logging.log(
+                f"Exported {len(events)} trace events to {str(file_path)}",
+                LogLevel.DEBUG,
+            )
+        return file_path
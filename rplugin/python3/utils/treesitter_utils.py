@@ -1,12 +1,18 @@
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from pynvim.api import Buffer
 import tree_sitter_java as tsjava
 from tree_sitter import Language, Node, Parser, Query, Tree
 from pynvim.api.nvim import Nvim
 from custom_types.log_level import LogLevel
+from custom_types.trace_phase import TracePhase
 from utils.logging import Logging
+from utils.rpc_utils import RpcBatch
+from utils.tracing_utils import traced
+
+MAX_QUERY_DEPTH = 2**32 - 1
 
 
 class TreesitterUtils:
@@ -23,7 +29,7 @@ class TreesitterUtils:
         self.logging = logging
         self.ts_java = Language(tsjava.language())
         self.parser = Parser(self.ts_java)
-        self.importings: List[str] = []
+        self.queries: Dict[str, Query] = {}
 
     def convert_bytes_to_string(self, bytes_value: bytes) -> str:
         try:
@@ -41,6 +47,7 @@ class TreesitterUtils:
             self.logging.log(error_msg, LogLevel.ERROR)
             raise RuntimeError(error_msg)
 
+    @traced(TracePhase.PARSE)
     def convert_bytes_to_tree(self, file_bytes: bytes) -> Tree:
         try:
             if not file_bytes:
@@ -56,6 +63,7 @@ class TreesitterUtils:
             self.logging.log(error_msg, LogLevel.ERROR)
             raise RuntimeError(error_msg)
 
+    @traced(TracePhase.PARSE)
     def convert_path_to_tree(self, file_path: Path) -> Tree:
         buffer_bytes: bytes
         try:
@@ -90,27 +98,143 @@ class TreesitterUtils:
             self.logging.log(error_msg, LogLevel.ERROR)
             raise RuntimeError(error_msg)
 
-    def query_match(self, tree: Tree, query_param: str) -> List[Node]:
+    def get_query(self, query_param: str) -> Query:
+        query = self.queries.get(query_param)
+        if query is not None:
+            return query
         try:
-            query: Query = self.ts_java.query(query_param)
+            query = self.queries[query_param] = self.ts_java.query(query_param)
         except Exception as e:
             error_msg = f"Error creating query from query_param '{query_param}': {e}"
             self.logging.log(error_msg, LogLevel.ERROR)
             raise RuntimeError(error_msg)
-        try:
-            query_results: List[Tuple[int, Dict[str, List[Node]]]] = query.matches(
-                tree.root_node
+        return query
+
+    def iter_query_matches(
+        self,
+        node: Node,
+        query_param: str,
+        start_byte: int = 0,
+        end_byte: Optional[int] = None,
+        max_start_depth: Optional[int] = None,
+    ) -> Iterator[Node]:
+        query = self.get_query(query_param)
+        byte_range = (start_byte, node.end_byte if end_byte is None else end_byte)
+        # Matches are collected one child of the node at a time, so a caller that
+        # stops early doesn't pay for the rest of the file. The node itself is
+        # never matched.
+        for child in self.iter_children(node):
+            if child.end_byte <= byte_range[0]:
+                continue
+            if child.start_byte >= byte_range[1]:
+                break
+            query.set_byte_range(byte_range)
+            query.set_max_start_depth(
+                MAX_QUERY_DEPTH if max_start_depth is None else max_start_depth
             )
-            nodes: List[Node] = []
+            try:
+                query_results: List[Tuple[int, Dict[str, List[Node]]]] = query.matches(
+                    child
+                )
+            except Exception as e:
+                error_msg = f"Error matching query in tree: {e}"
+                self.logging.log(error_msg, LogLevel.ERROR)
+                raise RuntimeError(error_msg)
             for result in query_results:
                 for item in result[1].values():
-                    for node in item:
-                        nodes.append(node)
-            return nodes
-        except Exception as e:
-            error_msg = f"Error matching query in tree: {e}"
-            self.logging.log(error_msg, LogLevel.ERROR)
-            raise RuntimeError(error_msg)
+                    yield from item
+
+    @traced(TracePhase.QUERY)
+    def query_match(
+        self,
+        tree: Tree,
+        query_param: str,
+        limit: Optional[int] = None,
+        start_byte: int = 0,
+        end_byte: Optional[int] = None,
+        max_start_depth: Optional[int] = None,
+    ) -> List[Node]:
+        query_results = self.iter_query_matches(
+            tree.root_node, query_param, start_byte, end_byte, max_start_depth
+        )
+        return list(islice(query_results, limit))
+
+    @traced(TracePhase.QUERY)
+    def query_first(
+        self,
+        tree: Tree,
+        query_param: str,
+        start_byte: int = 0,
+        end_byte: Optional[int] = None,
+        max_start_depth: Optional[int] = None,
+    ) -> Optional[Node]:
+        query_results = self.iter_query_matches(
+            tree.root_node, query_param, start_byte, end_byte, max_start_depth
+        )
+        return next(query_results, None)
+
+    def iter_children(self, node: Node) -> Iterator[Node]:
+        cursor = node.walk()
+        if not cursor.goto_first_child():
+            return
+        while True:
+            if cursor.node is not None:
+                yield cursor.node
+            if not cursor.goto_next_sibling():
+                return
+
+    def iter_descendants(self, node: Node) -> Iterator[Node]:
+        # Pre-order walk with a single cursor: no recursion and no child lists
+        cursor = node.walk()
+        while True:
+            if cursor.node is not None:
+                yield cursor.node
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return
+
+    def iter_enclosing_nodes(
+        self, tree: Tree, point: Tuple[int, int]
+    ) -> Iterator[Node]:
+        # From the innermost node at the point up to the root
+        node = tree.root_node.descendant_for_point_range(point, point)
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def get_node_annotation_names(self, node: Node) -> List[str]:
+        annotation_names: List[str] = []
+        modifiers = next(
+            (c for c in self.iter_children(node) if c.type == "modifiers"), None
+        )
+        if modifiers is None:
+            return annotation_names
+        for child in self.iter_children(modifiers):
+            if child.type in ["marker_annotation", "annotation"]:
+                name_node = child.child_by_field_name("name")
+                if name_node and name_node.text:
+                    annotation_names.append(
+                        self.convert_bytes_to_string(name_node.text)
+                    )
+        return annotation_names
+
+    def get_buffer_package_name(self, tree: Tree, debug: bool = False) -> str:
+        # Empty for the default package
+        package_node = self.query_first(
+            tree,
+            "(package_declaration [(identifier) (scoped_identifier)] @package_name)",
+            max_start_depth=0,
+        )
+        package_name = (
+            self.convert_bytes_to_string(package_node.text)
+            if package_node and package_node.text
+            else ""
+        )
+        if debug:
+            self.logging.log(f"Package name: {package_name}", LogLevel.DEBUG)
+        return package_name
 
     def get_node_text_as_string(self, node: Node, debug: bool = False) -> Optional[str]:
         node_text_str: Optional[str] = None
@@ -121,58 +245,60 @@ class TreesitterUtils:
         return node_text_str
 
     def get_node_by_type(self, node: Node, type_name: str) -> Optional[Node]:
-        if node.type == type_name:
-            return node
-        for child in node.children:
-            result = self.get_node_by_type(child, type_name)
-            if result is not None:
-                return result
-        return None
-
-    def update_buffer(
+        return next(
+            (n for n in self.iter_descendants(node) if n.type == type_name), None
+        )
+
+    @traced(TracePhase.BUFFER_WRITE)
+    def update_buffers(
         self,
-        tree: Tree,
-        buffer_path: Path,
+        trees: Dict[Path, Tree],
         save: bool = False,
-        format: bool = False,
-        organize_imports: bool = False,
         debug: bool = False,
-    ):
-        node_text = tree.root_node.text
-        if not node_text:
-            error_msg = "Root node doesn't have text"
-            self.logging.log(error_msg, LogLevel.ERROR)
-            raise ValueError(error_msg)
-        self.nvim.command(f"e {str(buffer_path)}")
-        if tree.root_node.text:
-            self.nvim.current.buffer[:] = tree.root_node.text.decode().split("\n")
-        if save:
-            self.nvim.command(f"w {str(buffer_path)}")
-        if format and not save:
-            self.nvim.command("lua vim.lsp.buf.format({ async = true })")
-        if organize_imports:
-            self.nvim.command("lua require('jdtls').organize_imports()")
-        if debug:
-            self.logging.log(
-                [
-                    f"Updated buffer: {node_text.decode()}",
-                    f"Original buffer: {buffer_path.read_text('utf-8')}",
-                ],
-                LogLevel.DEBUG,
+    ) -> None:
+        # Opening, replacing and saving every buffer is one round trip instead
+        # of three per buffer
+        batch = RpcBatch(self.nvim, self.logging)
+        for buffer_path, tree in trees.items():
+            node_text = tree.root_node.text
+            if not node_text:
+                error_msg = "Root node doesn't have text"
+                self.logging.log(error_msg, LogLevel.ERROR)
+                raise ValueError(error_msg)
+            batch.command(f"e {str(buffer_path)}")
+            # Buffer 0 is the current one, the buffer just opened
+            batch.call(
+                "nvim_buf_set_lines", 0, 0, -1, False, node_text.decode().split("\n")
             )
+            if save:
+                batch.command(f"w {str(buffer_path)}")
+        batch.flush(debug=debug)
+        if debug:
+            for buffer_path, tree in trees.items():
+                node_text = tree.root_node.text or b""
+                self.logging.log(
+                    [
+                        f"Updated buffer: {node_text.decode()}",
+                        f"Original buffer: {buffer_path.read_text('utf-8')}",
+                    ],
+                    LogLevel.DEBUG,
+                )
+
+    def is_public_node(self, node: Node) -> bool:
+        for child_node in self.iter_children(node):
+            if child_node.type == "modifiers" and child_node.text:
+                modifiers_text_str = self.convert_bytes_to_string(
+                    child_node.text
+                ).split("\n")
+                return "public" in modifiers_text_str
+        return False
 
     def get_buffer_public_class_node_from_query_results(
-        self, query_results: List[Node], debug: bool = False
+        self, query_results: Iterable[Node], debug: bool = False
     ) -> Optional[Node]:
-        public_class_node: Optional[Node] = None
-        for node in query_results:
-            for child_node in node.children:
-                if child_node.type == "modifiers" and child_node.text:
-                    modifiers_text_str = self.convert_bytes_to_string(
-                        child_node.text
-                    ).split("\n")
-                    if "public" in modifiers_text_str:
-                        public_class_node = node
+        public_class_node: Optional[Node] = next(
+            (n for n in query_results if self.is_public_node(n)), None
+        )
         if debug:
             public_class_node_str: Optional[str] = None
             if public_class_node and public_class_node.text:
@@ -182,26 +308,31 @@ class TreesitterUtils:
             )
         return public_class_node
 
+    @traced(TracePhase.QUERY)
+    def get_buffer_public_class_node(
+        self, tree: Tree, debug: bool = False
+    ) -> Optional[Node]:
+        # Only top level classes are matched, and the search stops at the first
+        # public one
+        query_results = self.iter_query_matches(
+            tree.root_node, "(class_declaration) @class_decl", max_start_depth=0
+        )
+        return self.get_buffer_public_class_node_from_query_results(
+            query_results, debug
+        )
+
     def get_buffer_public_class_name(
         self, tree: Tree, debug: bool = False
     ) -> Optional[str]:
         public_class_name: Optional[str] = None
-        query_param = "(class_declaration) @class_decl"
-        query_results: List[Node] = self.query_match(tree=tree, query_param=query_param)
-        public_class_node = self.get_buffer_public_class_node_from_query_results(
-            query_results=query_results, debug=debug
-        )
+        public_class_node = self.get_buffer_public_class_node(tree, debug)
         if public_class_node:
             name_node = public_class_node.child_by_field_name("name")
             if name_node and name_node.text:
                 public_class_name = self.convert_bytes_to_string(name_node.text)
         if debug:
             self.logging.log(
-                [
-                    f"Query param: {query_param}",
-                    f"Total query results: {len(query_results)}",
-                    f"Public class name: {public_class_name}",
-                ],
+                f"Public class name: {public_class_name}",
                 LogLevel.DEBUG,
             )
         return public_class_name
@@ -210,11 +341,7 @@ class TreesitterUtils:
         self, tree: Tree, annotation_name: str, debug: bool = False
     ) -> bool:
         public_class_has_annotation: bool = False
-        query_param = "(class_declaration) @class_decl"
-        query_results: List[Node] = self.query_match(tree=tree, query_param=query_param)
-        public_class_node = self.get_buffer_public_class_node_from_query_results(
-            query_results=query_results, debug=debug
-        )
+        public_class_node = self.get_buffer_public_class_node(tree, debug)
         if public_class_node:
             modifiers = self.get_node_by_type(public_class_node, "modifiers")
             if modifiers:
@@ -237,11 +364,7 @@ class TreesitterUtils:
         self, tree: Tree, method_name: str, debug: bool = False
     ):
         public_class_has_method: bool = False
-        query_param = "(class_declaration) @class_decl"
-        query_results: List[Node] = self.query_match(tree=tree, query_param=query_param)
-        public_class_node = self.get_buffer_public_class_node_from_query_results(
-            query_results=query_results, debug=debug
-        )
+        public_class_node = self.get_buffer_public_class_node(tree, debug)
         if public_class_node:
             body = public_class_node.child_by_field_name("body")
             if body:
@@ -278,70 +401,142 @@ class TreesitterUtils:
             raise ValueError(error_msg)
         return updated_tree
 
-    def add_to_importing_list(
-        self, import_list: List[str], debug: bool = False
-    ) -> None:
-        imports_to_extend = []
-        for i in import_list:
-            if i not in self.importings:
-                imports_to_extend.append(i)
-        if debug:
-            self.logging.log(
-                [
-                    f"Previous import list: {str(self.importings)}",
-                    f"New imports: {str(imports_to_extend)}",
-                    f"New import list: {str(self.importings + imports_to_extend)}",
-                ],
-                LogLevel.DEBUG,
+    def replace_byte_ranges(
+        self, file_tree: Tree, edits: List[Tuple[int, int, str]]
+    ) -> Tree:
+        # Applies every (start, end, code) edit to the source and parses once.
+        # Edits must not overlap; ones sharing a position keep their order.
+        node_text_bytes = file_tree.root_node.text
+        if not node_text_bytes:
+            error_msg = "Unable to update tree"
+            self.logging.log(error_msg, LogLevel.ERROR)
+            raise ValueError(error_msg)
+        ordered_edits = sorted(
+            enumerate(edits), key=lambda e: (e[1][0], e[1][1], e[0]), reverse=True
+        )
+        for _, (start_byte, end_byte, code) in ordered_edits:
+            node_text_bytes = (
+                node_text_bytes[:start_byte]
+                + code.encode("utf-8")
+                + node_text_bytes[end_byte:]
             )
-        self.importings.extend(imports_to_extend)
+        return self.convert_bytes_to_tree(node_text_bytes)
+
+    def get_import_key(self, import_node: Node) -> Tuple[bool, str]:
+        # (is_static, imported path), e.g. (False, "jakarta.persistence.*")
+        import_text = self.get_node_text_as_string(import_node) or ""
+        tokens = import_text.rstrip().rstrip(";").split()
+        is_static = len(tokens) > 2 and tokens[1] == "static"
+        return (is_static, "".join(tokens[2 if is_static else 1 :]))
 
-    def add_imports_to_file_tree(self, file_tree: Tree, debug: bool = False) -> Tree:
+    def is_import_needed(
+        self,
+        import_path: str,
+        package_path: str,
+        existing_imports: List[Tuple[bool, str]],
+    ) -> bool:
+        import_package = import_path.rpartition(".")[0]
+        # java.lang and the file's own package are always visible
+        if import_package in ("java.lang", package_path):
+            return False
+        for is_static, existing_path in existing_imports:
+            if is_static:
+                continue
+            if existing_path == import_path or existing_path == f"{import_package}.*":
+                return False
+        return True
+
+    @traced(TracePhase.IMPORT_INSERTION)
+    def add_imports_to_file_tree(
+        self, file_tree: Tree, imports: List[str], debug: bool = False
+    ) -> Tree:
         package_query_param = "(package_declaration) @package_decl"
+        # Package declarations are top level, and a second one is enough to fail
         query_results = self.query_match(
-            tree=file_tree, query_param=package_query_param
+            tree=file_tree,
+            query_param=package_query_param,
+            limit=2,
+            max_start_depth=0,
         )
         if len(query_results) != 1:
             error_msg = "File package not defined or defined incorrectly"
             self.logging.log(error_msg, LogLevel.ERROR)
             raise ValueError(error_msg)
-        insert_byte: int = query_results[0].end_byte + 1
-        import_list = [f"import {e};" for e in self.importings]
-        merged_import_list = "\n".join(import_list)
-        updated_tree = self.insert_code_at_position(
-            merged_import_list, insert_byte, file_tree
+        package_node = query_results[0]
+        package_path = (self.get_node_text_as_string(package_node) or "").strip()
+        package_path = package_path.removeprefix("package").rstrip(";").strip()
+        import_nodes = [
+            n for n in file_tree.root_node.children if n.type == "import_declaration"
+        ]
+        existing_imports = [self.get_import_key(n) for n in import_nodes]
+        missing_imports = sorted(
+            {
+                i
+                for i in imports
+                if self.is_import_needed(i, package_path, existing_imports)
+            }
         )
+        if not missing_imports:
+            return file_tree
+        edits: List[Tuple[int, int, str]] = []
+        if not import_nodes:
+            # Own block between the package line and the rest, one blank line each
+            root_text = file_tree.root_node.text or b""
+            rest_byte = len(root_text) - len(
+                root_text[package_node.end_byte :].lstrip()
+            )
+            import_block = "\n".join(f"import {i};" for i in missing_imports)
+            edits.append((package_node.end_byte, rest_byte, f"\n\n{import_block}\n\n"))
+        else:
+            # Each import goes before the first existing one that sorts after it,
+            # which keeps a sorted import list sorted
+            for import_path in missing_imports:
+                insert_before = next(
+                    (
+                        node
+                        for node, key in zip(import_nodes, existing_imports)
+                        if key > (False, import_path)
+                    ),
+                    None,
+                )
+                if insert_before is not None:
+                    edits.append(
+                        (
+                            insert_before.start_byte,
+                            insert_before.start_byte,
+                            f"import {import_path};\n",
+                        )
+                    )
+                else:
+                    last_import_end_byte = import_nodes[-1].end_byte
+                    edits.append(
+                        (
+                            last_import_end_byte,
+                            last_import_end_byte,
+                            f"\nimport {import_path};",
+                        )
+                    )
+        updated_tree = self.replace_byte_ranges(file_tree, edits)
         if debug:
             self.logging.log(
                 [
-                    f"Package query param: {package_query_param}",
-                    f"Query results len: {len(query_results)}",
-                    f"Insert byte: {insert_byte}",
-                    f"Merged import list: {merged_import_list}",
+                    f"Package path: {package_path}",
+                    f"Existing imports: {existing_imports}",
+                    f"Missing imports: {missing_imports}",
                     f"Node before: {self.get_node_text_as_string(file_tree.root_node)}",
                     f"Node after: {self.get_node_text_as_string(updated_tree.root_node)}",
                 ],
                 LogLevel.DEBUG,
             )
-        self.importings = []
         return updated_tree
 
-    def get_entity_field_insert_byte(
+    def get_buffer_public_class_body(
         self, file_tree: Tree, debug: bool = False
-    ) -> Optional[int]:
-        insert_byte: Optional[int] = None
-        query_results = self.query_match(file_tree, "(class_declaration) @class_decl")
-        main_class_node = self.get_buffer_public_class_node_from_query_results(
-            query_results, debug
-        )
+    ) -> Optional[Node]:
+        class_body: Optional[Node] = None
+        main_class_node = self.get_buffer_public_class_node(file_tree, debug)
         if main_class_node:
             class_body = main_class_node.child_by_field_name("body")
-            if class_body:
-                field_declarations = class_body.children
-                if len(field_declarations) != 0:
-                    insert_byte = field_declarations[-1].end_byte - 1
-                else:
-                    insert_byte = class_body.start_byte
         if debug:
-            self.logging.log(f"Insert byte: {insert_byte}", LogLevel.DEBUG)
-        return insert_byte
+            self.logging.log(f"Class body: {class_body}", LogLevel.DEBUG)
+        return class_body